@@ -0,0 +1,37 @@
+"""Store the activation items offered to each submitted run.
+
+Revision ID: 5e2a7c4d9b18
+Revises: c8a4f2e9d631
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "5e2a7c4d9b18"
+down_revision = "c8a4f2e9d631"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "offered_activations",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("test_run_id", sa.Integer(), nullable=False),
+        sa.Column("channel", sa.String(length=32), nullable=False),
+        sa.Column("advice_id", sa.String(length=64), nullable=False),
+        sa.Column("trigger_id", sa.String(length=64), nullable=True),
+        sa.ForeignKeyConstraint(["test_run_id"], ["test_runs.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("test_run_id", "channel", name="uq_offered_activations_test_run_channel"),
+        sa.UniqueConstraint("test_run_id", "advice_id", name="uq_offered_activations_test_run_advice"),
+    )
+    op.create_index(op.f("ix_offered_activations_id"), "offered_activations", ["id"], unique=False)
+    op.create_index(op.f("ix_offered_activations_test_run_id"), "offered_activations", ["test_run_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_offered_activations_test_run_id"), table_name="offered_activations")
+    op.drop_index(op.f("ix_offered_activations_id"), table_name="offered_activations")
+    op.drop_table("offered_activations")
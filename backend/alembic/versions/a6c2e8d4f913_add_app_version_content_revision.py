@@ -0,0 +1,25 @@
+"""Add a content revision to app versions for cross-process cache invalidation.
+
+Revision ID: a6c2e8d4f913
+Revises: b5e1d7c3a908
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "a6c2e8d4f913"
+down_revision = "b5e1d7c3a908"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "app_versions",
+        sa.Column("content_revision", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("app_versions", "content_revision")
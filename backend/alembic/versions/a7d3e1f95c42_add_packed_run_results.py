@@ -0,0 +1,50 @@
+"""Add packed per-run storage of answers and computed scores.
+
+Revision ID: a7d3e1f95c42
+Revises: 5e2a7c4d9b18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "a7d3e1f95c42"
+down_revision = "5e2a7c4d9b18"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "packed_result_layouts",
+        sa.Column("layout_hash", sa.String(length=64), nullable=False),
+        sa.Column("version_id", sa.String(length=50), nullable=False),
+        sa.Column("scenario_layout", sa.Text(), nullable=False),
+        sa.Column("gene_codes", sa.Text(), nullable=False),
+        sa.Column("model_codes", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.ForeignKeyConstraint(["version_id"], ["app_versions.version_id"]),
+        sa.PrimaryKeyConstraint("layout_hash"),
+    )
+    op.create_index(
+        op.f("ix_packed_result_layouts_version_id"), "packed_result_layouts", ["version_id"], unique=False
+    )
+    op.create_table(
+        "packed_run_results",
+        sa.Column("test_run_id", sa.Integer(), nullable=False),
+        sa.Column("layout_hash", sa.String(length=64), nullable=False),
+        sa.Column("option_indices", sa.LargeBinary(), nullable=False),
+        sa.Column("raw_scores", sa.LargeBinary(), nullable=False),
+        sa.Column("normalized_scores", sa.LargeBinary(), nullable=False),
+        sa.Column("model_indices", sa.LargeBinary(), nullable=False),
+        sa.Column("model_similarities", sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(["test_run_id"], ["test_runs.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["layout_hash"], ["packed_result_layouts.layout_hash"]),
+        sa.PrimaryKeyConstraint("test_run_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("packed_run_results")
+    op.drop_index(op.f("ix_packed_result_layouts_version_id"), table_name="packed_result_layouts")
+    op.drop_table("packed_result_layouts")
@@ -0,0 +1,26 @@
+"""Store both-language share snapshots on completed test runs.
+
+Revision ID: b5e1d7c3a908
+Revises: f3c9a6e2d147
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "b5e1d7c3a908"
+down_revision = "f3c9a6e2d147"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "test_runs",
+        sa.Column("share_snapshots_jsonb", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("test_runs", "share_snapshots_jsonb")
@@ -0,0 +1,23 @@
+"""Store the submit-answers response on completed test runs.
+
+Revision ID: d2b8f0c7e514
+Revises: a7d3e1f95c42
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "d2b8f0c7e514"
+down_revision = "a7d3e1f95c42"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("test_runs", sa.Column("result_jsonb", postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("test_runs", "result_jsonb")
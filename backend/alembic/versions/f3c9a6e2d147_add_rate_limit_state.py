@@ -0,0 +1,30 @@
+"""Add unlogged shared rate-limit state.
+
+Revision ID: f3c9a6e2d147
+Revises: d2b8f0c7e514
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "f3c9a6e2d147"
+down_revision = "d2b8f0c7e514"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "rate_limit_state",
+        sa.Column("bucket_key", sa.String(length=128), nullable=False),
+        sa.Column("tat", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("bucket_key"),
+        prefixes=["UNLOGGED"],
+    )
+    op.create_index(op.f("ix_rate_limit_state_tat"), "rate_limit_state", ["tat"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_rate_limit_state_tat"), table_name="rate_limit_state")
+    op.drop_table("rate_limit_state")
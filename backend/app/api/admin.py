@@ -2,12 +2,19 @@
 Admin panel API endpoints for managing content.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Header
+import json
+import secrets
+import tempfile
+
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy import case, func
 from sqlalchemy.orm import Session
-from typing import List
+from typing import AsyncIterator, Dict, List, Optional, Sequence
 
-from app.db.session import get_db
+from app.api.journey import resolve_cohort_content, submit_cohort_batch
+from app.db.session import SessionLocal, get_db
 from app.models import Feedback, Idol, Question, Result, TestRun, Trait, User
 from app.schemas.admin import (
     QuestionCreate, QuestionUpdate, QuestionResponse,
@@ -15,10 +22,19 @@ from app.schemas.admin import (
     TraitCreate, TraitUpdate, TraitResponse,
     AdminStats
 )
+from app.core.cohort_upload import CohortParser, CohortRow, cohort_format_for_content_type
 from app.core.config import settings
+from app.core.outcome_cache import outcome_cache
+from app.core.rate_limit import rate_limiter
+from app.core.scenario_content import ScenarioSetContent
+from app.core.share_cache import shared_report_cache
 
 router = APIRouter()
 
+# Cohort uploads stay in memory up to this size and spill to a temporary file beyond it.
+COHORT_SPOOL_MEMORY_BYTES = 8 * 1024 * 1024
+COHORT_READ_CHUNK_BYTES = 64 * 1024
+
 
 # ============ Authentication Dependency ============
 
@@ -144,6 +160,113 @@ def get_stats(
     )
 
 
+@router.get("/metrics")
+def get_metrics(_: bool = Depends(verify_admin_key)) -> Dict[str, Dict[str, object]]:
+    """In-process cache and token-check counters of the API process serving the request."""
+    return {
+        "outcome_cache": outcome_cache.stats(),
+        "shared_report_cache": shared_report_cache.stats(),
+        "share_rate_limiter": rate_limiter.stats(),
+    }
+
+
+# ============ Cohort Endpoint ============
+
+def _ndjson(records: Sequence[Dict[str, object]]) -> str:
+    return "".join(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n" for record in records)
+
+
+def _cohort_content_in_new_session(version_id: str, scenario_set_code: Optional[str]) -> ScenarioSetContent:
+    with SessionLocal() as db:
+        return resolve_cohort_content(db, version_id, scenario_set_code)
+
+
+def _submit_cohort_batch_in_new_session(
+    content: ScenarioSetContent, cohort_id: str, rows: Sequence[CohortRow]
+) -> List[Dict[str, object]]:
+    with SessionLocal() as db:
+        return submit_cohort_batch(db, content=content, cohort_id=cohort_id, rows=rows)
+
+
+def _read_cohort_rows(upload: tempfile.SpooledTemporaryFile, parser: CohortParser) -> Optional[List[CohortRow]]:
+    """Parse the next chunk of a spooled upload; ``None`` once it is exhausted."""
+    chunk = upload.read(COHORT_READ_CHUNK_BYTES)
+    if not chunk:
+        return None
+    return parser.feed(chunk)
+
+
+@router.post("/cohorts", response_class=StreamingResponse)
+async def submit_cohort(
+    request: Request,
+    version_id: str = Query(..., min_length=1),
+    scenario_set_code: Optional[str] = Query(default=None, min_length=1),
+    _: bool = Depends(verify_admin_key),
+):
+    """Score a CSV or NDJSON upload of many respondents, streaming NDJSON results as batches finish.
+
+    Each output line carries the input ``line`` and ``respondent_id`` plus
+    either ``test_run_id``, ``owner_token`` and ``result`` or an ``error``.
+    The final line is a ``summary``. Spool file I/O, parsing, scoring and
+    storage run in the threadpool, so the event loop only moves bytes.
+
+    The whole upload is spooled before the response starts: once it streams,
+    Starlette listens for the client disconnecting on the same receive
+    channel and would swallow the body chunks still in flight.
+    """
+    try:
+        upload_format = cohort_format_for_content_type(request.headers.get("content-type"))
+    except ValueError as exc:
+        raise HTTPException(status_code=415, detail=str(exc))
+    content = await run_in_threadpool(_cohort_content_in_new_session, version_id, scenario_set_code)
+    cohort_id = secrets.token_hex(8)
+
+    upload = tempfile.SpooledTemporaryFile(max_size=COHORT_SPOOL_MEMORY_BYTES)
+    try:
+        async for chunk in request.stream():
+            await run_in_threadpool(upload.write, chunk)
+        upload.seek(0)
+    except BaseException:
+        upload.close()
+        raise
+
+    async def results() -> AsyncIterator[str]:
+        parser = CohortParser(upload_format, max_line_bytes=settings.COHORT_MAX_LINE_BYTES)
+        batch: List[CohortRow] = []
+        summary: Dict[str, object] = {"cohort_id": cohort_id, "stored": 0, "failed": 0}
+
+        async def submit_batch() -> str:
+            rows = list(batch)
+            batch.clear()
+            records = await run_in_threadpool(_submit_cohort_batch_in_new_session, content, cohort_id, rows)
+            failed = sum(1 for record in records if "error" in record)
+            summary["failed"] += failed
+            summary["stored"] += len(records) - failed
+            return _ndjson(records)
+
+        try:
+            try:
+                while True:
+                    rows = await run_in_threadpool(_read_cohort_rows, upload, parser)
+                    if rows is None:
+                        break
+                    for row in rows:
+                        batch.append(row)
+                        if len(batch) >= settings.COHORT_BATCH_SIZE:
+                            yield await submit_batch()
+                batch.extend(parser.close())
+            except ValueError as exc:
+                # Rows parsed before an unreadable line are still stored.
+                summary["error"] = str(exc)
+            if batch:
+                yield await submit_batch()
+            yield _ndjson([{"summary": summary}])
+        finally:
+            upload.close()
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
 # ============ Question Endpoints ============
 
 @router.get("/questions", response_model=List[QuestionResponse])
@@ -3,39 +3,51 @@ import base64
 import hashlib
 import hmac
 import json
+import logging
 import random
-from typing import Dict, List, Optional, Sequence, Set
+from typing import AbstractSet, Dict, List, Mapping, NamedTuple, Optional, Sequence, Set
 
 from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.hybrid_engine import (
-    GeneScoreResult,
-    HybridComputationResult,
     JourneyAnswer,
-    ModelMatchResult,
-    compute_hybrid_outcome,
-    rank_gene_scores,
+    OutcomeFrame,
+    compute_hybrid_outcome_batch,
+    compute_hybrid_outcome_from_raw,
     select_activation_items,
 )
+from app.core.activity_tracker import activity_tracker
+from app.core.cohort_upload import CohortRow
+from app.core.compact_answers import CompactAnswers, get_compact_answer_index
 from app.core.config import settings
-from app.core.result_sharing import hash_capability_token, new_owner_token, verify_owner_token
-from app.db.session import get_db
+from app.core.journey_progress import journey_progress
+from app.core.outcome_cache import compute_hybrid_outcome_cached, compute_hybrid_outcome_from_rows_cached
+from app.core.packed_results import build_result_layout, load_answers, load_gene_scores, load_model_matches
+from app.core.result_sharing import build_share_snapshots, hash_capability_token, new_owner_token, verify_owner_token
+from app.core.scenario_content import ScenarioSetContent, get_scenario_set_content
+from app.core.set_allocator import set_allocator
+from app.core.scoring_plan import get_version_scoring_plan
+from app.core.version_registry import DRAFT_SCENARIO_PREFIX, JOURNEY_TYPE_VERSIONS, get_version_registry
+from app.db.journey_persistence import persist_new_submissions, persist_submission
+from app.db.session import SessionLocal, get_async_db, get_db
 from app.models import (
     Answer,
-    AppVersion,
-    ComputedGeneScore,
-    ComputedModelMatch,
     Feedback,
     Gene,
+    OfferedActivation,
     ProphetTrait,
     QuranValue,
     SahabaModel,
-    Scenario,
-    ScenarioOption,
     TestRun,
 )
 from app.schemas.journey import (
+    JourneyAnswerRequest,
+    JourneyAnswerResponse,
     JourneyAnswerSubmission,
     JourneyCancelRequest,
     JourneyCancelResponse,
@@ -57,13 +69,13 @@ from app.schemas.journey import (
     JourneyProphetTrait,
 )
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 RUN_STATUS_STARTED = "started"
 RUN_STATUS_COMPLETED = "completed"
 RUN_STATUS_CANCELLED = "cancelled"
 RUN_INACTIVITY_TTL = timedelta(hours=24)
 DEEP_VERSION_PREFIXES = ("v2",)
-DRAFT_SCENARIO_PREFIX = "draft_"
 
 
 def _resolve_version_id(
@@ -71,58 +83,30 @@ def _resolve_version_id(
     requested_version_id: Optional[str],
     journey_type: Optional[str],
 ) -> str:
+    registry = get_version_registry(db)
     if requested_version_id:
-        version = db.query(AppVersion).filter(AppVersion.version_id == requested_version_id).first()
-        if not version:
+        if requested_version_id not in registry.versions:
             raise HTTPException(status_code=404, detail=f"Version '{requested_version_id}' not found")
-        return version.version_id
+        return requested_version_id
 
     if journey_type:
-        normalized_type = journey_type.lower()
-        journey_map = {"quick": "v1", "deep": "v2"}
-        mapped_version = journey_map.get(normalized_type)
+        mapped_version = JOURNEY_TYPE_VERSIONS.get(journey_type.lower())
         if not mapped_version:
             raise HTTPException(status_code=400, detail="Invalid journey_type")
-        version = db.query(AppVersion).filter(AppVersion.version_id == mapped_version).first()
-        if not version:
+        if mapped_version not in registry.versions:
             raise HTTPException(status_code=404, detail=f"Version '{mapped_version}' not found")
-        return version.version_id
+        return mapped_version
 
-    active_versions = (
-        db.query(AppVersion)
-        .filter(AppVersion.is_active.is_(True))
-        .order_by(AppVersion.published_at.desc(), AppVersion.version_id.desc())
-        .all()
-    )
-    if not active_versions:
+    if registry.active_version_id is None:
         raise HTTPException(status_code=400, detail="No active app version found")
-    return active_versions[0].version_id
-
-
-def _load_option_codes_by_scenario(db: Session, version_id: str) -> Dict[str, Set[str]]:
-    rows = db.query(ScenarioOption).filter(ScenarioOption.version_id == version_id).all()
-    option_codes_by_scenario: Dict[str, Set[str]] = {}
-    for row in rows:
-        option_codes_by_scenario.setdefault(row.scenario_code, set()).add(row.option_code)
-    return option_codes_by_scenario
+    return registry.active_version_id
 
 
 def _load_scenario_set_codes(db: Session, version_id: str, include_drafts: bool = False) -> List[str]:
-    rows = (
-        db.query(Scenario.scenario_set_code)
-        .filter(Scenario.version_id == version_id)
-        .distinct()
-        .order_by(Scenario.scenario_set_code.asc())
-        .all()
-    )
-    set_codes: List[str] = []
-    for (set_code,) in rows:
-        if not set_code:
-            continue
-        if not include_drafts and set_code.startswith(DRAFT_SCENARIO_PREFIX):
-            continue
-        set_codes.append(set_code)
-    return set_codes
+    version = get_version_registry(db).versions.get(version_id)
+    if version is None:
+        return []
+    return list(version.set_codes(include_drafts=include_drafts))
 
 
 def _top_gene_count_for_version(version_id: str) -> int:
@@ -131,12 +115,6 @@ def _top_gene_count_for_version(version_id: str) -> int:
     return 3
 
 
-def _select_scenario_set_code(set_codes: Sequence[str], test_run_id: int) -> str:
-    if not set_codes:
-        raise ValueError("No scenario sets available")
-    return random.choice(list(set_codes))
-
-
 def _base64url_decode(value: str) -> bytes:
     padding = "=" * (-len(value) % 4)
     return base64.urlsafe_b64decode(value + padding)
@@ -217,15 +195,54 @@ def _preview_test_run_id(token_payload: Dict[str, object]) -> int:
 
 
 def _touch_test_run(test_run: TestRun) -> None:
+    """Write activity onto the row; for requests that commit a status change anyway."""
     test_run.last_activity_at = datetime.now(timezone.utc)
+    activity_tracker.discard(test_run.id)
+
+
+def _flush_progress_if_due(db: Session) -> None:
+    if not journey_progress.flush_due():
+        return
+    try:
+        journey_progress.flush(db)
+    except Exception:
+        # The answer itself is recorded; the batch stays queued for the next flush.
+        logger.exception("Flushing journey answers failed")
+
+
+def _flush_activity_if_due(db: Session) -> None:
+    if not activity_tracker.flush_due():
+        return
+    try:
+        activity_tracker.flush(db)
+    except Exception:
+        # The touches stay buffered for the next flush; the request itself succeeded.
+        logger.exception("Flushing run activity failed")
+
+
+def _flush_activity_in_new_session() -> None:
+    with SessionLocal() as db:
+        _flush_activity_if_due(db)
+
+
+def _warm_scenario_content() -> None:
+    """Build the version registry and every published set's content in a threadpool session.
+
+    Start and resume read them inside ``AsyncSession.run_sync``, which runs on
+    the event loop; with the caches built here they only await the database
+    there.
+    """
+    with SessionLocal() as db:
+        registry = get_version_registry(db)
+        for version_id, version in registry.versions.items():
+            for scenario_set_code in version.set_codes():
+                get_scenario_set_content(db, version_id, scenario_set_code)
 
 
 def _is_run_expired(test_run: TestRun) -> bool:
-    last_activity = test_run.last_activity_at or test_run.created_at
+    last_activity = activity_tracker.last_activity(test_run)
     if not last_activity:
         return False
-    if last_activity.tzinfo is None:
-        last_activity = last_activity.replace(tzinfo=timezone.utc)
     return datetime.now(timezone.utc) - last_activity > RUN_INACTIVITY_TTL
 
 
@@ -236,39 +253,18 @@ def _build_journey_response(
     test_run_id: int,
     scenario_set_code: str,
     owner_token: Optional[str] = None,
+    answers: Sequence[JourneyAnswerSubmission] = (),
 ) -> JourneyStartResponse:
-    scenarios = (
-        db.query(Scenario)
-        .filter(
-            Scenario.version_id == version_id,
-            Scenario.scenario_set_code == scenario_set_code,
-        )
-        .order_by(Scenario.order_index.asc(), Scenario.scenario_code.asc())
-        .all()
-    )
-    if not scenarios:
+    content = get_scenario_set_content(db, version_id, scenario_set_code)
+    if not content.scenarios:
         raise HTTPException(
             status_code=400,
             detail=f"No scenarios found for version '{version_id}' and set '{scenario_set_code}'",
         )
 
-    scenario_codes = [scenario.scenario_code for scenario in scenarios]
-    options = (
-        db.query(ScenarioOption)
-        .filter(
-            ScenarioOption.version_id == version_id,
-            ScenarioOption.scenario_code.in_(scenario_codes),
-        )
-        .order_by(ScenarioOption.scenario_code.asc(), ScenarioOption.option_code.asc())
-        .all()
-    )
-    options_by_scenario: Dict[str, List[ScenarioOption]] = {}
-    for option in options:
-        options_by_scenario.setdefault(option.scenario_code, []).append(option)
-
     response_scenarios: List[JourneyScenario] = []
-    for scenario in scenarios:
-        scenario_options = list(options_by_scenario.get(scenario.scenario_code, []))
+    for scenario in content.scenarios:
+        scenario_options = list(scenario.options)
         scenario_seed = f"{test_run_id}:{scenario.scenario_code}"
         random.Random(scenario_seed).shuffle(scenario_options)
         response_scenarios.append(
@@ -293,6 +289,8 @@ def _build_journey_response(
         version_id=version_id,
         owner_token=owner_token,
         scenarios=response_scenarios,
+        answers=list(answers),
+        content_hash=content.content_hash,
     )
 
 
@@ -308,10 +306,25 @@ def _require_owned_test_run(
     return test_run
 
 
+def _recorded_answers(db: Session, test_run: TestRun) -> List[JourneyAnswerSubmission]:
+    progress = journey_progress.get(test_run.id)
+    if progress is not None:
+        recorded = dict(progress.answers)
+    else:
+        # Answers queued after their progress was evicted are only in this process until flushed.
+        journey_progress.flush(db, test_run_id=test_run.id)
+        rows = db.query(Answer).filter(Answer.test_run_id == test_run.id).all()
+        recorded = {row.scenario_code: row.option_code for row in rows}
+    return [
+        JourneyAnswerSubmission(scenario_code=scenario_code, option_code=option_code)
+        for scenario_code, option_code in sorted(recorded.items())
+    ]
+
+
 def _validate_answer_payload(
     answers: Sequence[JourneyAnswerSubmission],
-    valid_scenario_codes: Set[str],
-    option_codes_by_scenario: Dict[str, Set[str]],
+    valid_scenario_codes: AbstractSet[str],
+    option_codes_by_scenario: Mapping[str, AbstractSet[str]],
 ) -> List[JourneyAnswer]:
     seen_scenarios: Set[str] = set()
     normalized_answers: List[JourneyAnswer] = []
@@ -345,64 +358,65 @@ def _validate_answer_payload(
     return normalized_answers
 
 
-def _load_allowed_activation_ids(db: Session, test_run: TestRun) -> Set[str]:
-    gene_score_rows = (
-        db.query(ComputedGeneScore)
-        .filter(ComputedGeneScore.test_run_id == test_run.id)
-        .all()
+def _activation_was_offered(db: Session, test_run: TestRun, advice_id: str) -> bool:
+    offered = (
+        db.query(OfferedActivation.channel)
+        .filter(OfferedActivation.test_run_id == test_run.id, OfferedActivation.advice_id == advice_id)
+        .first()
     )
-    if not gene_score_rows:
+    if offered is not None:
+        return True
+    if db.query(OfferedActivation.id).filter(OfferedActivation.test_run_id == test_run.id).first() is not None:
+        return False
+    # Runs submitted before offered activations were stored: recompute the offer.
+    return advice_id in _load_allowed_activation_ids(db=db, test_run=test_run)
+
+
+def _load_allowed_activation_ids(db: Session, test_run: TestRun) -> Set[str]:
+    gene_scores = load_gene_scores(db, test_run.id)
+    if not gene_scores:
         raise HTTPException(
             status_code=400,
             detail="selected_activation_id requires completed submit-answers for this test_run",
         )
 
-    raw_scores = {row.gene_code: float(row.raw_score) for row in gene_score_rows}
-    ranked_scores = rank_gene_scores(raw_scores)
-    normalized_by_gene = {row.gene_code: float(row.normalized_score) for row in gene_score_rows}
-    gene_scores: List[GeneScoreResult] = [
-        GeneScoreResult(
-            gene_code=score.gene_code,
-            raw_score=score.raw_score,
-            normalized_score=normalized_by_gene.get(score.gene_code, score.normalized_score),
-            rank=score.rank,
-            role=score.role,
-        )
-        for score in ranked_scores
-    ]
-
-    model_rows = (
-        db.query(ComputedModelMatch)
-        .filter(ComputedModelMatch.test_run_id == test_run.id)
-        .order_by(ComputedModelMatch.rank.asc(), ComputedModelMatch.model_code.asc())
-        .all()
-    )
-    model_matches: List[ModelMatchResult] = [
-        ModelMatchResult(model_code=row.model_code, similarity=float(row.similarity), rank=row.rank)
-        for row in model_rows
-    ]
-
     activation_items = select_activation_items(
-        db=db,
-        version_id=test_run.version_id,
+        plan=get_version_scoring_plan(db, test_run.version_id),
         gene_scores=gene_scores,
-        model_matches=model_matches,
+        model_matches=load_model_matches(db, test_run.id),
     )
     return {item.advice_id for item in activation_items}
 
 
+class _ResultContent(NamedTuple):
+    genes_by_code: Dict[str, Gene]
+    models_by_code: Dict[str, SahabaModel]
+    quran_by_code: Dict[str, QuranValue]
+    prophet_by_code: Dict[str, ProphetTrait]
+
+
+def _load_result_content(db: Session, version_id: str) -> _ResultContent:
+    return _ResultContent(
+        genes_by_code={gene.gene_code: gene for gene in db.query(Gene).filter(Gene.version_id == version_id)},
+        models_by_code={
+            model.model_code: model for model in db.query(SahabaModel).filter(SahabaModel.version_id == version_id)
+        },
+        quran_by_code={value.quran_value_code: value for value in db.query(QuranValue)},
+        prophet_by_code={trait.trait_code: trait for trait in db.query(ProphetTrait)},
+    )
+
+
 def _build_submit_response(
     db: Session,
     *,
     version_id: str,
     test_run_id: int,
-    outcome: HybridComputationResult,
+    outcome: OutcomeFrame,
+    result_content: Optional[_ResultContent] = None,
 ) -> JourneySubmitAnswersResponse:
-    genes = db.query(Gene).filter(Gene.version_id == version_id).all()
-    genes_by_code = {gene.gene_code: gene for gene in genes}
-
-    models = db.query(SahabaModel).filter(SahabaModel.version_id == version_id).all()
-    models_by_code = {model.model_code: model for model in models}
+    genes_by_code, models_by_code, quran_by_code, prophet_by_code = result_content or _load_result_content(
+        db, version_id
+    )
 
     top_gene_count = _top_gene_count_for_version(version_id)
     top_gene_rows = outcome.gene_scores[:top_gene_count]
@@ -435,8 +449,6 @@ def _build_submit_response(
         if match.model_code in models_by_code
     ]
 
-    quran_values = db.query(QuranValue).all()
-    quran_by_code = {value.quran_value_code: value for value in quran_values}
     quran_results = [
         JourneyQuranValue(
             quran_value_code=row.quran_value_code,
@@ -451,8 +463,6 @@ def _build_submit_response(
         if row.quran_value_code in quran_by_code
     ]
 
-    prophet_traits = db.query(ProphetTrait).all()
-    prophet_by_code = {trait.trait_code: trait for trait in prophet_traits}
     prophet_results = [
         JourneyProphetTrait(
             trait_code=row.trait_code,
@@ -492,10 +502,54 @@ def _build_submit_response(
     )
 
 
+def _decode_compact_answers(
+    db: Session,
+    test_run: TestRun,
+    payload: JourneySubmitAnswersRequest,
+) -> CompactAnswers:
+    content = get_scenario_set_content(db, test_run.version_id, test_run.scenario_set_code or None)
+    if payload.content_hash != content.content_hash:
+        raise HTTPException(status_code=409, detail="content_hash does not match the run's scenario set")
+    plan = get_version_scoring_plan(db, test_run.version_id)
+    try:
+        return get_compact_answer_index(plan, content).decode(payload.option_indices)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+def _replay_submit_response(
+    db: Session,
+    test_run: TestRun,
+    payload: JourneySubmitAnswersRequest,
+) -> JourneySubmitAnswersResponse:
+    """Stored response of an already completed run, for retried submits with the same answers."""
+    if test_run.result_jsonb is None or test_run.version_id != payload.version_id:
+        raise HTTPException(status_code=409, detail="test_run already submitted")
+    if payload.option_indices is not None:
+        submitted = dict(_decode_compact_answers(db, test_run, payload).canonical)
+    elif payload.answers:
+        submitted = {answer.scenario_code.strip(): answer.option_code.strip() for answer in payload.answers}
+    else:
+        submitted = None
+    if submitted is not None:
+        if submitted != load_answers(db, test_run.id):
+            raise HTTPException(status_code=409, detail="test_run already submitted with different answers")
+    return JourneySubmitAnswersResponse.model_validate(test_run.result_jsonb)
+
+
 @router.post("/start", response_model=JourneyStartResponse)
+async def start_journey_route(
+    payload: Optional[JourneyStartRequest] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    await run_in_threadpool(_warm_scenario_content)
+    return await db.run_sync(lambda session: start_journey(payload, db=session))
+
+
 def start_journey(
     payload: Optional[JourneyStartRequest] = None,
-    db: Session = Depends(get_db),
+    *,
+    db: Session,
 ):
     requested_version_id = payload.version_id if payload else None
     journey_type = payload.journey_type if payload else None
@@ -509,30 +563,27 @@ def start_journey(
     if not scenario_set_codes:
         raise HTTPException(status_code=400, detail=f"No scenarios found for version '{version_id}'")
 
+    # The set is chosen up front so the run is created by one INSERT ... RETURNING and one commit.
+    selected_set_code = set_allocator.choose(version_id, scenario_set_codes)
     owner_token = new_owner_token()
-    test_run = TestRun(
-        version_id=version_id,
-        session_id=None,
-        status=RUN_STATUS_STARTED,
-        owner_token_hash=hash_capability_token(owner_token),
-        last_activity_at=datetime.now(timezone.utc),
-    )
-    db.add(test_run)
-    db.commit()
-    db.refresh(test_run)
-
-    selected_set_code = _select_scenario_set_code(
-        set_codes=scenario_set_codes,
-        test_run_id=test_run.id,
-    )
-    test_run.scenario_set_code = selected_set_code
-    _touch_test_run(test_run)
+    test_run_id = db.execute(
+        insert(TestRun)
+        .values(
+            version_id=version_id,
+            session_id=None,
+            scenario_set_code=selected_set_code,
+            status=RUN_STATUS_STARTED,
+            owner_token_hash=hash_capability_token(owner_token),
+            last_activity_at=datetime.now(timezone.utc),
+        )
+        .returning(TestRun.id)
+    ).scalar_one()
     db.commit()
 
     return _build_journey_response(
         db=db,
         version_id=version_id,
-        test_run_id=test_run.id,
+        test_run_id=test_run_id,
         scenario_set_code=selected_set_code,
         owner_token=owner_token,
     )
@@ -567,10 +618,25 @@ def start_journey_preview(
 
 
 @router.post("/resume", response_model=JourneyStartResponse)
-def resume_journey(
+async def resume_journey_route(
     payload: JourneyResumeRequest,
     x_result_owner_token: Optional[str] = Header(default=None, alias="X-Result-Owner-Token"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+):
+    await run_in_threadpool(_warm_scenario_content)
+    response = await db.run_sync(
+        lambda session: resume_journey(payload, x_result_owner_token=x_result_owner_token, db=session)
+    )
+    if activity_tracker.flush_due():
+        await run_in_threadpool(_flush_activity_in_new_session)
+    return response
+
+
+def resume_journey(
+    payload: JourneyResumeRequest,
+    *,
+    x_result_owner_token: Optional[str] = None,
+    db: Session,
 ):
     test_run = _require_owned_test_run(
         db,
@@ -586,17 +652,68 @@ def resume_journey(
     if not test_run.scenario_set_code:
         raise HTTPException(status_code=400, detail="test_run has no scenario set")
 
-    _touch_test_run(test_run)
-    db.commit()
-
+    if activity_tracker.touch(test_run):
+        db.commit()
     return _build_journey_response(
         db=db,
         version_id=test_run.version_id,
         test_run_id=test_run.id,
         scenario_set_code=test_run.scenario_set_code,
+        answers=_recorded_answers(db, test_run),
     )
 
 
+@router.post("/answer", response_model=JourneyAnswerResponse)
+def record_journey_answer(
+    payload: JourneyAnswerRequest,
+    x_result_owner_token: Optional[str] = Header(default=None, alias="X-Result-Owner-Token"),
+    db: Session = Depends(get_db),
+):
+    test_run = _require_owned_test_run(
+        db,
+        test_run_id=payload.test_run_id,
+        owner_token=x_result_owner_token,
+    )
+    if test_run.status != RUN_STATUS_STARTED:
+        raise HTTPException(status_code=400, detail="test_run is not active")
+    if _is_run_expired(test_run):
+        test_run.status = RUN_STATUS_CANCELLED
+        db.commit()
+        raise HTTPException(status_code=410, detail="test_run expired")
+
+    scenario_code = payload.scenario_code.strip()
+    option_code = payload.option_code.strip()
+    content = get_scenario_set_content(db, test_run.version_id, test_run.scenario_set_code or None)
+    if option_code not in content.option_codes_by_scenario.get(scenario_code, ()):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown option_code '{option_code}' for scenario '{scenario_code}'",
+        )
+
+    try:
+        progress = journey_progress.record(
+            db,
+            get_version_scoring_plan(db, test_run.version_id),
+            test_run.id,
+            scenario_code,
+            option_code,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    if activity_tracker.touch(test_run):
+        db.commit()
+    if settings.ANSWER_WRITE_BEHIND:
+        _flush_progress_if_due(db)
+    else:
+        # Other workers serve this run too: persist the answer now and keep no copy in this process.
+        journey_progress.flush(db, test_run_id=test_run.id)
+        journey_progress.discard(test_run.id)
+    _flush_activity_if_due(db)
+
+    return JourneyAnswerResponse(test_run_id=test_run.id, answered_count=len(progress.answers))
+
+
 @router.post("/preview/submit", response_model=JourneySubmitAnswersResponse)
 def submit_journey_answers_preview(
     payload: JourneyPreviewSubmitAnswersRequest,
@@ -610,31 +727,21 @@ def submit_journey_answers_preview(
     version_id = str(token_payload["version_id"])
     scenario_set_code = str(token_payload["scenario_set_code"])
 
-    scenario_rows = (
-        db.query(Scenario)
-        .filter(
-            Scenario.version_id == version_id,
-            Scenario.scenario_set_code == scenario_set_code,
-        )
-        .all()
-    )
-    valid_scenario_codes = {row.scenario_code for row in scenario_rows}
-    if not valid_scenario_codes:
+    content = get_scenario_set_content(db, version_id, scenario_set_code)
+    if not content.scenario_codes:
         raise HTTPException(
             status_code=400,
             detail=f"No scenarios found for version '{version_id}' and set '{scenario_set_code}'",
         )
 
-    option_codes_by_scenario = _load_option_codes_by_scenario(db=db, version_id=version_id)
     try:
         normalized_answers = _validate_answer_payload(
             answers=payload.answers,
-            valid_scenario_codes=valid_scenario_codes,
-            option_codes_by_scenario=option_codes_by_scenario,
+            valid_scenario_codes=content.scenario_codes,
+            option_codes_by_scenario=content.option_codes_by_scenario,
         )
-        outcome = compute_hybrid_outcome(
-            db=db,
-            version_id=version_id,
+        outcome = compute_hybrid_outcome_cached(
+            plan=get_version_scoring_plan(db, version_id),
             answers=normalized_answers,
             top_model_n=3,
         )
@@ -650,16 +757,28 @@ def submit_journey_answers_preview(
 
 
 @router.post("/submit-answers", response_model=JourneySubmitAnswersResponse)
-def submit_journey_answers(
+def submit_journey_answers_route(
     payload: JourneySubmitAnswersRequest,
     x_result_owner_token: Optional[str] = Header(default=None, alias="X-Result-Owner-Token"),
     db: Session = Depends(get_db),
+):
+    # Scoring is CPU-bound: a sync route keeps it in the threadpool instead of on the event loop.
+    return submit_journey_answers(payload, x_result_owner_token=x_result_owner_token, db=db)
+
+
+def submit_journey_answers(
+    payload: JourneySubmitAnswersRequest,
+    *,
+    x_result_owner_token: Optional[str] = None,
+    db: Session,
 ):
     test_run = _require_owned_test_run(
         db,
         test_run_id=payload.test_run_id,
         owner_token=x_result_owner_token,
     )
+    if test_run.status == RUN_STATUS_COMPLETED:
+        return _replay_submit_response(db, test_run, payload)
     if test_run.status != RUN_STATUS_STARTED:
         raise HTTPException(status_code=400, detail="test_run is not active")
     if _is_run_expired(test_run):
@@ -669,77 +788,127 @@ def submit_journey_answers(
     if test_run.version_id != payload.version_id:
         raise HTTPException(status_code=400, detail="version_id does not match test_run_id")
 
-    scenario_query = db.query(Scenario).filter(Scenario.version_id == payload.version_id)
-    if test_run.scenario_set_code:
-        scenario_query = scenario_query.filter(Scenario.scenario_set_code == test_run.scenario_set_code)
-    scenario_rows = scenario_query.all()
-    valid_scenario_codes = {row.scenario_code for row in scenario_rows}
-    if not valid_scenario_codes:
+    content = get_scenario_set_content(db, payload.version_id, test_run.scenario_set_code or None)
+    if not content.scenario_codes:
         raise HTTPException(status_code=400, detail=f"No scenarios found for version '{payload.version_id}'")
 
-    option_codes_by_scenario = _load_option_codes_by_scenario(db=db, version_id=payload.version_id)
+    plan = get_version_scoring_plan(db, payload.version_id)
+    if payload.option_indices is not None:
+        # Compact submissions are decoded straight to scoring rows; no per-answer string handling.
+        compact = _decode_compact_answers(db, test_run, payload)
+        normalized_answers = compact.answers
+        try:
+            outcome = compute_hybrid_outcome_from_rows_cached(
+                plan=plan,
+                canonical=compact.canonical,
+                option_rows=compact.option_rows,
+                top_model_n=3,
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+    else:
+        submitted_answers = payload.answers or _recorded_answers(db, test_run)
+        try:
+            normalized_answers = _validate_answer_payload(
+                answers=submitted_answers,
+                valid_scenario_codes=content.scenario_codes,
+                option_codes_by_scenario=content.option_codes_by_scenario,
+            )
+            progress = journey_progress.get(test_run.id)
+            answered = {answer.scenario_code: answer.option_code for answer in normalized_answers}
+            if progress is not None and progress.matches(plan, answered):
+                outcome = compute_hybrid_outcome_from_raw(plan, progress.raw_scores, top_model_n=3)
+            else:
+                outcome = compute_hybrid_outcome_cached(plan=plan, answers=normalized_answers, top_model_n=3)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+    unflushed_answers = journey_progress.detach(test_run.id)
+
+    test_run.submitted_at = datetime.now(timezone.utc)
+    _touch_test_run(test_run)
+    test_run.status = RUN_STATUS_COMPLETED
     try:
-        normalized_answers = _validate_answer_payload(
-            answers=payload.answers,
-            valid_scenario_codes=valid_scenario_codes,
-            option_codes_by_scenario=option_codes_by_scenario,
+        persist_submission(
+            db,
+            test_run_id=test_run.id,
+            answers=normalized_answers,
+            outcome=outcome,
+            layout=build_result_layout(plan, content) if settings.PACKED_RESULT_STORAGE else None,
         )
-        outcome = compute_hybrid_outcome(
+        response = _build_submit_response(
             db=db,
             version_id=payload.version_id,
-            answers=normalized_answers,
-            top_model_n=3,
+            test_run_id=test_run.id,
+            outcome=outcome,
         )
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=str(exc))
-
-    db.query(Answer).filter(Answer.test_run_id == test_run.id).delete(synchronize_session=False)
-    db.query(ComputedGeneScore).filter(ComputedGeneScore.test_run_id == test_run.id).delete(
-        synchronize_session=False
-    )
-    db.query(ComputedModelMatch).filter(ComputedModelMatch.test_run_id == test_run.id).delete(
-        synchronize_session=False
-    )
+        test_run.result_jsonb = response.model_dump(mode="json")
+        test_run.share_snapshots_jsonb = build_share_snapshots(response, completed_at=test_run.submitted_at)
+        db.commit()
+    except IntegrityError:
+        # A concurrent submit for the same run already wrote its results.
+        db.rollback()
+        if test_run.status == RUN_STATUS_COMPLETED:
+            return _replay_submit_response(db, test_run, payload)
+        journey_progress.restore(test_run.id, unflushed_answers)
+        raise HTTPException(status_code=409, detail="test_run already submitted")
+    except Exception:
+        db.rollback()
+        journey_progress.restore(test_run.id, unflushed_answers)
+        raise
+    return response
+
+
+@router.get("/{test_run_id}/result", response_model=JourneySubmitAnswersResponse)
+def get_journey_result_route(
+    test_run_id: int,
+    x_result_owner_token: Optional[str] = Header(default=None, alias="X-Result-Owner-Token"),
+    db: Session = Depends(get_db),
+):
+    # Sync like submit-answers: legacy runs are re-scored here.
+    return get_journey_result(test_run_id, x_result_owner_token=x_result_owner_token, db=db)
 
-    for answer in normalized_answers:
-        db.add(
-            Answer(
-                test_run_id=test_run.id,
-                scenario_code=answer.scenario_code,
-                option_code=answer.option_code,
-            )
-        )
 
-    for score in outcome.gene_scores:
-        db.add(
-            ComputedGeneScore(
-                test_run_id=test_run.id,
-                gene_code=score.gene_code,
-                raw_score=score.raw_score,
-                normalized_score=score.normalized_score,
-            )
-        )
+def get_journey_result(
+    test_run_id: int,
+    *,
+    x_result_owner_token: Optional[str] = None,
+    db: Session,
+):
+    test_run = _require_owned_test_run(
+        db,
+        test_run_id=test_run_id,
+        owner_token=x_result_owner_token,
+    )
+    if test_run.status != RUN_STATUS_COMPLETED:
+        raise HTTPException(status_code=400, detail="test_run is not completed")
+    if test_run.result_jsonb is not None:
+        return JourneySubmitAnswersResponse.model_validate(test_run.result_jsonb)
 
-    for match in outcome.model_matches:
-        db.add(
-            ComputedModelMatch(
-                test_run_id=test_run.id,
-                model_code=match.model_code,
-                similarity=match.similarity,
-                rank=match.rank,
-            )
+    # Runs completed before responses were stored: rebuild once from the stored answers and keep it.
+    answers = [
+        JourneyAnswer(scenario_code=scenario_code, option_code=option_code)
+        for scenario_code, option_code in sorted(load_answers(db, test_run.id).items())
+    ]
+    if not answers:
+        raise HTTPException(status_code=404, detail="Result not available")
+    try:
+        outcome = compute_hybrid_outcome_cached(
+            plan=get_version_scoring_plan(db, test_run.version_id),
+            answers=answers,
+            top_model_n=3,
         )
-
-    test_run.submitted_at = datetime.now(timezone.utc)
-    _touch_test_run(test_run)
-    test_run.status = RUN_STATUS_COMPLETED
-    db.commit()
-    return _build_submit_response(
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Result not available")
+    response = _build_submit_response(
         db=db,
-        version_id=payload.version_id,
+        version_id=test_run.version_id,
         test_run_id=test_run.id,
         outcome=outcome,
     )
+    test_run.result_jsonb = response.model_dump(mode="json")
+    db.commit()
+    return response
 
 
 @router.post("/cancel", response_model=JourneyCancelResponse)
@@ -758,6 +927,7 @@ def cancel_journey(
         test_run.status = RUN_STATUS_CANCELLED
         _touch_test_run(test_run)
         db.commit()
+        journey_progress.discard(test_run.id)
 
     return JourneyCancelResponse(
         test_run_id=test_run.id,
@@ -766,10 +936,20 @@ def cancel_journey(
 
 
 @router.post("/feedback", response_model=JourneyFeedbackResponse)
-def submit_journey_feedback(
+def submit_journey_feedback_route(
     payload: JourneyFeedbackRequest,
     x_result_owner_token: Optional[str] = Header(default=None, alias="X-Result-Owner-Token"),
     db: Session = Depends(get_db),
+):
+    # Sync like the result route: runs submitted before offers were stored are re-scored here.
+    return submit_journey_feedback(payload, x_result_owner_token=x_result_owner_token, db=db)
+
+
+def submit_journey_feedback(
+    payload: JourneyFeedbackRequest,
+    *,
+    x_result_owner_token: Optional[str] = None,
+    db: Session,
 ):
     test_run = _require_owned_test_run(
         db,
@@ -783,8 +963,7 @@ def submit_journey_feedback(
         payload.selected_activation_id.strip() if payload.selected_activation_id else None
     )
     if selected_activation_id:
-        allowed_activation_ids = _load_allowed_activation_ids(db=db, test_run=test_run)
-        if selected_activation_id not in allowed_activation_ids:
+        if not _activation_was_offered(db, test_run, selected_activation_id):
             raise HTTPException(
                 status_code=400,
                 detail=f"selected_activation_id '{selected_activation_id}' was not offered for this test_run",
@@ -807,9 +986,10 @@ def submit_journey_feedback(
             )
         )
 
-    _touch_test_run(test_run)
+    activity_tracker.touch(test_run)
     db.commit()
     stored_feedback = db.query(Feedback).filter(Feedback.test_run_id == payload.test_run_id).first()
+    _flush_activity_if_due(db)
     return JourneyFeedbackResponse(
         test_run_id=payload.test_run_id,
         accuracy_score=stored_feedback.accuracy_score if stored_feedback else None,
@@ -817,3 +997,133 @@ def submit_journey_feedback(
         selected_activation_id=test_run.selected_activation_id,
         status="recorded",
     )
+
+
+def resolve_cohort_content(
+    db: Session,
+    version_id: str,
+    scenario_set_code: Optional[str],
+) -> ScenarioSetContent:
+    set_codes = _load_scenario_set_codes(db, version_id)
+    if not set_codes:
+        raise HTTPException(status_code=400, detail=f"No scenarios found for version '{version_id}'")
+    if scenario_set_code is None:
+        if len(set_codes) != 1:
+            raise HTTPException(
+                status_code=400,
+                detail="scenario_set_code is required for versions with several scenario sets",
+            )
+        scenario_set_code = set_codes[0]
+    elif scenario_set_code not in set_codes:
+        raise HTTPException(status_code=400, detail=f"Unknown scenario_set_code '{scenario_set_code}'")
+    return get_scenario_set_content(db, version_id, scenario_set_code)
+
+
+def _cohort_record(row: CohortRow, **fields: object) -> Dict[str, object]:
+    record: Dict[str, object] = {"line": row.line_number, "respondent_id": row.respondent_id}
+    record.update(fields)
+    return record
+
+
+def submit_cohort_batch(
+    db: Session,
+    *,
+    content: ScenarioSetContent,
+    cohort_id: str,
+    rows: Sequence[CohortRow],
+) -> List[Dict[str, object]]:
+    """Score, store and commit one batch of cohort respondents; one result record per row.
+
+    Rows that fail validation get an ``error`` line and no run. Valid rows are
+    scored together with ``compute_hybrid_outcome_batch`` and written as
+    completed runs with one executemany per table.
+    """
+    version_id = content.version_id
+    plan = get_version_scoring_plan(db, version_id)
+    records: List[Optional[Dict[str, object]]] = [None] * len(rows)
+    accepted: List[int] = []
+    answer_sets: List[List[JourneyAnswer]] = []
+    for position, row in enumerate(rows):
+        if row.error is not None:
+            records[position] = _cohort_record(row, error=row.error)
+            continue
+        try:
+            answers = _validate_answer_payload(
+                answers=[
+                    JourneyAnswer(scenario_code=scenario_code, option_code=option_code)
+                    for scenario_code, option_code in sorted(row.answers.items())
+                ],
+                valid_scenario_codes=content.scenario_codes,
+                option_codes_by_scenario=content.option_codes_by_scenario,
+            )
+            for answer in answers:
+                if (answer.scenario_code, answer.option_code) not in plan.option_rows:
+                    raise ValueError(
+                        f"missing option weights for answer ({answer.scenario_code}, {answer.option_code})"
+                    )
+        except ValueError as exc:
+            records[position] = _cohort_record(row, error=str(exc))
+            continue
+        accepted.append(position)
+        answer_sets.append(answers)
+
+    if accepted:
+        outcomes = compute_hybrid_outcome_batch(plan, answer_sets, top_model_n=3)
+        now = datetime.now(timezone.utc)
+        owner_tokens = [new_owner_token() for _ in accepted]
+        test_run_ids = db.execute(
+            insert(TestRun).returning(TestRun.id, sort_by_parameter_order=True),
+            [
+                {
+                    "version_id": version_id,
+                    "session_id": f"cohort:{cohort_id}",
+                    "scenario_set_code": content.scenario_set_code,
+                    "status": RUN_STATUS_COMPLETED,
+                    "owner_token_hash": hash_capability_token(owner_token),
+                    "last_activity_at": now,
+                    "submitted_at": now,
+                }
+                for owner_token in owner_tokens
+            ],
+        ).scalars().all()
+        persist_new_submissions(
+            db,
+            list(zip(test_run_ids, answer_sets, outcomes)),
+            layout=build_result_layout(plan, content) if settings.PACKED_RESULT_STORAGE else None,
+        )
+
+        result_content = _load_result_content(db, version_id)
+        stored_results = []
+        for position, test_run_id, owner_token, outcome in zip(accepted, test_run_ids, owner_tokens, outcomes):
+            response = _build_submit_response(
+                db,
+                version_id=version_id,
+                test_run_id=test_run_id,
+                outcome=outcome,
+                result_content=result_content,
+            )
+            result = response.model_dump(mode="json")
+            stored_results.append(
+                {
+                    "stored_run_id": test_run_id,
+                    "stored_result": result,
+                    "stored_share_snapshots": build_share_snapshots(response, completed_at=now),
+                }
+            )
+            records[position] = _cohort_record(
+                rows[position],
+                test_run_id=test_run_id,
+                owner_token=owner_token,
+                result=result,
+            )
+        db.connection().execute(
+            update(TestRun.__table__)
+            .where(TestRun.__table__.c.id == bindparam("stored_run_id"))
+            .values(
+                result_jsonb=bindparam("stored_result"),
+                share_snapshots_jsonb=bindparam("stored_share_snapshots"),
+            ),
+            stored_results,
+        )
+    db.commit()
+    return records
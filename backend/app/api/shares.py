@@ -1,22 +1,25 @@
-from collections import OrderedDict, deque
+import logging
 from datetime import datetime, timedelta, timezone
-from threading import Lock
-from time import monotonic
-from typing import Deque, Optional
+from typing import Optional
 
 from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, undefer
 
 from app.core.config import settings
+from app.core.rate_limit import rate_limiter
+from app.core.share_cache import shared_report_cache
 from app.core.result_sharing import (
     build_shared_result_snapshot,
     hash_capability_token,
     new_share_seed,
     share_token_from_seed,
+    share_token_rejection,
+    shared_snapshot_from_stored,
     verify_owner_token,
 )
-from app.db.session import get_db
+from app.db.session import get_async_db, new_async_session
 from app.models import ResultShare, TestRun
 from app.schemas.share import (
     CreateResultShareRequest,
@@ -25,40 +28,31 @@ from app.schemas.share import (
 )
 
 router = APIRouter()
-_rate_buckets: "OrderedDict[str, Deque[float]]" = OrderedDict()
-_rate_lock = Lock()
-_MAX_RATE_LIMIT_KEYS = 5000
+SHARED_REPORT_HEADERS = {"Cache-Control": "no-store", "Referrer-Policy": "no-referrer"}
+logger = logging.getLogger(__name__)
 
 
-def _rate_limit(request: Request, *, scope: str, limit: int, window_seconds: int) -> None:
+async def _rate_limit(request: Request, *, scope: str, limit: int, window_seconds: int) -> None:
     client_ip = request.headers.get("fly-client-ip") or (
         request.client.host if request.client else "unknown"
     )
-    bucket_key = f"{scope}:{client_ip}"
-    now = monotonic()
-    cutoff = now - window_seconds
-    with _rate_lock:
-        bucket = _rate_buckets.get(bucket_key)
-        if bucket is None:
-            while len(_rate_buckets) >= _MAX_RATE_LIMIT_KEYS:
-                _rate_buckets.popitem(last=False)
-            bucket = deque()
-            _rate_buckets[bucket_key] = bucket
-        else:
-            _rate_buckets.move_to_end(bucket_key)
-        while bucket and bucket[0] < cutoff:
-            bucket.popleft()
-        if len(bucket) >= limit:
-            raise HTTPException(status_code=429, detail="Too many requests")
-        bucket.append(now)
+    if not rate_limiter.hit(f"{scope}:{client_ip}", limit, window_seconds):
+        raise HTTPException(status_code=429, detail="Too many requests")
+    if rate_limiter.sync_due():
+        try:
+            async with new_async_session() as db:
+                await db.run_sync(rate_limiter.sync)
+        except Exception:
+            # Local limits keep applying; the buffered counts go out with the next sync.
+            logger.exception("Rate limit sync failed")
 
 
-def _limit_share_creation(request: Request) -> None:
-    _rate_limit(request, scope="create", limit=10, window_seconds=60 * 60)
+async def _limit_share_creation(request: Request) -> None:
+    await _rate_limit(request, scope="create", limit=10, window_seconds=60 * 60)
 
 
-def _limit_share_reads(request: Request) -> None:
-    _rate_limit(request, scope="read", limit=120, window_seconds=60 * 60)
+async def _limit_share_reads(request: Request) -> None:
+    await _rate_limit(request, scope="read", limit=120, window_seconds=60 * 60)
 
 
 def _aware(value: datetime) -> datetime:
@@ -72,28 +66,33 @@ def _share_response(row: ResultShare) -> CreateResultShareResponse:
     return CreateResultShareResponse(token=token, expires_at=_aware(row.expires_at))
 
 
-def _cleanup_expired_shares(db: Session, now: datetime) -> int:
-    deleted = (
-        db.query(ResultShare)
-        .filter(ResultShare.expires_at <= now)
-        .delete(synchronize_session=False)
-    )
-    if deleted:
-        db.commit()
-    return deleted
-
-
 @router.post(
     "/journey/shares",
     response_model=CreateResultShareResponse,
     dependencies=[Depends(_limit_share_creation)],
 )
-def create_result_share(
+async def create_result_share_route(
     payload: CreateResultShareRequest,
     x_result_owner_token: Optional[str] = Header(default=None, alias="X-Result-Owner-Token"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await db.run_sync(
+        lambda session: create_result_share(payload, x_result_owner_token=x_result_owner_token, db=session)
+    )
+
+
+def create_result_share(
+    payload: CreateResultShareRequest,
+    *,
+    x_result_owner_token: Optional[str] = None,
+    db: Session,
 ):
-    test_run = db.query(TestRun).filter(TestRun.id == payload.test_run_id).first()
+    test_run = (
+        db.query(TestRun)
+        .options(undefer(TestRun.share_snapshots_jsonb))
+        .filter(TestRun.id == payload.test_run_id)
+        .first()
+    )
     if not test_run or not x_result_owner_token or not verify_owner_token(test_run, x_result_owner_token):
         raise HTTPException(status_code=404, detail="Journey not found")
     if test_run.status != "completed" or not test_run.submitted_at:
@@ -102,7 +101,6 @@ def create_result_share(
         raise HTTPException(status_code=400, detail="Select an activation before sharing")
 
     now = datetime.now(timezone.utc)
-    _cleanup_expired_shares(db, now)
     row = (
         db.query(ResultShare)
         .filter(
@@ -115,13 +113,17 @@ def create_result_share(
     if row and _aware(row.expires_at) > now:
         return _share_response(row)
 
-    snapshot = build_shared_result_snapshot(db, test_run=test_run, language=payload.language)
+    # Reports are built at submit; only runs submitted before that rebuild theirs here.
+    snapshot_data = shared_snapshot_from_stored(test_run, language=payload.language)
+    if snapshot_data is None:
+        snapshot = build_shared_result_snapshot(db, test_run=test_run, language=payload.language)
+        snapshot_data = snapshot.model_dump(mode="json")
     seed = new_share_seed()
     token = share_token_from_seed(seed)
     expires_at = now + timedelta(days=settings.RESULT_SHARE_TTL_DAYS)
-    snapshot_data = snapshot.model_dump(mode="json")
 
     if row:
+        shared_report_cache.discard(row.token_hash)
         row.token_seed = seed
         row.token_hash = hash_capability_token(token)
         row.snapshot_jsonb = snapshot_data
@@ -163,21 +165,46 @@ def create_result_share(
     response_model=SharedJourneyResultResponse,
     dependencies=[Depends(_limit_share_reads)],
 )
-def get_shared_result(
-    response: Response,
+async def get_shared_result_route(
     x_result_share_token: Optional[str] = Header(default=None, alias="X-Result-Share-Token"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    response.headers["Cache-Control"] = "no-store"
-    response.headers["Referrer-Policy"] = "no-referrer"
-    if not x_result_share_token or len(x_result_share_token) > 256:
-        raise HTTPException(status_code=404, detail="Shared result not found")
+    # Cache hits never check out a connection: the session only connects on its first query.
+    return await db.run_sync(lambda session: get_shared_result(x_result_share_token=x_result_share_token, db=session))
 
-    row = (
-        db.query(ResultShare)
-        .filter(ResultShare.token_hash == hash_capability_token(x_result_share_token))
-        .first()
-    )
-    if not row or _aware(row.expires_at) <= datetime.now(timezone.utc):
+
+def _shared_token_hash(token: Optional[str]) -> str:
+    if not token or len(token) > 256:
         raise HTTPException(status_code=404, detail="Shared result not found")
-    return SharedJourneyResultResponse.model_validate(row.snapshot_jsonb)
+    return hash_capability_token(token)
+
+
+def get_shared_result(
+    *,
+    x_result_share_token: Optional[str] = None,
+    db: Session,
+    now: Optional[datetime] = None,
+) -> Response:
+    """Serve the share's serialized snapshot, from ``shared_report_cache`` when possible.
+
+    A share deleted by another process stays readable here until the cached
+    body ages out, at most ``SHARED_REPORT_CACHE_TTL_SECONDS``.
+    """
+    token_hash = _shared_token_hash(x_result_share_token)
+    now = now or datetime.now(timezone.utc)
+    body = shared_report_cache.get(token_hash, now)
+    if body is None:
+        # Malformed, forged and recently missing tokens never reach the database.
+        rejection = share_token_rejection(x_result_share_token)
+        if rejection is not None:
+            shared_report_cache.record_rejection(rejection)
+            raise HTTPException(status_code=404, detail="Shared result not found")
+        if shared_report_cache.is_known_missing(token_hash, now):
+            raise HTTPException(status_code=404, detail="Shared result not found")
+        row = db.query(ResultShare).filter(ResultShare.token_hash == token_hash).first()
+        if not row or _aware(row.expires_at) <= now:
+            shared_report_cache.remember_missing(token_hash, now)
+            raise HTTPException(status_code=404, detail="Shared result not found")
+        body = SharedJourneyResultResponse.model_validate(row.snapshot_jsonb).model_dump_json().encode("utf-8")
+        shared_report_cache.put(token_hash, body, _aware(row.expires_at), now)
+    return Response(content=body, media_type="application/json", headers=SHARED_REPORT_HEADERS)
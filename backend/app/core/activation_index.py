@@ -0,0 +1,223 @@
+"""Precompiled advice-trigger lookup for activation selection."""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from app.core.scoring_plan import AdviceItemRecord, AdviceTriggerRecord
+
+
+# Resolved trigger type -> gene role whose gene_code must equal the trigger's gene_code.
+GENE_ROLE_TRIGGER_TYPES: Mapping[str, Tuple[str, ...]] = MappingProxyType(
+    {
+        "TOP_GENE": ("dominant",),
+        "SECONDARY_GENE": ("secondary",),
+        "SUPPORT_GENE": ("support",),
+        "TOP_2_GENE": ("dominant", "secondary"),
+    }
+)
+TRIGGER_TYPE_ALIASES: Mapping[str, str] = MappingProxyType(
+    {
+        "TOP_GENE": "TOP_GENE",
+        "SECONDARY_GENE": "SECONDARY_GENE",
+        "SUPPORT_GENE": "SUPPORT_GENE",
+        "TOP_2_GENE": "TOP_2_GENE",
+        "TOP2_GENE": "TOP_2_GENE",
+        "TOP_MODEL": "TOP_MODEL",
+        "BEST_MODEL": "TOP_MODEL",
+        "ANY": "ANY",
+        "ANY_GENE": "ANY",
+        "ANY_MODEL": "ANY",
+    }
+)
+
+CandidateKey = Tuple[int, float, str, str]
+
+
+@dataclass(frozen=True)
+class CompiledTrigger:
+    trigger_id: str
+    gene_code: Optional[str]
+    model_code: Optional[str]
+    min_score: float
+    max_score: float
+    advice: "AdviceItemRecord"
+
+
+@dataclass(frozen=True)
+class TriggerBucket:
+    """Triggers sharing a lookup key, sorted by ``min_score``."""
+
+    triggers: Tuple[CompiledTrigger, ...]
+    min_scores: Tuple[float, ...]
+
+    @classmethod
+    def from_triggers(cls, triggers: Iterable[CompiledTrigger]) -> "TriggerBucket":
+        ordered = tuple(sorted(triggers, key=lambda trigger: (trigger.min_score, trigger.trigger_id)))
+        return cls(triggers=ordered, min_scores=tuple(trigger.min_score for trigger in ordered))
+
+    def reachable(self, gene_score: Optional[float]) -> Sequence[CompiledTrigger]:
+        """Triggers whose ``min_score`` admits ``gene_score`` (all of them when unknown)."""
+        if gene_score is None:
+            return self.triggers
+        return self.triggers[: bisect_right(self.min_scores, gene_score)]
+
+
+@dataclass(frozen=True)
+class ChannelTriggerIndex:
+    gene_triggers: Mapping[str, Mapping[Optional[str], TriggerBucket]]
+    model_triggers: Mapping[Optional[str], TriggerBucket]
+    any_triggers: TriggerBucket
+    fallback: Optional["AdviceItemRecord"]
+
+
+@dataclass(frozen=True)
+class ActivationIndex:
+    channels: Mapping[str, ChannelTriggerIndex]
+
+
+_EMPTY_BUCKET = TriggerBucket(triggers=(), min_scores=())
+_EMPTY_CHANNEL = ChannelTriggerIndex(
+    gene_triggers=MappingProxyType({}),
+    model_triggers=MappingProxyType({}),
+    any_triggers=_EMPTY_BUCKET,
+    fallback=None,
+)
+
+
+def _freeze_buckets(grouped: Dict[Optional[str], List[CompiledTrigger]]) -> Mapping[Optional[str], TriggerBucket]:
+    return MappingProxyType({key: TriggerBucket.from_triggers(triggers) for key, triggers in grouped.items()})
+
+
+def compile_activation_index(
+    advice_items: Sequence["AdviceItemRecord"],
+    triggers: Sequence["AdviceTriggerRecord"],
+) -> ActivationIndex:
+    """Group triggers by channel, resolved type and target code.
+
+    Triggers pointing at unknown advice or using an unknown type can never
+    match, so they are dropped here instead of being re-checked per request.
+    """
+    advice_by_id = {item.advice_id: item for item in advice_items}
+
+    gene_groups: Dict[str, Dict[str, Dict[Optional[str], List[CompiledTrigger]]]] = {}
+    model_groups: Dict[str, Dict[Optional[str], List[CompiledTrigger]]] = {}
+    any_groups: Dict[str, List[CompiledTrigger]] = {}
+    for trigger in triggers:
+        advice = advice_by_id.get(trigger.advice_id)
+        resolved_type = TRIGGER_TYPE_ALIASES.get(trigger.trigger_type.upper())
+        if advice is None or resolved_type is None:
+            continue
+
+        compiled = CompiledTrigger(
+            trigger_id=trigger.trigger_id,
+            gene_code=trigger.gene_code,
+            model_code=trigger.model_code,
+            min_score=float(trigger.min_score),
+            max_score=float(trigger.max_score),
+            advice=advice,
+        )
+        if resolved_type == "ANY":
+            any_groups.setdefault(trigger.channel, []).append(compiled)
+        elif resolved_type == "TOP_MODEL":
+            model_groups.setdefault(trigger.channel, {}).setdefault(trigger.model_code, []).append(compiled)
+        else:
+            (
+                gene_groups.setdefault(trigger.channel, {})
+                .setdefault(resolved_type, {})
+                .setdefault(trigger.gene_code, [])
+                .append(compiled)
+            )
+
+    fallbacks: Dict[str, AdviceItemRecord] = {}
+    for item in advice_items:
+        current = fallbacks.get(item.channel)
+        if current is None or (-int(item.priority), item.advice_id) < (-int(current.priority), current.advice_id):
+            fallbacks[item.channel] = item
+
+    channels = set(gene_groups) | set(model_groups) | set(any_groups) | set(fallbacks)
+    return ActivationIndex(
+        channels=MappingProxyType(
+            {
+                channel: ChannelTriggerIndex(
+                    gene_triggers=MappingProxyType(
+                        {
+                            resolved_type: _freeze_buckets(grouped)
+                            for resolved_type, grouped in gene_groups.get(channel, {}).items()
+                        }
+                    ),
+                    model_triggers=_freeze_buckets(model_groups.get(channel, {})),
+                    any_triggers=TriggerBucket.from_triggers(any_groups.get(channel, [])),
+                    fallback=fallbacks.get(channel),
+                )
+                for channel in channels
+            }
+        )
+    )
+
+
+def _candidate_key(
+    trigger: CompiledTrigger,
+    gene_scores: Mapping[str, float],
+    model_scores: Mapping[str, float],
+) -> Optional[CandidateKey]:
+    match_score = 0.0
+    if trigger.gene_code:
+        gene_score = gene_scores.get(trigger.gene_code)
+        if gene_score is None or not trigger.min_score <= gene_score <= trigger.max_score:
+            return None
+        match_score = max(match_score, gene_score)
+
+    if trigger.model_code:
+        model_score = model_scores.get(trigger.model_code)
+        if model_score is None or not trigger.min_score <= model_score <= trigger.max_score:
+            return None
+        match_score = max(match_score, model_score)
+
+    # Sorting ascending on this key gives priority desc, match desc, advice_id, trigger_id.
+    return (-int(trigger.advice.priority), -round(match_score, 4), trigger.advice.advice_id, trigger.trigger_id)
+
+
+def select_channel_trigger(
+    index: ActivationIndex,
+    channel: str,
+    *,
+    gene_scores: Mapping[str, float],
+    role_genes: Mapping[str, str],
+    model_scores: Mapping[str, float],
+    top_model_code: Optional[str],
+) -> Optional[CompiledTrigger]:
+    """Return the best matching trigger for ``channel``, or None when nothing matches."""
+    channel_index = index.channels.get(channel, _EMPTY_CHANNEL)
+
+    reachable: List[CompiledTrigger] = []
+    for resolved_type, roles in GENE_ROLE_TRIGGER_TYPES.items():
+        by_gene = channel_index.gene_triggers.get(resolved_type)
+        if not by_gene:
+            continue
+        for gene_code in dict.fromkeys(role_genes.get(role) for role in roles):
+            bucket = by_gene.get(gene_code)
+            if bucket is not None:
+                reachable.extend(bucket.reachable(gene_scores.get(gene_code) if gene_code else None))
+
+    model_bucket = channel_index.model_triggers.get(top_model_code)
+    if model_bucket is not None:
+        reachable.extend(model_bucket.triggers)
+    reachable.extend(channel_index.any_triggers.triggers)
+
+    best_key: Optional[CandidateKey] = None
+    best_trigger: Optional[CompiledTrigger] = None
+    for trigger in reachable:
+        key = _candidate_key(trigger, gene_scores, model_scores)
+        if key is not None and (best_key is None or key < best_key):
+            best_key = key
+            best_trigger = trigger
+    return best_trigger
+
+
+def channel_fallback(index: ActivationIndex, channel: str) -> Optional["AdviceItemRecord"]:
+    return index.channels.get(channel, _EMPTY_CHANNEL).fallback
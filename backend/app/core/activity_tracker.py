@@ -0,0 +1,129 @@
+"""Coalesced ``test_runs.last_activity_at`` writes for journey endpoints."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from time import monotonic
+from typing import Dict, Optional
+
+from sqlalchemy import DateTime, Integer, bindparam, column, update, values
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import TestRun
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class ActivityTracker:
+    """Buffer run touches in memory and write them in batches.
+
+    A touch writes through onto the ORM row (persisted by the caller's commit)
+    only when the stored value is older than ``write_through_after``; otherwise
+    it is buffered and later flushed with one ``UPDATE ... FROM (VALUES ...)``.
+    A stored value is therefore never more than ``write_through_after`` behind,
+    which is what other API processes see when they check expiry. Due batches
+    are flushed by the next request and by the background write-behind task,
+    which also flushes what is left on shutdown.
+    """
+
+    def __init__(self, flush_interval_seconds: float, write_through_after: timedelta, flush_batch_size: int):
+        self.flush_interval_seconds = flush_interval_seconds
+        self.write_through_after = write_through_after
+        self.flush_batch_size = flush_batch_size
+        self._pending: Dict[int, datetime] = {}
+        self._last_flush = monotonic()
+        self._lock = Lock()
+
+    def touch(self, test_run: TestRun, now: Optional[datetime] = None) -> bool:
+        """Record activity on ``test_run``; True when the row itself was updated and needs a commit."""
+        now = now or datetime.now(timezone.utc)
+        stored = _aware(test_run.last_activity_at)
+        if stored is None or now - stored >= self.write_through_after:
+            test_run.last_activity_at = now
+            with self._lock:
+                self._pending.pop(test_run.id, None)
+            return True
+        with self._lock:
+            previous = self._pending.get(test_run.id)
+            if previous is None or now > previous:
+                self._pending[test_run.id] = now
+        return False
+
+    def last_activity(self, test_run: TestRun) -> Optional[datetime]:
+        """Latest of the buffered and the stored activity of ``test_run``."""
+        with self._lock:
+            buffered = self._pending.get(test_run.id)
+        stored = _aware(test_run.last_activity_at or test_run.created_at)
+        if buffered is None or (stored is not None and stored >= buffered):
+            return stored
+        return buffered
+
+    def discard(self, test_run_id: int) -> None:
+        with self._lock:
+            self._pending.pop(test_run_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pending.clear()
+
+    def flush_due(self) -> bool:
+        with self._lock:
+            return bool(self._pending) and (
+                len(self._pending) >= self.flush_batch_size
+                or monotonic() - self._last_flush >= self.flush_interval_seconds
+            )
+
+    def flush(self, db: Session) -> int:
+        """Write all buffered touches in one statement and commit."""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            self._last_flush = monotonic()
+        if not batch:
+            return 0
+
+        try:
+            if db.get_bind().dialect.name == "postgresql":
+                touched = values(
+                    column("test_run_id", Integer),
+                    column("last_activity_at", DateTime(timezone=True)),
+                    name="touched",
+                ).data(list(batch.items()))
+                db.execute(
+                    update(TestRun)
+                    .where(TestRun.id == touched.c.test_run_id, TestRun.last_activity_at < touched.c.last_activity_at)
+                    .values(last_activity_at=touched.c.last_activity_at)
+                    .execution_options(synchronize_session=False)
+                )
+            else:
+                # Other dialects lack a VALUES alias with column names; one executemany instead.
+                db.connection().execute(
+                    update(TestRun.__table__)
+                    .where(
+                        TestRun.__table__.c.id == bindparam("touched_id"),
+                        TestRun.__table__.c.last_activity_at < bindparam("touched_at"),
+                    )
+                    .values(last_activity_at=bindparam("touched_at")),
+                    [{"touched_id": run_id, "touched_at": touched_at} for run_id, touched_at in batch.items()],
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                for test_run_id, touched_at in batch.items():
+                    if self._pending.get(test_run_id, touched_at) <= touched_at:
+                        self._pending[test_run_id] = touched_at
+            raise
+        return len(batch)
+
+
+activity_tracker = ActivityTracker(
+    flush_interval_seconds=settings.ACTIVITY_FLUSH_INTERVAL_SECONDS,
+    write_through_after=timedelta(seconds=settings.ACTIVITY_WRITE_THROUGH_SECONDS),
+    flush_batch_size=settings.ACTIVITY_FLUSH_BATCH_SIZE,
+)
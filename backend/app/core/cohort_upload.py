@@ -0,0 +1,125 @@
+"""Incremental parsing of bulk cohort uploads (CSV or NDJSON)."""
+
+from __future__ import annotations
+
+import csv
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+COHORT_FORMAT_CSV = "csv"
+COHORT_FORMAT_NDJSON = "ndjson"
+COHORT_CONTENT_TYPES = {
+    "text/csv": COHORT_FORMAT_CSV,
+    "application/x-ndjson": COHORT_FORMAT_NDJSON,
+    "application/ndjson": COHORT_FORMAT_NDJSON,
+    "application/jsonl": COHORT_FORMAT_NDJSON,
+}
+RESPONDENT_ID_COLUMN = "respondent_id"
+
+
+def cohort_format_for_content_type(content_type: Optional[str]) -> str:
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    if media_type not in COHORT_CONTENT_TYPES:
+        raise ValueError("Upload must be text/csv or application/x-ndjson")
+    return COHORT_CONTENT_TYPES[media_type]
+
+
+@dataclass(frozen=True)
+class CohortRow:
+    """One respondent of an upload; ``error`` is set when the line could not be read."""
+
+    line_number: int
+    respondent_id: Optional[str]
+    answers: Dict[str, str] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+class CohortParser:
+    """Turn uploaded byte chunks into ``CohortRow``s while holding at most one line.
+
+    CSV uploads start with a ``respondent_id,<scenario_code>,...`` header and
+    carry one respondent per line with option codes in the scenario columns.
+    NDJSON uploads carry one ``{"respondent_id": ..., "answers": {scenario_code:
+    option_code}}`` object per line. Quoted CSV fields must not span lines.
+    A line longer than ``max_line_bytes`` encoded bytes ends the upload.
+    """
+
+    def __init__(self, upload_format: str, max_line_bytes: int):
+        self.upload_format = upload_format
+        self.max_line_bytes = max_line_bytes
+        self._buffer = b""
+        self._line_number = 0
+        self._header: Optional[List[str]] = None
+
+    def feed(self, chunk: bytes) -> List[CohortRow]:
+        # Lines are split and measured as raw bytes; each is decoded once it is complete.
+        *lines, self._buffer = (self._buffer + chunk).split(b"\n")
+        for offset, line in enumerate(lines + [self._buffer]):
+            if len(line) > self.max_line_bytes:
+                raise ValueError(f"line {self._line_number + offset + 1} exceeds {self.max_line_bytes} bytes")
+        return self._parse_lines(lines)
+
+    def close(self) -> List[CohortRow]:
+        lines, self._buffer = [self._buffer], b""
+        rows = self._parse_lines(lines)
+        if self.upload_format == COHORT_FORMAT_CSV and self._header is None:
+            raise ValueError("CSV upload has no header row")
+        return rows
+
+    def _parse_lines(self, lines: List[bytes]) -> List[CohortRow]:
+        rows: List[CohortRow] = []
+        for raw_line in lines:
+            self._line_number += 1
+            try:
+                line = raw_line.decode("utf-8-sig" if self._line_number == 1 else "utf-8").rstrip("\r")
+            except UnicodeDecodeError:
+                raise ValueError(f"line {self._line_number} is not valid UTF-8")
+            if not line.strip():
+                continue
+            if self.upload_format == COHORT_FORMAT_CSV:
+                row = self._parse_csv(line)
+            else:
+                row = self._parse_ndjson(line)
+            if row is not None:
+                rows.append(row)
+        return rows
+
+    def _parse_csv(self, line: str) -> Optional[CohortRow]:
+        cells = [cell.strip() for cell in next(csv.reader([line]))]
+        if self._header is None:
+            if RESPONDENT_ID_COLUMN not in cells:
+                raise ValueError(f"CSV header must include a '{RESPONDENT_ID_COLUMN}' column")
+            self._header = cells
+            return None
+        if len(cells) != len(self._header):
+            return CohortRow(
+                line_number=self._line_number,
+                respondent_id=None,
+                error=f"Expected {len(self._header)} columns, got {len(cells)}",
+            )
+        values = dict(zip(self._header, cells))
+        respondent_id = values.pop(RESPONDENT_ID_COLUMN) or None
+        return CohortRow(
+            line_number=self._line_number,
+            respondent_id=respondent_id,
+            answers={scenario_code: option_code for scenario_code, option_code in values.items() if option_code},
+        )
+
+    def _parse_ndjson(self, line: str) -> CohortRow:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return CohortRow(line_number=self._line_number, respondent_id=None, error="Invalid JSON")
+        if not isinstance(record, dict) or not isinstance(record.get("answers"), dict):
+            return CohortRow(line_number=self._line_number, respondent_id=None, error="Expected an object with answers")
+        respondent_id = record.get(RESPONDENT_ID_COLUMN)
+        respondent_id = None if respondent_id is None else str(respondent_id)
+        answers = record["answers"]
+        if not all(isinstance(value, str) for value in answers.values()):
+            return CohortRow(
+                line_number=self._line_number,
+                respondent_id=respondent_id,
+                error="Answer option codes must be strings",
+            )
+        return CohortRow(line_number=self._line_number, respondent_id=respondent_id, answers=answers)
@@ -0,0 +1,123 @@
+"""Compact journey answers: one option index per scenario of a set.
+
+A compact submission is the list of option indices in scenario order, each
+index pointing into the scenario's options sorted by ``option_code`` (the
+order of ``ScenarioSetContent``). It is only accepted together with the
+set's ``content_hash``, so indices are never decoded against other content.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.hybrid_engine import JourneyAnswer
+from app.core.scenario_content import ScenarioSetContent
+from app.core.scoring_plan import VersionScoringPlan, register_plan_invalidation_listener
+
+NO_OPTION_ROW = -1
+
+
+@dataclass(frozen=True)
+class CompactAnswers:
+    """Decoded compact answers, in ``scenario_code`` order like the outcome cache key."""
+
+    canonical: Tuple[Tuple[str, str], ...]
+    option_rows: np.ndarray
+
+    @property
+    def answers(self) -> List[JourneyAnswer]:
+        return [JourneyAnswer(scenario_code=scenario, option_code=option) for scenario, option in self.canonical]
+
+
+@dataclass(frozen=True, eq=False)
+class CompactAnswerIndex:
+    """Option codes and ``plan.option_gene_weights`` rows of one set, by scenario position."""
+
+    content_hash: str
+    scenario_codes: Tuple[str, ...]
+    option_codes: Tuple[Tuple[str, ...], ...]
+    option_rows: Tuple[np.ndarray, ...]
+    canonical_positions: Tuple[int, ...]
+
+    def decode(self, option_indices: Sequence[int]) -> CompactAnswers:
+        if len(option_indices) != len(self.scenario_codes):
+            raise ValueError(
+                f"Expected {len(self.scenario_codes)} option indices, got {len(option_indices)}"
+            )
+        canonical: List[Tuple[str, str]] = []
+        rows = np.empty(len(self.canonical_positions), dtype=np.intp)
+        for slot, position in enumerate(self.canonical_positions):
+            option_index = option_indices[position]
+            scenario_code = self.scenario_codes[position]
+            if not 0 <= option_index < len(self.option_codes[position]):
+                raise ValueError(f"Unknown option index {option_index} for scenario '{scenario_code}'")
+            row = self.option_rows[position][option_index]
+            option_code = self.option_codes[position][option_index]
+            if row == NO_OPTION_ROW:
+                raise ValueError(f"missing option weights for answer ({scenario_code}, {option_code})")
+            canonical.append((scenario_code, option_code))
+            rows[slot] = row
+        return CompactAnswers(canonical=tuple(canonical), option_rows=rows)
+
+
+def build_compact_answer_index(plan: VersionScoringPlan, content: ScenarioSetContent) -> CompactAnswerIndex:
+    scenario_codes = tuple(record.scenario_code for record in content.scenarios)
+    option_codes = tuple(tuple(option.option_code for option in record.options) for record in content.scenarios)
+    option_rows = tuple(
+        np.array(
+            [plan.option_rows.get((scenario_code, option_code), NO_OPTION_ROW) for option_code in codes],
+            dtype=np.intp,
+        )
+        for scenario_code, codes in zip(scenario_codes, option_codes)
+    )
+    return CompactAnswerIndex(
+        content_hash=content.content_hash,
+        scenario_codes=scenario_codes,
+        option_codes=option_codes,
+        option_rows=option_rows,
+        canonical_positions=tuple(sorted(range(len(scenario_codes)), key=scenario_codes.__getitem__)),
+    )
+
+
+IndexKey = Tuple[str, str, str]
+
+# Least recently used first; entries for superseded content age out once the bound is reached.
+_indexes: "OrderedDict[IndexKey, CompactAnswerIndex]" = OrderedDict()
+_indexes_lock = Lock()
+
+
+def get_compact_answer_index(plan: VersionScoringPlan, content: ScenarioSetContent) -> CompactAnswerIndex:
+    """Return the cached index for the plan/content pair, building it on first use."""
+    key: IndexKey = (plan.version_id, plan.content_fingerprint, content.content_hash)
+    with _indexes_lock:
+        cached = _indexes.get(key)
+        if cached is not None:
+            _indexes.move_to_end(key)
+            return cached
+
+    index = build_compact_answer_index(plan, content)
+    with _indexes_lock:
+        _indexes[key] = index
+        _indexes.move_to_end(key)
+        while len(_indexes) > settings.COMPACT_ANSWER_INDEX_MAX_ENTRIES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def invalidate_compact_answer_indexes(version_id: Optional[str] = None) -> None:
+    """Drop cached indexes (all versions when ``version_id`` is None)."""
+    with _indexes_lock:
+        if version_id is None:
+            _indexes.clear()
+            return
+        for key in [key for key in _indexes if key[0] == version_id]:
+            del _indexes[key]
+
+
+register_plan_invalidation_listener(invalidate_compact_answer_indexes)
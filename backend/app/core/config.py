@@ -1,13 +1,27 @@
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import List
 
 
+# Longest a deleted share may still be served from another process's report cache.
+SHARED_REPORT_CACHE_MAX_TTL_SECONDS = 300
+
+
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
 
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
     DATABASE_URL: str
+    # Connection pools per API process: sync (threadpool routes, scripts) and async (asyncpg routes).
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    ASYNC_DB_POOL_SIZE: int = 5
+    ASYNC_DB_MAX_OVERFLOW: int = 5
+    # Upper bound for both pools together; processes x budget must stay below Postgres max_connections.
+    DB_CONNECTION_BUDGET: int = 25
+    # Worker processes per API instance; uvicorn reads the same variable for --workers
+    WEB_CONCURRENCY: int = 1
     SECRET_KEY: str
     CORS_ORIGINS: str = "http://localhost:3000"
     ENVIRONMENT: str = "development"
@@ -28,8 +42,86 @@ class Settings(BaseSettings):
     # Matching Settings
     TOP_N_MATCHES: int = 3
 
+    # Hybrid scoring content cache
+    SCORING_PLAN_TTL_SECONDS: int = 300
+    SCENARIO_CONTENT_TTL_SECONDS: int = 300
+    VERSION_REGISTRY_TTL_SECONDS: int = 60
+    # How often each process compares app_versions.content_revision to drop caches after an import elsewhere
+    CONTENT_REVISION_CHECK_SECONDS: int = 5
+    OUTCOME_CACHE_MAX_ENTRIES: int = 2048
+    OUTCOME_CACHE_TTL_SECONDS: int = 3600
+    COMPACT_ANSWER_INDEX_MAX_ENTRIES: int = 64
+
+    # Scenario set handed to new runs: "random" or "balanced" (least-allocated first)
+    SCENARIO_SET_ALLOCATION: str = "random"
+
+    # Per-answer journey progress (write-behind)
+    # Buffered answers are visible to their own process only: keep this on only while every
+    # request for a run reaches the same process (one worker, or sticky sessions across instances)
+    ANSWER_WRITE_BEHIND: bool = True
+    JOURNEY_PROGRESS_MAX_RUNS: int = 5000
+    ANSWER_FLUSH_BATCH_SIZE: int = 200
+    ANSWER_FLUSH_INTERVAL_SECONDS: int = 5
+    # Background check for due write-behind flushes (0 leaves flushing to requests and shutdown)
+    WRITE_BEHIND_POLL_SECONDS: int = 1
+
+    # Submitted results: one packed row per run instead of answer/score rows
+    PACKED_RESULT_STORAGE: bool = False
+
+    # Coalesced test_runs.last_activity_at writes
+    ACTIVITY_FLUSH_INTERVAL_SECONDS: int = 30
+    ACTIVITY_FLUSH_BATCH_SIZE: int = 500
+    ACTIVITY_WRITE_THROUGH_SECONDS: int = 900
+
+    # Bulk cohort submissions (admin): respondents scored and stored per batch
+    COHORT_BATCH_SIZE: int = 500
+    COHORT_MAX_LINE_BYTES: int = 65536
+
     # Result sharing
     RESULT_SHARE_TTL_DAYS: int = 30
+    SHARED_REPORT_CACHE_MAX_ENTRIES: int = 2000
+    # A share deleted by another process is served from this cache for at most this long (capped below)
+    SHARED_REPORT_CACHE_TTL_SECONDS: int = 300
+    SHARED_REPORT_NEGATIVE_CACHE_MAX_ENTRIES: int = 10000
+    SHARED_REPORT_NEGATIVE_CACHE_TTL_SECONDS: int = 60
+    # Background deletion of expired shares (0 disables the sweeper in this process)
+    SHARE_SWEEP_INTERVAL_SECONDS: int = 300
+    SHARE_SWEEP_BATCH_SIZE: int = 500
+    SHARE_SWEEP_BATCH_PAUSE_SECONDS: float = 0.2
+    # Share endpoint rate limits: "memory" (per process) or "postgres" (shared by all workers)
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_MAX_KEYS: int = 5000
+    RATE_LIMIT_SYNC_INTERVAL_SECONDS: float = 1.0
+    RATE_LIMIT_SYNC_BATCH_SIZE: int = 200
+    RATE_LIMIT_PRUNE_INTERVAL_SECONDS: int = 3600
+
+    @model_validator(mode="after")
+    def _pools_fit_connection_budget(self) -> "Settings":
+        pooled = self.DB_POOL_SIZE + self.DB_MAX_OVERFLOW + self.ASYNC_DB_POOL_SIZE + self.ASYNC_DB_MAX_OVERFLOW
+        if pooled > self.DB_CONNECTION_BUDGET:
+            raise ValueError(
+                f"Database pools allow {pooled} connections per process, over DB_CONNECTION_BUDGET="
+                f"{self.DB_CONNECTION_BUDGET}"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def _shared_report_staleness_is_bounded(self) -> "Settings":
+        if self.SHARED_REPORT_CACHE_TTL_SECONDS > SHARED_REPORT_CACHE_MAX_TTL_SECONDS:
+            raise ValueError(
+                f"SHARED_REPORT_CACHE_TTL_SECONDS may be at most {SHARED_REPORT_CACHE_MAX_TTL_SECONDS}: "
+                "deleted shares stay readable from other processes' caches that long"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def _answer_buffer_is_not_split_across_workers(self) -> "Settings":
+        if self.ANSWER_WRITE_BEHIND and self.WEB_CONCURRENCY > 1:
+            raise ValueError(
+                f"ANSWER_WRITE_BEHIND buffers answers per process and WEB_CONCURRENCY={self.WEB_CONCURRENCY} "
+                "spreads a run's requests over workers; set ANSWER_WRITE_BEHIND=false"
+            )
+        return self
 
     @property
     def cors_origins_list(self) -> List[str]:
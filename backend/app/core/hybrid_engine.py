@@ -3,20 +3,18 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from math import sqrt
-from typing import Dict, List, Mapping, Optional, Sequence, Tuple
-
-from sqlalchemy.orm import Session
-
-from app.models import (
-    AdviceItem,
-    AdviceTrigger,
-    Gene,
-    OptionWeight,
-    ProphetTraitGeneWeight,
-    QuranValueGeneWeight,
-    SahabaModel,
+from collections.abc import Sequence as SequenceABC
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.activation_index import (
+    ActivationIndex,
+    channel_fallback,
+    compile_activation_index,
+    select_channel_trigger,
 )
+from app.core.scoring_plan import AdviceItemRecord, AdviceTriggerRecord, VersionScoringPlan
 
 
 ACTIVATION_CHANNELS: Tuple[str, str, str] = ("behavior", "reflection", "social")
@@ -73,57 +71,206 @@ class ProphetTraitScoreResult:
     rank: int
 
 
-@dataclass(frozen=True)
-class HybridComputationResult:
-    gene_scores: List[GeneScoreResult]
-    model_matches: List[ModelMatchResult]
-    activation_items: List[ActivationItemResult]
-    quran_values: List[QuranValueScoreResult]
-    prophet_traits: List[ProphetTraitScoreResult]
+class _ColumnFrame(SequenceABC):
+    """Read-only sequence over NumPy columns whose items are built only for the positions read."""
 
+    __slots__ = ()
 
-def rank_gene_scores(raw_scores: Mapping[str, float]) -> List[GeneScoreResult]:
-    """Normalize and rank gene scores deterministically."""
-    if not raw_scores:
-        return []
+    def _item(self, position: int):
+        raise NotImplementedError
 
-    max_raw = max(raw_scores.values())
-    normalized_by_gene: Dict[str, float] = {}
-    for gene_code, raw_score in raw_scores.items():
-        if max_raw <= 0:
-            normalized = 0.0
-        else:
-            normalized = (raw_score / max_raw) * 100.0
-            normalized = max(0.0, min(100.0, normalized))
-        normalized_by_gene[gene_code] = round(normalized, 2)
-
-    ranked_pairs = sorted(raw_scores.items(), key=lambda pair: (-pair[1], pair[0]))
-    ranked_scores: List[GeneScoreResult] = []
-    for index, (gene_code, raw_score) in enumerate(ranked_pairs):
-        role = TOP_GENE_ROLES[index] if index < len(TOP_GENE_ROLES) else None
-        ranked_scores.append(
-            GeneScoreResult(
-                gene_code=gene_code,
-                raw_score=round(raw_score, 4),
-                normalized_score=normalized_by_gene[gene_code],
-                rank=index + 1,
-                role=role,
-            )
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._item(position) for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"{type(self).__name__} index out of range")
+        return self._item(index)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SequenceABC):
+            return NotImplemented
+        return len(self) == len(other) and all(left == right for left, right in zip(self, other))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r})"
+
+    def top(self, k: int) -> list:
+        return self[: max(k, 0)]
+
+
+class GeneScoreFrame(_ColumnFrame):
+    """Ranked gene scores of one outcome held as NumPy columns.
+
+    ``order`` maps rank position to a column of ``gene_codes``; ``raw_scores``
+    and ``normalized_scores`` are unrounded and already in rank order.
+    ``GeneScoreResult`` items are only built for the positions actually read,
+    so a response that shows the top three genes allocates three items.
+    """
+
+    __slots__ = ("gene_codes", "order", "raw_scores", "normalized_scores")
+
+    def __init__(
+        self,
+        gene_codes: Sequence[str],
+        order: np.ndarray,
+        raw_scores: np.ndarray,
+        normalized_scores: np.ndarray,
+    ):
+        self.gene_codes = gene_codes
+        self.order = order
+        self.raw_scores = raw_scores
+        self.normalized_scores = normalized_scores
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def _item(self, position: int) -> GeneScoreResult:
+        return GeneScoreResult(
+            gene_code=self.gene_codes[int(self.order[position])],
+            # Python round() keeps results identical to the stored/legacy values.
+            raw_score=round(float(self.raw_scores[position]), 4),
+            normalized_score=round(float(self.normalized_scores[position]), 2),
+            rank=position + 1,
+            role=TOP_GENE_ROLES[position] if position < len(TOP_GENE_ROLES) else None,
         )
 
-    return ranked_scores
+    def columns(self) -> Iterator[Tuple[str, float, float]]:
+        """Yield ``(gene_code, raw_score, normalized_score)`` in rank order without building items."""
+        for position, column in enumerate(self.order.tolist()):
+            yield (
+                self.gene_codes[column],
+                round(float(self.raw_scores[position]), 4),
+                round(float(self.normalized_scores[position]), 2),
+            )
+
+
+class ScoreFrame(_ColumnFrame):
+    """Top-ranked ``(code, score)`` results of one outcome held as NumPy columns.
+
+    Model matches and derived values keep ``indices`` into the plan's shared
+    ``codes`` and their already rounded ``scores`` in rank order; an item is
+    ``item_type(code, score, rank)``, built when its position is read.
+    """
+
+    __slots__ = ("codes", "indices", "scores", "item_type")
+
+    def __init__(self, codes: Sequence[str], indices: np.ndarray, scores: np.ndarray, item_type: type):
+        self.codes = codes
+        self.indices = indices
+        self.scores = scores
+        self.item_type = item_type
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def _item(self, position: int):
+        return self.item_type(self.codes[int(self.indices[position])], float(self.scores[position]), position + 1)
+
+
+def _score_frame(codes: Sequence[str], ranked: Sequence[Tuple[int, float]], item_type: type) -> ScoreFrame:
+    return ScoreFrame(
+        codes,
+        np.array([index for index, _ in ranked], dtype=np.intp),
+        np.array([score for _, score in ranked], dtype=np.float64),
+        item_type,
+    )
+
+
+def _raw_by_gene(gene_scores: Sequence[GeneScoreResult]) -> Dict[str, float]:
+    if isinstance(gene_scores, GeneScoreFrame):
+        return {gene_code: raw for gene_code, raw, _ in gene_scores.columns()}
+    return {score.gene_code: float(score.raw_score) for score in gene_scores}
 
 
-def _cosine_similarity(vector_a: Sequence[float], vector_b: Sequence[float]) -> float:
-    if len(vector_a) != len(vector_b):
-        raise ValueError("cosine vectors must have identical dimensions")
+def _normalized_by_gene(gene_scores: Sequence[GeneScoreResult]) -> Dict[str, float]:
+    if isinstance(gene_scores, GeneScoreFrame):
+        return {gene_code: normalized for gene_code, _, normalized in gene_scores.columns()}
+    return {score.gene_code: float(score.normalized_score) for score in gene_scores}
 
-    dot = sum(a * b for a, b in zip(vector_a, vector_b))
-    norm_a = sqrt(sum(a * a for a in vector_a))
-    norm_b = sqrt(sum(b * b for b in vector_b))
-    if norm_a == 0.0 or norm_b == 0.0:
-        return 0.0
-    return dot / (norm_a * norm_b)
+
+def _role_genes(gene_scores: Sequence[GeneScoreResult]) -> Dict[str, str]:
+    # Roles only ever sit on the leading ranks of a frame.
+    entries = gene_scores.top(len(TOP_GENE_ROLES)) if isinstance(gene_scores, GeneScoreFrame) else gene_scores
+    return {entry.role: entry.gene_code for entry in entries if entry.role}
+
+
+class OutcomeFrame:
+    """Result of one hybrid scoring run; scores and matches stay array-backed, activations are items."""
+
+    __slots__ = ("gene_scores", "model_matches", "activation_items", "quran_values", "prophet_traits")
+
+    def __init__(
+        self,
+        *,
+        gene_scores: Sequence[GeneScoreResult],
+        model_matches: Sequence[ModelMatchResult],
+        activation_items: List[ActivationItemResult],
+        quran_values: Sequence[QuranValueScoreResult],
+        prophet_traits: Sequence[ProphetTraitScoreResult],
+    ):
+        self.gene_scores = gene_scores
+        self.model_matches = model_matches
+        self.activation_items = activation_items
+        self.quran_values = quran_values
+        self.prophet_traits = prophet_traits
+
+    def _fields(self) -> Tuple[object, ...]:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, OutcomeFrame):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"OutcomeFrame({fields})"
+
+
+def _rank_gene_matrix(gene_codes: Sequence[str], raw_matrix: np.ndarray) -> List[GeneScoreFrame]:
+    """Normalize and rank each row of ``raw_matrix`` (columns follow sorted ``gene_codes``)."""
+    raw_matrix = np.asarray(raw_matrix, dtype=np.float64)
+    if len(gene_codes) == 0:
+        empty = np.zeros(0, dtype=np.float64)
+        return [
+            GeneScoreFrame(gene_codes, np.zeros(0, dtype=np.intp), empty, empty)
+            for _ in range(raw_matrix.shape[0])
+        ]
+
+    max_raw = raw_matrix.max(axis=1, keepdims=True)
+    normalized_matrix = np.zeros_like(raw_matrix)
+    np.divide(raw_matrix, max_raw, out=normalized_matrix, where=max_raw > 0)
+    normalized_matrix = np.clip(normalized_matrix * 100.0, 0.0, 100.0)
+
+    # gene_codes are sorted, so a stable sort on -raw keeps the gene_code tie-break.
+    orders = np.argsort(-raw_matrix, axis=1, kind="stable")
+    ranked_raw = np.take_along_axis(raw_matrix, orders, axis=1)
+    ranked_normalized = np.take_along_axis(normalized_matrix, orders, axis=1)
+    return [
+        GeneScoreFrame(gene_codes, orders[row], ranked_raw[row], ranked_normalized[row])
+        for row in range(raw_matrix.shape[0])
+    ]
+
+
+def rank_gene_vector(gene_codes: Sequence[str], raw_scores: np.ndarray) -> GeneScoreFrame:
+    """Normalize and rank a raw score vector whose columns follow sorted ``gene_codes``."""
+    raw_matrix = np.asarray(raw_scores, dtype=np.float64).reshape(1, len(gene_codes))
+    return _rank_gene_matrix(gene_codes, raw_matrix)[0]
+
+
+def rank_gene_scores(raw_scores: Mapping[str, float]) -> GeneScoreFrame:
+    """Normalize and rank gene scores deterministically."""
+    gene_codes = sorted(raw_scores)
+    return rank_gene_vector(
+        gene_codes,
+        np.array([float(raw_scores[gene_code]) for gene_code in gene_codes], dtype=np.float64),
+    )
 
 
 def _normalize_answers(answers: Sequence[JourneyAnswer]) -> List[JourneyAnswer]:
@@ -144,311 +291,333 @@ def _normalize_answers(answers: Sequence[JourneyAnswer]) -> List[JourneyAnswer]:
     return normalized
 
 
-def compute_gene_scores(
-    db: Session,
-    version_id: str,
+def encode_answer_rows(
+    plan: VersionScoringPlan,
     answers: Sequence[JourneyAnswer],
-) -> List[GeneScoreResult]:
-    """Compute raw and normalized gene scores from option weights."""
-    genes = db.query(Gene).filter(Gene.version_id == version_id).order_by(Gene.gene_code).all()
-    if not genes:
-        raise ValueError(f"no genes found for version '{version_id}'")
-
-    raw_by_gene: Dict[str, float] = {gene.gene_code: 0.0 for gene in genes}
-
-    weight_rows = db.query(OptionWeight).filter(OptionWeight.version_id == version_id).all()
-    weight_map: Dict[Tuple[str, str], List[Tuple[str, float]]] = {}
-    for row in weight_rows:
-        key = (row.scenario_code, row.option_code)
-        weight_map.setdefault(key, []).append((row.gene_code, float(row.weight)))
-
-    normalized_answers = _normalize_answers(answers)
-    for answer in normalized_answers:
-        key = (answer.scenario_code, answer.option_code)
-        if key not in weight_map:
+) -> np.ndarray:
+    """Map answers to row indices of ``plan.option_gene_weights``, in answer order."""
+    rows: List[int] = []
+    for answer in _normalize_answers(answers):
+        row_index = plan.option_rows.get((answer.scenario_code, answer.option_code))
+        if row_index is None:
             raise ValueError(
                 f"missing option weights for answer ({answer.scenario_code}, {answer.option_code})"
             )
+        rows.append(row_index)
+    return np.array(rows, dtype=np.intp)
+
+
+def _accumulate_gene_rows(plan: VersionScoringPlan, row_sets: Sequence[np.ndarray]) -> np.ndarray:
+    """Sum option-weight rows per answer set, one answer position at a time.
+
+    Each answer set adds its rows in answer order, so every output row equals
+    the scalar accumulation no matter how many sets are stacked together.
+    """
+    width = max((len(rows) for rows in row_sets), default=0)
+    row_matrix = np.full((len(row_sets), width), -1, dtype=np.intp)
+    for set_index, rows in enumerate(row_sets):
+        row_matrix[set_index, : len(rows)] = rows
+
+    raw_matrix = np.zeros((len(row_sets), len(plan.gene_codes)), dtype=np.float64)
+    for column in row_matrix.T:
+        answered = column >= 0
+        if answered.all():
+            raw_matrix += plan.option_gene_weights[column]
+        else:
+            raw_matrix[answered] += plan.option_gene_weights[column[answered]]
+    return raw_matrix
 
-        for gene_code, weight in weight_map[key]:
-            if gene_code not in raw_by_gene:
-                raise ValueError(f"unknown gene_code '{gene_code}' in option_weights")
-            raw_by_gene[gene_code] += weight
 
-    return rank_gene_scores(raw_by_gene)
+def compute_gene_scores(
+    plan: VersionScoringPlan,
+    answers: Sequence[JourneyAnswer],
+) -> GeneScoreFrame:
+    """Compute raw and normalized gene scores from option weights."""
+    raw_matrix = _accumulate_gene_rows(plan, [encode_answer_rows(plan, answers)])
+    return _rank_gene_matrix(plan.gene_codes, raw_matrix)[0]
+
+
+def _user_vector(plan: VersionScoringPlan, gene_scores: Sequence[GeneScoreResult]) -> List[float]:
+    raw_by_gene = _raw_by_gene(gene_scores)
+    return [raw_by_gene.get(gene_code, 0.0) for gene_code in plan.gene_codes]
+
+
+def _model_similarity_matrix(plan: VersionScoringPlan, user_matrix: np.ndarray) -> np.ndarray:
+    """Cosine similarity of every user row against every plan model.
+
+    Dot products and norms are accumulated gene by gene rather than through
+    BLAS, so a row's similarities do not depend on how many rows are stacked.
+    Users are normalized before the dot product, so values can differ from a
+    pairwise cosine in the last bits (well below 1e-12 on seeded content); models
+    closer than that can swap places in ``_top_model_matches``, which rounds to
+    six places.
+    """
+    squared_norms = np.zeros(user_matrix.shape[0], dtype=np.float64)
+    for column in user_matrix.T:
+        squared_norms += column * column
+    norms = np.sqrt(squared_norms)[:, None]
+    unit_users = np.zeros_like(user_matrix)
+    np.divide(user_matrix, norms, out=unit_users, where=norms > 0.0)
+
+    similarities = np.zeros((user_matrix.shape[0], len(plan.model_codes)), dtype=np.float64)
+    for user_column, model_column in zip(unit_users.T, plan.model_matrix.T):
+        similarities += user_column[:, None] * model_column[None, :]
+    return similarities
+
+
+def _top_model_matches(
+    plan: VersionScoringPlan,
+    similarities: np.ndarray,
+    top_n: int,
+) -> ScoreFrame:
+    # Take every model that can round into the top_n band, then apply the exact tie-break.
+    if top_n < len(similarities):
+        kth_similarity = np.partition(similarities, -top_n)[-top_n]
+        candidates = np.flatnonzero(similarities >= kth_similarity - 1e-6)
+    else:
+        candidates = np.arange(len(similarities))
+
+    scored_models = [(index, round(float(similarities[index]), 6)) for index in candidates.tolist()]
+    scored_models.sort(key=lambda pair: (-pair[1], plan.model_codes[pair[0]]))
+    return _score_frame(plan.model_codes, scored_models[:top_n], ModelMatchResult)
 
 
 def compute_model_matches(
-    db: Session,
-    version_id: str,
+    plan: VersionScoringPlan,
     gene_scores: Sequence[GeneScoreResult],
     top_n: int = 3,
-) -> List[ModelMatchResult]:
+) -> Sequence[ModelMatchResult]:
     """Match ranked genes against sahaba model vectors with cosine similarity."""
-    if top_n <= 0:
+    if top_n <= 0 or not plan.model_codes:
         return []
 
-    raw_by_gene = {score.gene_code: float(score.raw_score) for score in gene_scores}
-    gene_codes = sorted(raw_by_gene.keys())
-    user_vector = [raw_by_gene[gene_code] for gene_code in gene_codes]
+    user_matrix = np.array([_user_vector(plan, gene_scores)], dtype=np.float64)
+    similarities = _model_similarity_matrix(plan, user_matrix)[0]
+    return _top_model_matches(plan, similarities, top_n)
 
-    models = db.query(SahabaModel).filter(SahabaModel.version_id == version_id).order_by(SahabaModel.model_code).all()
-    scored_models: List[Tuple[str, float]] = []
 
-    for model in models:
-        model_vector_map = model.gene_vector_jsonb or {}
-        model_vector = [float(model_vector_map.get(gene_code, 0.0)) for gene_code in gene_codes]
-        similarity = _cosine_similarity(user_vector, model_vector)
-        scored_models.append((model.model_code, round(float(similarity), 6)))
+def _ranked_derived_values(
+    plan: VersionScoringPlan,
+    gene_scores: Sequence[GeneScoreResult],
+    top_n: int,
+) -> Dict[str, List[Tuple[int, float]]]:
+    """Top ``top_n`` ``(index into family.codes, score)`` pairs per family, by score desc then code."""
+    if top_n <= 0:
+        return {family: [] for family in plan.derived_families}
 
-    scored_models.sort(key=lambda pair: (-pair[1], pair[0]))
-    top_models = scored_models[:top_n]
+    normalized_by_gene = _normalized_by_gene(gene_scores)
+    normalized = np.array([normalized_by_gene.get(code, 0.0) for code in plan.gene_codes], dtype=np.float64)
+    scores = plan.derived_matrix @ normalized
 
-    return [
-        ModelMatchResult(model_code=model_code, similarity=similarity, rank=index + 1)
-        for index, (model_code, similarity) in enumerate(top_models)
-    ]
+    ranked: Dict[str, List[Tuple[int, float]]] = {}
+    for family in plan.derived_families.values():
+        scored = [(index, round(float(score), 4)) for index, score in enumerate(scores[family.start : family.stop])]
+        scored.sort(key=lambda pair: (-pair[1], family.codes[pair[0]]))
+        ranked[family.family] = scored[:top_n]
+    return ranked
 
 
-def _weighted_scores(
-    score_by_gene: Mapping[str, float],
-    weights: Mapping[str, float],
-) -> float:
-    total = 0.0
-    for gene_code, weight in weights.items():
-        total += score_by_gene.get(gene_code, 0.0) * float(weight)
-    return total
+def compute_derived_values(
+    plan: VersionScoringPlan,
+    gene_scores: Sequence[GeneScoreResult],
+    top_n: int = 5,
+) -> Dict[str, List[Tuple[str, float]]]:
+    """Score every derived-value family with one product over ``plan.derived_matrix``.
+
+    Returns the top ``top_n`` ``(code, score)`` pairs per family, ordered by
+    score desc then code.
+    """
+    return {
+        family: [(plan.derived_families[family].codes[index], score) for index, score in ranked]
+        for family, ranked in _ranked_derived_values(plan, gene_scores, top_n).items()
+    }
+
+
+def _derived_value_frame(
+    plan: VersionScoringPlan,
+    ranked: Dict[str, List[Tuple[int, float]]],
+    family: str,
+    item_type: type,
+) -> Sequence:
+    # A version without the family's weights scores none of its values.
+    if family not in ranked:
+        return []
+    return _score_frame(plan.derived_families[family].codes, ranked[family], item_type)
 
 
 def compute_quran_values(
-    db: Session,
-    version_id: str,
+    plan: VersionScoringPlan,
     gene_scores: Sequence[GeneScoreResult],
     top_n: int = 5,
-) -> List[QuranValueScoreResult]:
-    if top_n <= 0:
-        return []
-
-    normalized_by_gene = {score.gene_code: float(score.normalized_score) for score in gene_scores}
-    weight_rows = (
-        db.query(QuranValueGeneWeight)
-        .filter(QuranValueGeneWeight.version_id == version_id)
-        .order_by(QuranValueGeneWeight.quran_value_code.asc())
-        .all()
-    )
-    scored: List[Tuple[str, float]] = []
-    for row in weight_rows:
-        weights = row.gene_weights_jsonb or {}
-        score = _weighted_scores(normalized_by_gene, weights)
-        scored.append((row.quran_value_code, round(float(score), 4)))
-
-    scored.sort(key=lambda pair: (-pair[1], pair[0]))
-    top_rows = scored[:top_n]
-    return [
-        QuranValueScoreResult(quran_value_code=code, score=score, rank=index + 1)
-        for index, (code, score) in enumerate(top_rows)
-    ]
+) -> Sequence[QuranValueScoreResult]:
+    ranked = _ranked_derived_values(plan, gene_scores, top_n)
+    return _derived_value_frame(plan, ranked, "quran_values", QuranValueScoreResult)
 
 
 def compute_prophet_traits(
-    db: Session,
-    version_id: str,
+    plan: VersionScoringPlan,
     gene_scores: Sequence[GeneScoreResult],
     top_n: int = 5,
-) -> List[ProphetTraitScoreResult]:
-    if top_n <= 0:
-        return []
-
-    normalized_by_gene = {score.gene_code: float(score.normalized_score) for score in gene_scores}
-    weight_rows = (
-        db.query(ProphetTraitGeneWeight)
-        .filter(ProphetTraitGeneWeight.version_id == version_id)
-        .order_by(ProphetTraitGeneWeight.trait_code.asc())
-        .all()
+) -> Sequence[ProphetTraitScoreResult]:
+    ranked = _ranked_derived_values(plan, gene_scores, top_n)
+    return _derived_value_frame(plan, ranked, "prophet_traits", ProphetTraitScoreResult)
+
+
+def _activation_result(channel: str, advice: AdviceItemRecord, trigger_id: Optional[str]) -> ActivationItemResult:
+    return ActivationItemResult(
+        channel=channel,
+        advice_id=advice.advice_id,
+        advice_type=advice.advice_type,
+        title_en=advice.title_en,
+        title_ar=advice.title_ar,
+        body_en=advice.body_en,
+        body_ar=advice.body_ar,
+        priority=advice.priority,
+        trigger_id=trigger_id,
+        is_fallback=trigger_id is None,
     )
-    scored: List[Tuple[str, float]] = []
-    for row in weight_rows:
-        weights = row.gene_weights_jsonb or {}
-        score = _weighted_scores(normalized_by_gene, weights)
-        scored.append((row.trait_code, round(float(score), 4)))
-
-    scored.sort(key=lambda pair: (-pair[1], pair[0]))
-    top_rows = scored[:top_n]
-    return [
-        ProphetTraitScoreResult(trait_code=code, score=score, rank=index + 1)
-        for index, (code, score) in enumerate(top_rows)
-    ]
 
 
-def _trigger_type_matches(
-    trigger_type: str,
-    trigger_gene_code: Optional[str],
-    trigger_model_code: Optional[str],
-    role_genes: Mapping[str, str],
-    top_model_code: Optional[str],
-) -> bool:
-    normalized_type = trigger_type.upper()
-
-    if normalized_type == "TOP_GENE":
-        return trigger_gene_code == role_genes.get("dominant")
-    if normalized_type == "SECONDARY_GENE":
-        return trigger_gene_code == role_genes.get("secondary")
-    if normalized_type == "SUPPORT_GENE":
-        return trigger_gene_code == role_genes.get("support")
-    if normalized_type in {"TOP_2_GENE", "TOP2_GENE"}:
-        return trigger_gene_code in {role_genes.get("dominant"), role_genes.get("secondary")}
-    if normalized_type in {"TOP_MODEL", "BEST_MODEL"}:
-        return trigger_model_code == top_model_code
-    if normalized_type in {"ANY", "ANY_GENE", "ANY_MODEL"}:
-        return True
-
-    return False
-
-
-def _score_within_range(score: float, min_score: float, max_score: float) -> bool:
-    return min_score <= score <= max_score
-
-
-def _select_activation_items(
-    advice_items: Sequence[AdviceItem],
-    triggers: Sequence[AdviceTrigger],
+def _select_from_index(
+    index: ActivationIndex,
     gene_scores: Sequence[GeneScoreResult],
     model_matches: Sequence[ModelMatchResult],
 ) -> List[ActivationItemResult]:
-    advice_by_id = {item.advice_id: item for item in advice_items}
-    advice_by_channel: Dict[str, List[AdviceItem]] = {channel: [] for channel in ACTIVATION_CHANNELS}
-    for item in advice_items:
-        if item.channel in advice_by_channel:
-            advice_by_channel[item.channel].append(item)
-
-    normalized_gene_scores = {entry.gene_code: entry.normalized_score for entry in gene_scores}
-    role_genes = {entry.role: entry.gene_code for entry in gene_scores if entry.role}
+    normalized_gene_scores = _normalized_by_gene(gene_scores)
+    role_genes = _role_genes(gene_scores)
     model_scores = {entry.model_code: entry.similarity * 100.0 for entry in model_matches}
     top_model_code = model_matches[0].model_code if model_matches else None
 
     selected: List[ActivationItemResult] = []
-
     for channel in ACTIVATION_CHANNELS:
-        candidates: List[Tuple[int, float, str, str]] = []
-        for trigger in triggers:
-            if trigger.channel != channel:
-                continue
-
-            advice = advice_by_id.get(trigger.advice_id)
-            if advice is None:
-                continue
-
-            if not _trigger_type_matches(
-                trigger_type=trigger.trigger_type,
-                trigger_gene_code=trigger.gene_code,
-                trigger_model_code=trigger.model_code,
-                role_genes=role_genes,
-                top_model_code=top_model_code,
-            ):
-                continue
-
-            match_score = 0.0
-            if trigger.gene_code:
-                gene_score = normalized_gene_scores.get(trigger.gene_code)
-                if gene_score is None:
-                    continue
-                if not _score_within_range(gene_score, float(trigger.min_score), float(trigger.max_score)):
-                    continue
-                match_score = max(match_score, gene_score)
-
-            if trigger.model_code:
-                model_score = model_scores.get(trigger.model_code)
-                if model_score is None:
-                    continue
-                if not _score_within_range(model_score, float(trigger.min_score), float(trigger.max_score)):
-                    continue
-                match_score = max(match_score, model_score)
-
-            candidates.append((int(advice.priority), round(match_score, 4), advice.advice_id, trigger.trigger_id))
-
-        if candidates:
-            candidates.sort(key=lambda item: (-item[0], -item[1], item[2], item[3]))
-            _, _, advice_id, trigger_id = candidates[0]
-            chosen = advice_by_id[advice_id]
-            selected.append(
-                ActivationItemResult(
-                    channel=channel,
-                    advice_id=chosen.advice_id,
-                    advice_type=chosen.advice_type,
-                    title_en=chosen.title_en,
-                    title_ar=chosen.title_ar,
-                    body_en=chosen.body_en,
-                    body_ar=chosen.body_ar,
-                    priority=chosen.priority,
-                    trigger_id=trigger_id,
-                    is_fallback=False,
-                )
-            )
+        trigger = select_channel_trigger(
+            index,
+            channel,
+            gene_scores=normalized_gene_scores,
+            role_genes=role_genes,
+            model_scores=model_scores,
+            top_model_code=top_model_code,
+        )
+        if trigger is not None:
+            selected.append(_activation_result(channel, trigger.advice, trigger.trigger_id))
             continue
 
-        fallback_items = advice_by_channel.get(channel, [])
-        if not fallback_items:
+        fallback = channel_fallback(index, channel)
+        if fallback is None:
             raise ValueError(f"no advice_items found for activation channel '{channel}'")
-
-        fallback_items = sorted(fallback_items, key=lambda item: (-int(item.priority), item.advice_id))
-        fallback = fallback_items[0]
-        selected.append(
-            ActivationItemResult(
-                channel=channel,
-                advice_id=fallback.advice_id,
-                advice_type=fallback.advice_type,
-                title_en=fallback.title_en,
-                title_ar=fallback.title_ar,
-                body_en=fallback.body_en,
-                body_ar=fallback.body_ar,
-                priority=fallback.priority,
-                trigger_id=None,
-                is_fallback=True,
-            )
-        )
+        selected.append(_activation_result(channel, fallback, None))
 
     return selected
 
 
+def _select_activation_items(
+    advice_items: Sequence[AdviceItemRecord],
+    triggers: Sequence[AdviceTriggerRecord],
+    gene_scores: Sequence[GeneScoreResult],
+    model_matches: Sequence[ModelMatchResult],
+) -> List[ActivationItemResult]:
+    index = compile_activation_index(advice_items, triggers)
+    return _select_from_index(index, gene_scores, model_matches)
+
+
 def select_activation_items(
-    db: Session,
-    version_id: str,
+    plan: VersionScoringPlan,
     gene_scores: Sequence[GeneScoreResult],
     model_matches: Sequence[ModelMatchResult],
 ) -> List[ActivationItemResult]:
     """Select exactly one activation item per channel from triggers, with deterministic fallbacks."""
-    advice_items = db.query(AdviceItem).filter(AdviceItem.version_id == version_id).all()
-    triggers = db.query(AdviceTrigger).filter(AdviceTrigger.version_id == version_id).all()
-    return _select_activation_items(advice_items, triggers, gene_scores, model_matches)
+    return _select_from_index(plan.activation_index, gene_scores, model_matches)
 
 
-def compute_hybrid_outcome(
-    db: Session,
-    version_id: str,
-    answers: Sequence[JourneyAnswer],
-    top_model_n: int = 3,
-) -> HybridComputationResult:
-    """Run Phase 3 hybrid scoring + matching + activation selection."""
-    gene_scores = compute_gene_scores(db=db, version_id=version_id, answers=answers)
-    model_matches = compute_model_matches(
-        db=db,
-        version_id=version_id,
-        gene_scores=gene_scores,
-        top_n=top_model_n,
-    )
+def _complete_outcome(
+    plan: VersionScoringPlan,
+    gene_scores: GeneScoreFrame,
+    model_matches: Sequence[ModelMatchResult],
+) -> OutcomeFrame:
     activation_items = select_activation_items(
-        db=db,
-        version_id=version_id,
+        plan=plan,
         gene_scores=gene_scores,
         model_matches=model_matches,
     )
-    quran_values = compute_quran_values(db=db, version_id=version_id, gene_scores=gene_scores, top_n=3)
-    prophet_traits = compute_prophet_traits(db=db, version_id=version_id, gene_scores=gene_scores, top_n=3)
+    derived = _ranked_derived_values(plan, gene_scores, top_n=3)
 
-    return HybridComputationResult(
+    return OutcomeFrame(
         gene_scores=gene_scores,
         model_matches=model_matches,
         activation_items=activation_items,
-        quran_values=quran_values,
-        prophet_traits=prophet_traits,
+        quran_values=_derived_value_frame(plan, derived, "quran_values", QuranValueScoreResult),
+        prophet_traits=_derived_value_frame(plan, derived, "prophet_traits", ProphetTraitScoreResult),
     )
+
+
+def compute_hybrid_outcome(
+    plan: VersionScoringPlan,
+    answers: Sequence[JourneyAnswer],
+    top_model_n: int = 3,
+) -> OutcomeFrame:
+    """Run Phase 3 hybrid scoring + matching + activation selection."""
+    gene_scores = compute_gene_scores(plan=plan, answers=answers)
+    model_matches = compute_model_matches(plan=plan, gene_scores=gene_scores, top_n=top_model_n)
+    return _complete_outcome(plan, gene_scores, model_matches)
+
+
+def compute_hybrid_outcome_from_raw(
+    plan: VersionScoringPlan,
+    raw_scores: np.ndarray,
+    top_model_n: int = 3,
+) -> OutcomeFrame:
+    """Finish an outcome from already accumulated raw gene scores (``plan.gene_codes`` order)."""
+    gene_scores = rank_gene_vector(plan.gene_codes, raw_scores)
+    model_matches = compute_model_matches(plan=plan, gene_scores=gene_scores, top_n=top_model_n)
+    return _complete_outcome(plan, gene_scores, model_matches)
+
+
+def compute_hybrid_outcome_from_rows(
+    plan: VersionScoringPlan,
+    option_rows: np.ndarray,
+    top_model_n: int = 3,
+) -> OutcomeFrame:
+    """``compute_hybrid_outcome`` for answers already mapped to ``plan.option_gene_weights`` rows."""
+    raw_scores = _accumulate_gene_rows(plan, [option_rows])[0]
+    return compute_hybrid_outcome_from_raw(plan, raw_scores, top_model_n=top_model_n)
+
+
+BATCH_CHUNK_SIZE = 512
+
+
+def compute_hybrid_outcome_batch(
+    plan: VersionScoringPlan,
+    answer_sets: Sequence[Sequence[JourneyAnswer]],
+    top_model_n: int = 3,
+) -> List[OutcomeFrame]:
+    """Run ``compute_hybrid_outcome`` for many answer sets of one version.
+
+    Gene accumulation and model similarity run on stacked matrices in chunks of
+    ``BATCH_CHUNK_SIZE`` sets; results are identical to the single-run path.
+    """
+    row_sets: List[np.ndarray] = []
+    for set_index, answers in enumerate(answer_sets):
+        try:
+            row_sets.append(encode_answer_rows(plan, answers))
+        except ValueError as exc:
+            raise ValueError(f"answer set {set_index}: {exc}") from exc
+
+    outcomes: List[OutcomeFrame] = []
+    for start in range(0, len(row_sets), BATCH_CHUNK_SIZE):
+        raw_matrix = _accumulate_gene_rows(plan, row_sets[start : start + BATCH_CHUNK_SIZE])
+        ranked_sets = _rank_gene_matrix(plan.gene_codes, raw_matrix)
+
+        similarity_rows = None
+        if top_model_n > 0 and plan.model_codes:
+            user_matrix = np.array([_user_vector(plan, gene_scores) for gene_scores in ranked_sets], dtype=np.float64)
+            similarity_rows = _model_similarity_matrix(plan, user_matrix)
+
+        for set_offset, gene_scores in enumerate(ranked_sets):
+            model_matches = (
+                _top_model_matches(plan, similarity_rows[set_offset], top_model_n)
+                if similarity_rows is not None
+                else []
+            )
+            outcomes.append(_complete_outcome(plan, gene_scores, model_matches))
+
+    return outcomes
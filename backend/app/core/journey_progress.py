@@ -0,0 +1,262 @@
+"""In-memory per-answer journey progress with write-behind answer persistence."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from threading import Lock
+from time import monotonic
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import String, bindparam, delete, insert, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.scoring_plan import VersionScoringPlan
+from app.models import Answer, TestRun
+
+
+@dataclass
+class RunProgress:
+    """Answers recorded so far for one run plus their gene-score sum.
+
+    ``raw_scores`` follows ``plan.gene_codes`` and is always bit-identical to
+    summing the answered option rows in scenario order. Weights are floats, so
+    the sum depends on its order and a subtracted row does not cancel exactly:
+    an answer to a scenario after every answered one is added to the sum, any
+    other change re-sums the answers.
+    """
+
+    version_id: str
+    content_fingerprint: str
+    answers: Dict[str, str]
+    raw_scores: np.ndarray
+    pending: Dict[str, str] = field(default_factory=dict)
+
+    def matches(self, plan: VersionScoringPlan, answers: Dict[str, str]) -> bool:
+        return (
+            self.version_id == plan.version_id
+            and self.content_fingerprint == plan.content_fingerprint
+            and self.answers == answers
+        )
+
+
+# Buffered answers only ever land on runs that are still open; a submitted or
+# cancelled run keeps exactly the answers it was closed with.
+_STARTED_RUN_IDS = select(TestRun.id).where(TestRun.status == "started")
+_INSERT_STARTED_RUN_ANSWER = insert(Answer.__table__).from_select(
+    ["test_run_id", "scenario_code", "option_code"],
+    select(
+        TestRun.id,
+        bindparam("answer_scenario_code", type_=String),
+        bindparam("answer_option_code", type_=String),
+    ).where(TestRun.id == bindparam("answer_test_run_id"), TestRun.status == "started"),
+)
+
+
+def _option_row(plan: VersionScoringPlan, scenario_code: str, option_code: str) -> np.ndarray:
+    row_index = plan.option_rows.get((scenario_code, option_code))
+    if row_index is None:
+        raise ValueError(f"missing option weights for answer ({scenario_code}, {option_code})")
+    return plan.option_gene_weights[row_index]
+
+
+def _accumulate(plan: VersionScoringPlan, answers: Dict[str, str]) -> np.ndarray:
+    raw_scores = np.zeros(len(plan.gene_codes), dtype=np.float64)
+    for scenario_code, option_code in sorted(answers.items()):
+        raw_scores += _option_row(plan, scenario_code, option_code)
+    return raw_scores
+
+
+class JourneyProgressStore:
+    """Bounded LRU of run progress; unflushed answers survive eviction until the next flush."""
+
+    def __init__(self, max_runs: int, flush_batch_size: int, flush_interval_seconds: float):
+        self.max_runs = max_runs
+        self.flush_batch_size = flush_batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self._runs: "OrderedDict[int, RunProgress]" = OrderedDict()
+        self._orphaned: Dict[Tuple[int, str], str] = {}
+        self._pending_count = 0
+        self._last_flush = monotonic()
+        self._lock = Lock()
+
+    def _load(self, db: Session, plan: VersionScoringPlan, test_run_id: int) -> RunProgress:
+        rows = db.query(Answer.scenario_code, Answer.option_code).filter(Answer.test_run_id == test_run_id).all()
+        answers = {scenario_code: option_code for scenario_code, option_code in rows}
+        with self._lock:
+            for (run_id, scenario_code), option_code in self._orphaned.items():
+                if run_id == test_run_id:
+                    answers[scenario_code] = option_code
+        return RunProgress(
+            version_id=plan.version_id,
+            content_fingerprint=plan.content_fingerprint,
+            answers=answers,
+            raw_scores=_accumulate(plan, answers),
+        )
+
+    def record(
+        self,
+        db: Session,
+        plan: VersionScoringPlan,
+        test_run_id: int,
+        scenario_code: str,
+        option_code: str,
+    ) -> RunProgress:
+        """Apply one answer to the run's accumulator and queue it for persistence."""
+        new_row = _option_row(plan, scenario_code, option_code)
+        with self._lock:
+            progress = self._runs.get(test_run_id)
+        if progress is None or progress.version_id != plan.version_id:
+            progress = self._load(db, plan, test_run_id)
+
+        with self._lock:
+            progress = self._runs.setdefault(test_run_id, progress)
+            self._runs.move_to_end(test_run_id)
+            if progress.content_fingerprint != plan.content_fingerprint:
+                progress.raw_scores = _accumulate(plan, progress.answers)
+                progress.content_fingerprint = plan.content_fingerprint
+
+            previous_option = progress.answers.get(scenario_code)
+            if previous_option != option_code:
+                appended = previous_option is None and all(code < scenario_code for code in progress.answers)
+                progress.answers[scenario_code] = option_code
+                if appended:
+                    progress.raw_scores = progress.raw_scores + new_row
+                else:
+                    progress.raw_scores = _accumulate(plan, progress.answers)
+                if scenario_code not in progress.pending:
+                    self._pending_count += 1
+                progress.pending[scenario_code] = option_code
+
+            while len(self._runs) > self.max_runs:
+                evicted_id, evicted = self._runs.popitem(last=False)
+                for pending_scenario, pending_option in evicted.pending.items():
+                    self._orphaned[(evicted_id, pending_scenario)] = pending_option
+            return progress
+
+    def get(self, test_run_id: int) -> Optional[RunProgress]:
+        with self._lock:
+            return self._runs.get(test_run_id)
+
+    def detach(self, test_run_id: int) -> Dict[str, str]:
+        """Drop the run's progress and return its unflushed answers.
+
+        A run being submitted is detached first so no concurrent flush writes
+        stale answers next to the submission; ``restore`` queues them again
+        when the submission does not commit.
+        """
+        with self._lock:
+            progress = self._runs.pop(test_run_id, None)
+            unflushed: Dict[str, str] = {}
+            if progress is not None:
+                self._pending_count -= len(progress.pending)
+                unflushed.update(progress.pending)
+            for key in [key for key in self._orphaned if key[0] == test_run_id]:
+                unflushed.setdefault(key[1], self._orphaned.pop(key))
+            return unflushed
+
+    def restore(self, test_run_id: int, unflushed: Dict[str, str]) -> None:
+        with self._lock:
+            for scenario_code, option_code in unflushed.items():
+                self._orphaned.setdefault((test_run_id, scenario_code), option_code)
+
+    def discard(self, test_run_id: int) -> None:
+        self.detach(test_run_id)
+
+    def clear(self) -> None:
+        """Drop all progress, including unflushed answers."""
+        with self._lock:
+            self._runs.clear()
+            self._orphaned.clear()
+            self._pending_count = 0
+
+    def flush_due(self) -> bool:
+        with self._lock:
+            return bool(self._pending_count or self._orphaned) and (
+                self._pending_count + len(self._orphaned) >= self.flush_batch_size
+                or monotonic() - self._last_flush >= self.flush_interval_seconds
+            )
+
+    def flush(self, db: Session, test_run_id: Optional[int] = None) -> int:
+        """Persist queued answers (all runs, or one run) in one batch and commit.
+
+        Only runs still ``started`` are written; answers queued for a run that
+        was submitted or cancelled meanwhile are dropped. Their ``test_runs``
+        rows stay locked until the commit, so a submit either waits for the
+        batch or the batch skips the run it closed.
+        """
+        batch: Dict[Tuple[int, str], str] = {}
+        with self._lock:
+            run_ids = [test_run_id] if test_run_id is not None else list(self._runs)
+            for run_id in run_ids:
+                progress = self._runs.get(run_id)
+                if progress is None or not progress.pending:
+                    continue
+                for scenario_code, option_code in progress.pending.items():
+                    batch[(run_id, scenario_code)] = option_code
+                self._pending_count -= len(progress.pending)
+                progress.pending = {}
+            for key in [key for key in self._orphaned if test_run_id is None or key[0] == test_run_id]:
+                batch.setdefault(key, self._orphaned.pop(key))
+            if test_run_id is None:
+                self._last_flush = monotonic()
+
+        if not batch:
+            return 0
+
+        try:
+            started_ids = set(
+                db.execute(
+                    _STARTED_RUN_IDS.where(TestRun.id.in_({run_id for run_id, _ in batch})).with_for_update()
+                ).scalars()
+            )
+            rows = {key: option_code for key, option_code in batch.items() if key[0] in started_ids}
+            if rows:
+                db.execute(
+                    delete(Answer).where(
+                        tuple_(Answer.test_run_id, Answer.scenario_code).in_(list(rows)),
+                        Answer.test_run_id.in_(_STARTED_RUN_IDS),
+                    )
+                )
+                db.execute(
+                    _INSERT_STARTED_RUN_ANSWER,
+                    [
+                        {
+                            "answer_test_run_id": run_id,
+                            "answer_scenario_code": scenario_code,
+                            "answer_option_code": option_code,
+                        }
+                        for (run_id, scenario_code), option_code in rows.items()
+                    ],
+                )
+                db.execute(
+                    update(TestRun)
+                    .where(TestRun.id.in_(started_ids), TestRun.status == "started")
+                    .values(last_activity_at=datetime.now(timezone.utc))
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            self._requeue(batch)
+            raise
+        return len(rows)
+
+    def _requeue(self, batch: Dict[Tuple[int, str], str]) -> None:
+        with self._lock:
+            for (run_id, scenario_code), option_code in batch.items():
+                progress = self._runs.get(run_id)
+                if progress is None:
+                    self._orphaned.setdefault((run_id, scenario_code), option_code)
+                elif scenario_code not in progress.pending:
+                    progress.pending[scenario_code] = progress.answers[scenario_code]
+                    self._pending_count += 1
+
+
+journey_progress = JourneyProgressStore(
+    max_runs=settings.JOURNEY_PROGRESS_MAX_RUNS,
+    flush_batch_size=settings.ANSWER_FLUSH_BATCH_SIZE,
+    flush_interval_seconds=settings.ANSWER_FLUSH_INTERVAL_SECONDS,
+)
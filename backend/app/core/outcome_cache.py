@@ -0,0 +1,133 @@
+"""Bounded in-process cache of hybrid outcomes keyed by answer fingerprint."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Dict, Hashable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.hybrid_engine import (
+    JourneyAnswer,
+    OutcomeFrame,
+    compute_hybrid_outcome,
+    compute_hybrid_outcome_from_rows,
+)
+from app.core.scoring_plan import VersionScoringPlan, register_plan_invalidation_listener
+
+
+OutcomeKey = Tuple[str, str, int, Tuple[Tuple[str, str], ...]]
+
+
+class OutcomeCache:
+    """LRU + TTL cache with hit/miss counters; safe to share between threads."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, OutcomeFrame]]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[OutcomeFrame]:
+        now = monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry[0] >= self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, outcome: OutcomeFrame) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (monotonic(), outcome)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, version_id: Optional[str] = None) -> None:
+        with self._lock:
+            if version_id is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == version_id]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+outcome_cache = OutcomeCache(
+    max_entries=settings.OUTCOME_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.OUTCOME_CACHE_TTL_SECONDS,
+)
+register_plan_invalidation_listener(outcome_cache.invalidate)
+
+
+def _canonical_answers(answers: Sequence[JourneyAnswer]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((answer.scenario_code.strip(), answer.option_code.strip()) for answer in answers))
+
+
+def compute_hybrid_outcome_cached(
+    plan: VersionScoringPlan,
+    answers: Sequence[JourneyAnswer],
+    top_model_n: int = 3,
+) -> OutcomeFrame:
+    """``compute_hybrid_outcome`` behind ``outcome_cache``.
+
+    Answers are scored in canonical (scenario_code) order so every key maps to
+    exactly one outcome regardless of submission order. Invalid answer sets
+    raise before anything is cached.
+    """
+    canonical = _canonical_answers(answers)
+    key: OutcomeKey = (plan.version_id, plan.content_fingerprint, top_model_n, canonical)
+    cached = outcome_cache.get(key)
+    if cached is not None:
+        return cached
+
+    outcome = compute_hybrid_outcome(
+        plan=plan,
+        answers=[JourneyAnswer(scenario_code=scenario, option_code=option) for scenario, option in canonical],
+        top_model_n=top_model_n,
+    )
+    outcome_cache.put(key, outcome)
+    return outcome
+
+
+def compute_hybrid_outcome_from_rows_cached(
+    plan: VersionScoringPlan,
+    canonical: Tuple[Tuple[str, str], ...],
+    option_rows: np.ndarray,
+    top_model_n: int = 3,
+) -> OutcomeFrame:
+    """``compute_hybrid_outcome_cached`` for answers already decoded to plan rows.
+
+    ``canonical`` and ``option_rows`` must both be in ``scenario_code`` order,
+    so the key and the accumulation match the string path exactly.
+    """
+    key: OutcomeKey = (plan.version_id, plan.content_fingerprint, top_model_n, canonical)
+    cached = outcome_cache.get(key)
+    if cached is not None:
+        return cached
+
+    outcome = compute_hybrid_outcome_from_rows(plan=plan, option_rows=option_rows, top_model_n=top_model_n)
+    outcome_cache.put(key, outcome)
+    return outcome
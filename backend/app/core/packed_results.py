@@ -0,0 +1,263 @@
+"""Packed per-run storage of answers and computed scores.
+
+With ``PACKED_RESULT_STORAGE`` enabled, submit writes one ``packed_run_results``
+row per run instead of answer, gene-score and model-match rows. The arrays are
+encoded against a ``packed_result_layouts`` row holding the code order, so a
+run stays readable after its version's content changes. The ``load_*``
+adapters read either storage format.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from threading import Lock
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.hybrid_engine import GeneScoreResult, ModelMatchResult, rank_gene_scores
+from app.core.scenario_content import ScenarioSetContent
+from app.core.scoring_plan import VersionScoringPlan
+from app.models import Answer, ComputedGeneScore, ComputedModelMatch, PackedResultLayout, PackedRunResult
+
+OPTION_INDEX_DTYPE = np.dtype("u1")
+MODEL_INDEX_DTYPE = np.dtype("<u2")
+SCORE_DTYPE = np.dtype("<f8")
+UNANSWERED = 0xFF
+
+
+@dataclass(frozen=True)
+class ResultLayout:
+    """Scenario/option, gene and model code order of one version's packed results."""
+
+    version_id: str
+    scenarios: Tuple[Tuple[str, Tuple[str, ...]], ...]
+    gene_codes: Tuple[str, ...]
+    model_codes: Tuple[str, ...]
+    layout_hash: str = field(init=False, compare=False)
+    scenario_index: Mapping[str, int] = field(init=False, compare=False, repr=False)
+    gene_index: Mapping[str, int] = field(init=False, compare=False, repr=False)
+    model_index: Mapping[str, int] = field(init=False, compare=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if any(len(option_codes) >= UNANSWERED for _, option_codes in self.scenarios):
+            raise ValueError("packed answers support at most 254 options per scenario")
+        digest = hashlib.sha256(self.to_json().encode("utf-8")).hexdigest()
+        object.__setattr__(self, "layout_hash", digest)
+        object.__setattr__(
+            self,
+            "scenario_index",
+            MappingProxyType({code: index for index, (code, _) in enumerate(self.scenarios)}),
+        )
+        object.__setattr__(
+            self, "gene_index", MappingProxyType({code: index for index, code in enumerate(self.gene_codes)})
+        )
+        object.__setattr__(
+            self, "model_index", MappingProxyType({code: index for index, code in enumerate(self.model_codes)})
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(
+            [self.version_id, self.scenarios, self.gene_codes, self.model_codes],
+            separators=(",", ":"),
+        )
+
+    def to_row(self) -> PackedResultLayout:
+        return PackedResultLayout(
+            layout_hash=self.layout_hash,
+            version_id=self.version_id,
+            scenario_layout=json.dumps(self.scenarios, separators=(",", ":")),
+            gene_codes=json.dumps(self.gene_codes, separators=(",", ":")),
+            model_codes=json.dumps(self.model_codes, separators=(",", ":")),
+        )
+
+    @classmethod
+    def from_row(cls, row: PackedResultLayout) -> "ResultLayout":
+        return cls(
+            version_id=row.version_id,
+            scenarios=tuple(
+                (scenario_code, tuple(option_codes)) for scenario_code, option_codes in json.loads(row.scenario_layout)
+            ),
+            gene_codes=tuple(json.loads(row.gene_codes)),
+            model_codes=tuple(json.loads(row.model_codes)),
+        )
+
+
+def build_result_layout(plan: VersionScoringPlan, content: ScenarioSetContent) -> ResultLayout:
+    return ResultLayout(
+        version_id=plan.version_id,
+        scenarios=tuple(
+            (scenario.scenario_code, tuple(sorted(option.option_code for option in scenario.options)))
+            for scenario in content.scenarios
+        ),
+        gene_codes=plan.gene_codes,
+        model_codes=plan.model_codes,
+    )
+
+
+# Layout rows are immutable, so both maps only ever grow by one entry per content revision.
+_layouts_by_hash: Dict[str, ResultLayout] = {}
+_stored_layout_hashes: set = set()
+_layouts_lock = Lock()
+
+
+def ensure_result_layout(db: Session, layout: ResultLayout) -> None:
+    """Make sure ``layout`` has its row, inserting it at most once per process."""
+    with _layouts_lock:
+        if layout.layout_hash in _stored_layout_hashes:
+            return
+    if db.get(PackedResultLayout, layout.layout_hash) is None:
+        try:
+            with db.begin_nested():
+                db.add(layout.to_row())
+        except IntegrityError:
+            # Another worker stored the same layout first.
+            pass
+    with _layouts_lock:
+        _stored_layout_hashes.add(layout.layout_hash)
+        _layouts_by_hash.setdefault(layout.layout_hash, layout)
+
+
+def _load_result_layout(db: Session, layout_hash: str) -> ResultLayout:
+    with _layouts_lock:
+        layout = _layouts_by_hash.get(layout_hash)
+    if layout is None:
+        layout = ResultLayout.from_row(db.get(PackedResultLayout, layout_hash))
+        with _layouts_lock:
+            layout = _layouts_by_hash.setdefault(layout_hash, layout)
+            _stored_layout_hashes.add(layout_hash)
+    return layout
+
+
+def pack_run_result(
+    layout: ResultLayout,
+    *,
+    test_run_id: int,
+    answers: Mapping[str, str],
+    gene_scores: Iterable[Tuple[str, float, float]],
+    model_matches: Sequence[ModelMatchResult],
+) -> Dict[str, object]:
+    """Column values of the ``packed_run_results`` row for one run.
+
+    ``gene_scores`` yields ``(gene_code, raw_score, normalized_score)``;
+    ``model_matches`` must be in rank order. Raises ValueError for codes the
+    layout does not know.
+    """
+    option_indices = np.full(len(layout.scenarios), UNANSWERED, dtype=OPTION_INDEX_DTYPE)
+    for scenario_code, option_code in answers.items():
+        position = layout.scenario_index.get(scenario_code)
+        if position is None:
+            raise ValueError(f"scenario_code '{scenario_code}' is not in result layout")
+        option_codes = layout.scenarios[position][1]
+        if option_code not in option_codes:
+            raise ValueError(f"option_code '{option_code}' is not in result layout for '{scenario_code}'")
+        option_indices[position] = option_codes.index(option_code)
+
+    raw_scores = np.zeros(len(layout.gene_codes), dtype=SCORE_DTYPE)
+    normalized_scores = np.zeros(len(layout.gene_codes), dtype=SCORE_DTYPE)
+    for gene_code, raw_score, normalized_score in gene_scores:
+        column = layout.gene_index.get(gene_code)
+        if column is None:
+            raise ValueError(f"gene_code '{gene_code}' is not in result layout")
+        raw_scores[column] = raw_score
+        normalized_scores[column] = normalized_score
+
+    model_indices = np.empty(len(model_matches), dtype=MODEL_INDEX_DTYPE)
+    for position, match in enumerate(model_matches):
+        column = layout.model_index.get(match.model_code)
+        if column is None:
+            raise ValueError(f"model_code '{match.model_code}' is not in result layout")
+        model_indices[position] = column
+
+    return {
+        "test_run_id": test_run_id,
+        "layout_hash": layout.layout_hash,
+        "option_indices": option_indices.tobytes(),
+        "raw_scores": raw_scores.tobytes(),
+        "normalized_scores": normalized_scores.tobytes(),
+        "model_indices": model_indices.tobytes(),
+        "model_similarities": np.array(
+            [match.similarity for match in model_matches], dtype=SCORE_DTYPE
+        ).tobytes(),
+    }
+
+
+def unpack_answers(layout: ResultLayout, packed: PackedRunResult) -> Dict[str, str]:
+    option_indices = np.frombuffer(packed.option_indices, dtype=OPTION_INDEX_DTYPE)
+    return {
+        scenario_code: option_codes[index]
+        for (scenario_code, option_codes), index in zip(layout.scenarios, option_indices.tolist())
+        if index != UNANSWERED
+    }
+
+
+def _packed_result(db: Session, test_run_id: int) -> Optional[Tuple[ResultLayout, PackedRunResult]]:
+    # Identity-map lookup: callers reading several parts of one run share the row.
+    packed = db.get(PackedRunResult, test_run_id)
+    if packed is None:
+        return None
+    return _load_result_layout(db, packed.layout_hash), packed
+
+
+def load_answers(db: Session, test_run_id: int) -> Dict[str, str]:
+    packed = _packed_result(db, test_run_id)
+    if packed is not None:
+        return unpack_answers(*packed)
+    rows = db.query(Answer.scenario_code, Answer.option_code).filter(Answer.test_run_id == test_run_id).all()
+    return {scenario_code: option_code for scenario_code, option_code in rows}
+
+
+def load_gene_scores(db: Session, test_run_id: int) -> List[GeneScoreResult]:
+    """Stored gene scores of a submitted run in rank order; empty if it has none."""
+    packed = _packed_result(db, test_run_id)
+    if packed is not None:
+        layout, row = packed
+        stored = list(
+            zip(
+                layout.gene_codes,
+                np.frombuffer(row.raw_scores, dtype=SCORE_DTYPE).tolist(),
+                np.frombuffer(row.normalized_scores, dtype=SCORE_DTYPE).tolist(),
+            )
+        )
+    else:
+        stored = [
+            (row.gene_code, float(row.raw_score), float(row.normalized_score))
+            for row in db.query(ComputedGeneScore).filter(ComputedGeneScore.test_run_id == test_run_id)
+        ]
+
+    normalized = {gene_code: normalized_score for gene_code, _, normalized_score in stored}
+    return [
+        GeneScoreResult(
+            gene_code=row.gene_code,
+            raw_score=row.raw_score,
+            normalized_score=normalized.get(row.gene_code, row.normalized_score),
+            rank=row.rank,
+            role=row.role,
+        )
+        for row in rank_gene_scores({gene_code: raw_score for gene_code, raw_score, _ in stored})
+    ]
+
+
+def load_model_matches(db: Session, test_run_id: int) -> List[ModelMatchResult]:
+    """Stored model matches of a submitted run in rank order."""
+    packed = _packed_result(db, test_run_id)
+    if packed is not None:
+        layout, row = packed
+        model_indices = np.frombuffer(row.model_indices, dtype=MODEL_INDEX_DTYPE).tolist()
+        similarities = np.frombuffer(row.model_similarities, dtype=SCORE_DTYPE).tolist()
+        return [
+            ModelMatchResult(model_code=layout.model_codes[index], similarity=similarity, rank=rank)
+            for rank, (index, similarity) in enumerate(zip(model_indices, similarities), start=1)
+        ]
+    rows = (
+        db.query(ComputedModelMatch)
+        .filter(ComputedModelMatch.test_run_id == test_run_id)
+        .order_by(ComputedModelMatch.rank.asc(), ComputedModelMatch.model_code.asc())
+        .all()
+    )
+    return [ModelMatchResult(model_code=row.model_code, similarity=float(row.similarity), rank=row.rank) for row in rows]
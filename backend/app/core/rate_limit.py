@@ -0,0 +1,191 @@
+"""Per-key request rate limiting (GCRA) with an optional store shared by all workers."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic, time
+from typing import Dict, Optional
+
+from sqlalchemy import bindparam, delete, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, DOUBLE_PRECISION, TEXT
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import RateLimitState
+
+RATE_LIMIT_BACKEND_MEMORY = "memory"
+RATE_LIMIT_BACKEND_POSTGRES = "postgres"
+
+_POSTGRES_EXCHANGE = text(
+    """
+    INSERT INTO rate_limit_state (bucket_key, tat)
+    SELECT batch.bucket_key, :now + batch.increment
+    FROM unnest(:bucket_keys, :increments) AS batch(bucket_key, increment)
+    ON CONFLICT (bucket_key) DO UPDATE
+    SET tat = GREATEST(rate_limit_state.tat, :now) + (EXCLUDED.tat - :now)
+    RETURNING bucket_key, tat
+    """
+).bindparams(
+    bindparam("bucket_keys", type_=ARRAY(TEXT)),
+    bindparam("increments", type_=ARRAY(DOUBLE_PRECISION)),
+)
+
+
+class PostgresRateLimitStore:
+    """GCRA state shared through the unlogged ``rate_limit_state`` table.
+
+    One row per key holds its theoretical arrival time. Rows whose time has
+    passed are equivalent to absent ones and are pruned every
+    ``prune_interval_seconds``.
+    """
+
+    def __init__(self, prune_interval_seconds: float):
+        self.prune_interval_seconds = prune_interval_seconds
+        self._last_prune = monotonic()
+
+    def exchange(self, db: Session, increments: Dict[str, float], now: float) -> Dict[str, float]:
+        """Add each key's admitted emission time and return the resulting shared states."""
+        if db.get_bind().dialect.name == "postgresql":
+            keys = list(increments)
+            rows = db.execute(
+                _POSTGRES_EXCHANGE,
+                {"bucket_keys": keys, "increments": [increments[key] for key in keys], "now": now},
+            ).all()
+            shared = {bucket_key: tat for bucket_key, tat in rows}
+        else:
+            # No multi-row upsert with RETURNING elsewhere; read-modify-write each key.
+            stored = dict(
+                db.execute(
+                    select(RateLimitState.bucket_key, RateLimitState.tat).where(
+                        RateLimitState.bucket_key.in_(list(increments))
+                    )
+                ).all()
+            )
+            shared = {}
+            for bucket_key, increment in increments.items():
+                shared[bucket_key] = max(stored.get(bucket_key, now), now) + increment
+                db.merge(RateLimitState(bucket_key=bucket_key, tat=shared[bucket_key]))
+
+        if monotonic() - self._last_prune >= self.prune_interval_seconds:
+            db.execute(
+                delete(RateLimitState).where(RateLimitState.tat < now).execution_options(synchronize_session=False)
+            )
+            self._last_prune = monotonic()
+        db.commit()
+        return shared
+
+
+class RateLimiter:
+    """Generic cell rate algorithm: one float per key, however many requests it makes.
+
+    A key allowed ``limit`` requests per ``window_seconds`` has an emission
+    interval ``T = window / limit``. It keeps a theoretical arrival time (TAT);
+    a request is admitted while ``max(tat, now) + T - now <= window``, which
+    permits a burst of ``limit`` and then one request per ``T``. Keys are kept
+    in an LRU of ``max_keys``; a key pushed out simply starts afresh.
+
+    Decisions are always taken locally. With a ``store`` the emission time
+    admitted per key is buffered and pushed to the store in one statement once
+    ``sync_batch_size`` keys are pending or ``sync_interval_seconds`` passed;
+    the store answers with the combined state of all workers, which replaces
+    the local one when it is later. Workers can therefore over-admit by what
+    they let through within one sync interval.
+    """
+
+    def __init__(
+        self,
+        max_keys: int,
+        store: Optional[PostgresRateLimitStore] = None,
+        sync_interval_seconds: float = 1.0,
+        sync_batch_size: int = 200,
+    ):
+        self.max_keys = max_keys
+        self.store = store
+        self.sync_interval_seconds = sync_interval_seconds
+        self.sync_batch_size = sync_batch_size
+        self._tats: "OrderedDict[str, float]" = OrderedDict()
+        self._pending: Dict[str, float] = {}
+        self._last_sync = monotonic()
+        self._lock = Lock()
+        self.rejections = 0
+
+    def hit(self, key: str, limit: int, window_seconds: float, now: Optional[float] = None) -> bool:
+        """Count one request for ``key``; False when it is over the limit."""
+        now = time() if now is None else now
+        emission_interval = window_seconds / limit
+        with self._lock:
+            tat = max(self._tats.get(key, now), now)
+            if tat + emission_interval - now > window_seconds:
+                self.rejections += 1
+                return False
+            self._remember(key, tat + emission_interval)
+            if self.store is not None:
+                self._pending[key] = self._pending.get(key, 0.0) + emission_interval
+            return True
+
+    def _remember(self, key: str, tat: float) -> None:
+        self._tats[key] = tat
+        self._tats.move_to_end(key)
+        while len(self._tats) > self.max_keys:
+            self._tats.popitem(last=False)
+
+    def sync_due(self) -> bool:
+        with self._lock:
+            return bool(self._pending) and (
+                len(self._pending) >= self.sync_batch_size
+                or monotonic() - self._last_sync >= self.sync_interval_seconds
+            )
+
+    def sync(self, db: Session, now: Optional[float] = None) -> int:
+        """Push buffered emission times to the store and adopt the shared states."""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            self._last_sync = monotonic()
+        if not batch or self.store is None:
+            return 0
+
+        try:
+            shared = self.store.exchange(db, batch, time() if now is None else now)
+        except Exception:
+            db.rollback()
+            with self._lock:
+                for key, increment in batch.items():
+                    self._pending[key] = self._pending.get(key, 0.0) + increment
+            raise
+        with self._lock:
+            for key, tat in shared.items():
+                if tat > self._tats.get(key, tat - 1):
+                    self._remember(key, tat)
+        return len(batch)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tats.clear()
+            self._pending.clear()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "backend": RATE_LIMIT_BACKEND_MEMORY if self.store is None else RATE_LIMIT_BACKEND_POSTGRES,
+                "keys": len(self._tats),
+                "pending": len(self._pending),
+                "rejections": self.rejections,
+            }
+
+
+def build_rate_limiter(backend: str) -> RateLimiter:
+    if backend not in (RATE_LIMIT_BACKEND_MEMORY, RATE_LIMIT_BACKEND_POSTGRES):
+        raise ValueError(f"Unknown RATE_LIMIT_BACKEND '{backend}'")
+    store = None
+    if backend == RATE_LIMIT_BACKEND_POSTGRES:
+        store = PostgresRateLimitStore(prune_interval_seconds=settings.RATE_LIMIT_PRUNE_INTERVAL_SECONDS)
+    return RateLimiter(
+        max_keys=settings.RATE_LIMIT_MAX_KEYS,
+        store=store,
+        sync_interval_seconds=settings.RATE_LIMIT_SYNC_INTERVAL_SECONDS,
+        sync_batch_size=settings.RATE_LIMIT_SYNC_BATCH_SIZE,
+    )
+
+
+rate_limiter = build_rate_limiter(settings.RATE_LIMIT_BACKEND)
@@ -2,28 +2,25 @@ import base64
 import hashlib
 import hmac
 import secrets
-from datetime import timezone
-from typing import List, Optional
+import string
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
 
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.hybrid_engine import (
-    GeneScoreResult,
-    compute_prophet_traits,
-    compute_quran_values,
-    rank_gene_scores,
-)
+from app.core.hybrid_engine import GeneScoreResult, compute_derived_values
+from app.core.packed_results import load_gene_scores, load_model_matches
+from app.core.scoring_plan import get_version_scoring_plan
 from app.models import (
     AdviceItem,
-    ComputedGeneScore,
-    ComputedModelMatch,
     Gene,
     ProphetTrait,
     QuranValue,
     SahabaModel,
     TestRun,
 )
+from app.schemas.journey import JourneySubmitAnswersResponse
 from app.schemas.share import (
     SharedActivation,
     SharedGeneItem,
@@ -32,6 +29,14 @@ from app.schemas.share import (
 )
 
 
+SHARE_LANGUAGES = ("en", "ar")
+SHARE_TOKEN_MALFORMED = "malformed"
+SHARE_TOKEN_FORGED = "forged"
+# Seeds and signatures are 32 bytes, base64url-encoded without padding.
+_SHARE_TOKEN_PART_LENGTH = 43
+_BASE64URL_ALPHABET = frozenset(string.ascii_letters + string.digits + "-_")
+
+
 def hash_capability_token(token: str) -> str:
     return hashlib.sha256(token.encode("utf-8")).hexdigest()
 
@@ -61,6 +66,26 @@ def share_token_from_seed(seed: str) -> str:
     return f"{seed}.{_base64url(signature)}"
 
 
+def share_token_rejection(token: str) -> Optional[str]:
+    """Why ``token`` was not minted by ``share_token_from_seed``, checked without the database.
+
+    Returns ``SHARE_TOKEN_MALFORMED`` or ``SHARE_TOKEN_FORGED``, or None when
+    the signature is valid (the share may still be unknown or expired).
+    """
+    seed, separator, signature = token.partition(".")
+    if (
+        not separator
+        or len(seed) != _SHARE_TOKEN_PART_LENGTH
+        or len(signature) != _SHARE_TOKEN_PART_LENGTH
+        or not _BASE64URL_ALPHABET.issuperset(seed)
+        or not _BASE64URL_ALPHABET.issuperset(signature)
+    ):
+        return SHARE_TOKEN_MALFORMED
+    if not hmac.compare_digest(share_token_from_seed(seed), token):
+        return SHARE_TOKEN_FORGED
+    return None
+
+
 def verify_owner_token(test_run: TestRun, token: str) -> bool:
     if not test_run.owner_token_hash or not token or len(token) > 256:
         return False
@@ -72,19 +97,91 @@ def _localized(en: str, ar: Optional[str], language: str) -> str:
 
 
 def _stored_gene_scores(db: Session, test_run: TestRun) -> List[GeneScoreResult]:
-    rows = db.query(ComputedGeneScore).filter(ComputedGeneScore.test_run_id == test_run.id).all()
-    ranked = rank_gene_scores({row.gene_code: float(row.raw_score) for row in rows})
-    normalized = {row.gene_code: float(row.normalized_score) for row in rows}
-    return [
-        GeneScoreResult(
-            gene_code=row.gene_code,
-            raw_score=row.raw_score,
-            normalized_score=normalized.get(row.gene_code, row.normalized_score),
-            rank=row.rank,
-            role=row.role,
+    return load_gene_scores(db, test_run.id)
+
+
+def _journey_type(version_id: str) -> str:
+    return "deep" if version_id.startswith("v2") else "quick"
+
+
+def build_share_snapshots(response: JourneySubmitAnswersResponse, *, completed_at: datetime) -> Dict[str, object]:
+    """Share reports of a submitted result in every share language, from its submit response.
+
+    The activation is picked after submit, so each language keeps its report
+    without one plus every offered activation by ``advice_id``;
+    ``shared_snapshot_from_stored`` combines them when a share is created.
+    """
+    if completed_at.tzinfo is None:
+        completed_at = completed_at.replace(tzinfo=timezone.utc)
+    snapshots: Dict[str, object] = {}
+    for language in SHARE_LANGUAGES:
+        report = SharedJourneyResultResponse(
+            language=language,
+            journey_type=_journey_type(response.version_id),
+            completed_at=completed_at,
+            top_genes=[
+                SharedGeneItem(
+                    name=_localized(gene.name_en, gene.name_ar, language),
+                    score=gene.normalized_score,
+                    rank=gene.rank,
+                    role=gene.role,
+                )
+                for gene in response.top_genes
+            ],
+            archetype_matches=[
+                SharedScoreItem(
+                    name=_localized(match.name_en, match.name_ar, language),
+                    score=round(float(match.similarity) * 100, 2),
+                    rank=match.rank,
+                )
+                for match in response.archetype_matches
+            ],
+            quran_values=[
+                SharedScoreItem(
+                    name=_localized(value.name_en, value.name_ar, language),
+                    score=value.score,
+                    rank=value.rank,
+                )
+                for value in response.quran_values
+            ],
+            prophet_traits=[
+                SharedScoreItem(
+                    name=_localized(trait.name_en, trait.name_ar, language),
+                    score=trait.score,
+                    rank=trait.rank,
+                )
+                for trait in response.prophet_traits
+            ],
+            selected_activation=None,
         )
-        for row in ranked
-    ]
+        activations = {
+            item.advice_id: SharedActivation(
+                channel=item.channel,
+                title=_localized(item.title_en, item.title_ar, language),
+                body=_localized(item.body_en, item.body_ar, language),
+            ).model_dump(mode="json")
+            for item in response.activation_items
+        }
+        snapshots[language] = {"report": report.model_dump(mode="json"), "activations": activations}
+    return snapshots
+
+
+def shared_snapshot_from_stored(
+    test_run: TestRun,
+    *,
+    language: str,
+) -> Optional[Dict[str, object]]:
+    """The stored report for ``language`` with the run's selected activation, ready for ``snapshot_jsonb``.
+
+    None when the run has no stored snapshots or its activation is not among them.
+    """
+    stored = (test_run.share_snapshots_jsonb or {}).get(language)
+    if stored is None:
+        return None
+    activation = stored["activations"].get(test_run.selected_activation_id)
+    if test_run.selected_activation_id and activation is None:
+        return None
+    return {**stored["report"], "selected_activation": activation}
 
 
 def build_shared_result_snapshot(
@@ -93,7 +190,9 @@ def build_shared_result_snapshot(
     test_run: TestRun,
     language: str,
 ) -> SharedJourneyResultResponse:
+    """Rebuild a share report from stored scores, for runs submitted before snapshots were stored."""
     gene_scores = _stored_gene_scores(db, test_run)
+    plan = get_version_scoring_plan(db, test_run.version_id)
     genes = {
         row.gene_code: row
         for row in db.query(Gene).filter(Gene.version_id == test_run.version_id).all()
@@ -113,12 +212,7 @@ def build_shared_result_snapshot(
         row.model_code: row
         for row in db.query(SahabaModel).filter(SahabaModel.version_id == test_run.version_id).all()
     }
-    model_rows = (
-        db.query(ComputedModelMatch)
-        .filter(ComputedModelMatch.test_run_id == test_run.id)
-        .order_by(ComputedModelMatch.rank.asc())
-        .all()
-    )
+    model_rows = load_model_matches(db, test_run.id)
     archetypes = [
         SharedScoreItem(
             name=_localized(models[row.model_code].name_en, models[row.model_code].name_ar, language),
@@ -129,26 +223,27 @@ def build_shared_result_snapshot(
         if row.model_code in models
     ]
 
+    derived = compute_derived_values(plan, gene_scores, top_n=3)
     quran_refs = {row.quran_value_code: row for row in db.query(QuranValue).all()}
     quran_values = [
         SharedScoreItem(
-            name=_localized(quran_refs[row.quran_value_code].name_en, quran_refs[row.quran_value_code].name_ar, language),
-            score=row.score,
-            rank=row.rank,
+            name=_localized(quran_refs[code].name_en, quran_refs[code].name_ar, language),
+            score=score,
+            rank=rank,
         )
-        for row in compute_quran_values(db, test_run.version_id, gene_scores, top_n=3)
-        if row.quran_value_code in quran_refs
+        for rank, (code, score) in enumerate(derived.get("quran_values", []), start=1)
+        if code in quran_refs
     ]
 
     prophet_refs = {row.trait_code: row for row in db.query(ProphetTrait).all()}
     prophet_traits = [
         SharedScoreItem(
-            name=_localized(prophet_refs[row.trait_code].name_en, prophet_refs[row.trait_code].name_ar, language),
-            score=row.score,
-            rank=row.rank,
+            name=_localized(prophet_refs[code].name_en, prophet_refs[code].name_ar, language),
+            score=score,
+            rank=rank,
         )
-        for row in compute_prophet_traits(db, test_run.version_id, gene_scores, top_n=3)
-        if row.trait_code in prophet_refs
+        for rank, (code, score) in enumerate(derived.get("prophet_traits", []), start=1)
+        if code in prophet_refs
     ]
 
     activation = None
@@ -173,7 +268,7 @@ def build_shared_result_snapshot(
         completed_at = completed_at.replace(tzinfo=timezone.utc)
     return SharedJourneyResultResponse(
         language=language,
-        journey_type="deep" if test_run.version_id.startswith("v2") else "quick",
+        journey_type=_journey_type(test_run.version_id),
         completed_at=completed_at,
         top_genes=top_genes,
         archetype_matches=archetypes,
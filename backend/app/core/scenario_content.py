@@ -0,0 +1,146 @@
+"""Process-wide cache of scenario-set content used by the journey endpoints."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.scoring_plan import check_content_revisions, register_plan_invalidation_listener
+from app.models import Scenario, ScenarioOption
+
+
+@dataclass(frozen=True)
+class ScenarioOptionRecord:
+    option_code: str
+    option_text_en: str
+    option_text_ar: Optional[str]
+
+
+@dataclass(frozen=True)
+class ScenarioRecord:
+    scenario_code: str
+    order_index: int
+    scenario_text_en: str
+    scenario_text_ar: Optional[str]
+    options: Tuple[ScenarioOptionRecord, ...]
+
+
+@dataclass(frozen=True, eq=False)
+class ScenarioSetContent:
+    """Ordered scenarios of one set with their options and an answer-validation index.
+
+    ``scenario_set_code`` is None for legacy runs that were not bound to a set;
+    their content is every scenario of the version. ``content_hash`` identifies
+    the scenario order and option codes, the frame compact answer submissions
+    are encoded against.
+    """
+
+    version_id: str
+    scenario_set_code: Optional[str]
+    scenarios: Tuple[ScenarioRecord, ...]
+    scenario_codes: FrozenSet[str]
+    option_codes_by_scenario: Mapping[str, FrozenSet[str]]
+    content_hash: str
+
+
+def _content_hash(version_id: str, scenario_set_code: Optional[str], records: Tuple[ScenarioRecord, ...]) -> str:
+    layout = [
+        version_id,
+        scenario_set_code,
+        [[record.scenario_code, [option.option_code for option in record.options]] for record in records],
+    ]
+    return hashlib.sha256(json.dumps(layout, separators=(",", ":")).encode("utf-8")).hexdigest()[:16]
+
+
+def build_scenario_set_content(
+    db: Session,
+    version_id: str,
+    scenario_set_code: Optional[str],
+) -> ScenarioSetContent:
+    scenario_query = db.query(Scenario).filter(Scenario.version_id == version_id)
+    if scenario_set_code is not None:
+        scenario_query = scenario_query.filter(Scenario.scenario_set_code == scenario_set_code)
+    scenarios = scenario_query.order_by(Scenario.order_index.asc(), Scenario.scenario_code.asc()).all()
+
+    scenario_codes = [scenario.scenario_code for scenario in scenarios]
+    options_by_scenario: Dict[str, List[ScenarioOptionRecord]] = {}
+    if scenario_codes:
+        option_query = db.query(ScenarioOption).filter(ScenarioOption.version_id == version_id)
+        if scenario_set_code is not None:
+            option_query = option_query.filter(ScenarioOption.scenario_code.in_(scenario_codes))
+        for option in option_query.order_by(ScenarioOption.scenario_code.asc(), ScenarioOption.option_code.asc()):
+            options_by_scenario.setdefault(option.scenario_code, []).append(
+                ScenarioOptionRecord(
+                    option_code=option.option_code,
+                    option_text_en=option.option_text_en,
+                    option_text_ar=option.option_text_ar,
+                )
+            )
+
+    records = tuple(
+        ScenarioRecord(
+            scenario_code=scenario.scenario_code,
+            order_index=scenario.order_index,
+            scenario_text_en=scenario.scenario_text_en,
+            scenario_text_ar=scenario.scenario_text_ar,
+            options=tuple(options_by_scenario.get(scenario.scenario_code, ())),
+        )
+        for scenario in scenarios
+    )
+    return ScenarioSetContent(
+        version_id=version_id,
+        scenario_set_code=scenario_set_code,
+        scenarios=records,
+        scenario_codes=frozenset(scenario_codes),
+        option_codes_by_scenario=MappingProxyType(
+            {record.scenario_code: frozenset(option.option_code for option in record.options) for record in records}
+        ),
+        content_hash=_content_hash(version_id, scenario_set_code, records),
+    )
+
+
+ContentKey = Tuple[str, Optional[str]]
+
+_contents: Dict[ContentKey, Tuple[float, ScenarioSetContent]] = {}
+_contents_lock = Lock()
+
+
+def get_scenario_set_content(
+    db: Session,
+    version_id: str,
+    scenario_set_code: Optional[str],
+) -> ScenarioSetContent:
+    """Return cached content for the set, building it on first use, after the TTL or an import."""
+    check_content_revisions(db)
+    key: ContentKey = (version_id, scenario_set_code)
+    now = monotonic()
+    with _contents_lock:
+        cached = _contents.get(key)
+    if cached and now - cached[0] < settings.SCENARIO_CONTENT_TTL_SECONDS:
+        return cached[1]
+
+    content = build_scenario_set_content(db, version_id, scenario_set_code)
+    with _contents_lock:
+        _contents[key] = (now, content)
+    return content
+
+
+def invalidate_scenario_set_content(version_id: Optional[str] = None) -> None:
+    """Drop cached scenario sets (all versions when ``version_id`` is None)."""
+    with _contents_lock:
+        if version_id is None:
+            _contents.clear()
+            return
+        for key in [key for key in _contents if key[0] == version_id]:
+            del _contents[key]
+
+
+register_plan_invalidation_listener(invalidate_scenario_set_content)
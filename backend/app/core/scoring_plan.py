@@ -0,0 +1,337 @@
+"""Compiled, process-wide scoring content for hybrid journey versions."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import hashlib
+from threading import Lock
+from time import monotonic
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.activation_index import ActivationIndex, compile_activation_index
+from app.core.config import settings
+from app.models import (
+    AdviceItem,
+    AdviceTrigger,
+    AppVersion,
+    Gene,
+    OptionWeight,
+    ProphetTraitGeneWeight,
+    QuranValueGeneWeight,
+    SahabaModel,
+)
+
+
+@dataclass(frozen=True)
+class AdviceItemRecord:
+    advice_id: str
+    channel: str
+    advice_type: str
+    title_en: str
+    title_ar: Optional[str]
+    body_en: str
+    body_ar: Optional[str]
+    priority: int
+
+
+@dataclass(frozen=True)
+class AdviceTriggerRecord:
+    trigger_id: str
+    trigger_type: str
+    gene_code: Optional[str]
+    model_code: Optional[str]
+    channel: str
+    advice_id: str
+    min_score: float
+    max_score: float
+
+
+@dataclass(frozen=True)
+class DerivedValueSource:
+    """A per-version table of ``code -> gene_weights_jsonb`` rows scored from normalized genes."""
+
+    family: str
+    model: type
+    code_column: str
+
+
+# Every family is stacked into ``VersionScoringPlan.derived_matrix``; a new
+# table of the same shape only needs an entry here.
+DERIVED_VALUE_SOURCES: Tuple[DerivedValueSource, ...] = (
+    DerivedValueSource(family="quran_values", model=QuranValueGeneWeight, code_column="quran_value_code"),
+    DerivedValueSource(family="prophet_traits", model=ProphetTraitGeneWeight, code_column="trait_code"),
+)
+
+
+@dataclass(frozen=True)
+class DerivedFamily:
+    """Codes of one derived-value family and where its rows start in ``derived_matrix``."""
+
+    family: str
+    codes: Tuple[str, ...]
+    start: int
+
+    @property
+    def stop(self) -> int:
+        return self.start + len(self.codes)
+
+
+@dataclass(frozen=True, eq=False)
+class VersionScoringPlan:
+    """Immutable scoring content for one version, detached from any DB session.
+
+    Matrix rows are dense over ``gene_codes`` (sorted), so a gene's column is
+    ``gene_index[gene_code]`` in every matrix of the plan. ``option_gene_weights``
+    is a read-only float64 array with one row per ``option_rows`` entry;
+    ``model_matrix`` holds unit-length model vectors in ``model_codes`` order
+    (all-zero rows for models without weights). ``derived_matrix`` stacks the
+    gene weights of every ``derived_families`` entry (Quran values, Prophet
+    traits, ...). ``content_fingerprint`` changes whenever any scoring content
+    of the version changes.
+    """
+
+    version_id: str
+    gene_codes: Tuple[str, ...]
+    gene_index: Mapping[str, int]
+    option_rows: Mapping[Tuple[str, str], int]
+    option_gene_weights: np.ndarray
+    model_codes: Tuple[str, ...]
+    model_matrix: np.ndarray
+    derived_families: Mapping[str, DerivedFamily]
+    derived_matrix: np.ndarray
+    advice_items: Tuple[AdviceItemRecord, ...]
+    triggers: Tuple[AdviceTriggerRecord, ...]
+    activation_index: ActivationIndex
+    content_fingerprint: str = ""
+
+
+def _frozen_matrix(rows, width: int) -> np.ndarray:
+    matrix = np.array(rows, dtype=np.float64).reshape(len(rows), width)
+    matrix.flags.writeable = False
+    return matrix
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    unit = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0.0)
+    unit.flags.writeable = False
+    return unit
+
+
+def compile_derived_values(
+    gene_index: Mapping[str, int],
+    families: Sequence[Tuple[str, Sequence[Tuple[str, Optional[Mapping[str, float]]]]]],
+) -> Tuple[Mapping[str, DerivedFamily], np.ndarray]:
+    """Stack ``(family, [(code, gene_weights), ...])`` tables into one dense matrix.
+
+    Weights for genes outside ``gene_index`` are dropped; they scored zero anyway.
+    """
+    derived_families: Dict[str, DerivedFamily] = {}
+    rows: List[List[float]] = []
+    for family, weight_rows in families:
+        derived_families[family] = DerivedFamily(
+            family=family,
+            codes=tuple(code for code, _ in weight_rows),
+            start=len(rows),
+        )
+        for _, gene_weights in weight_rows:
+            row = [0.0] * len(gene_index)
+            for gene_code, weight in (gene_weights or {}).items():
+                if gene_code in gene_index:
+                    row[gene_index[gene_code]] = float(weight)
+            rows.append(row)
+    return MappingProxyType(derived_families), _frozen_matrix(rows, len(gene_index))
+
+
+def _content_fingerprint(*parts: object) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.tobytes() if isinstance(part, np.ndarray) else repr(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def build_version_scoring_plan(db: Session, version_id: str) -> VersionScoringPlan:
+    """Load every scoring table for ``version_id`` and compile it into a plan."""
+    genes = db.query(Gene).filter(Gene.version_id == version_id).order_by(Gene.gene_code).all()
+    if not genes:
+        raise ValueError(f"no genes found for version '{version_id}'")
+
+    gene_codes = tuple(gene.gene_code for gene in genes)
+    gene_index = {gene_code: index for index, gene_code in enumerate(gene_codes)}
+
+    option_rows: Dict[Tuple[str, str], int] = {}
+    option_gene_weights = []
+    weight_rows = (
+        db.query(OptionWeight)
+        .filter(OptionWeight.version_id == version_id)
+        .order_by(OptionWeight.scenario_code, OptionWeight.option_code, OptionWeight.gene_code)
+        .all()
+    )
+    for row in weight_rows:
+        if row.gene_code not in gene_index:
+            raise ValueError(f"unknown gene_code '{row.gene_code}' in option_weights")
+        key = (row.scenario_code, row.option_code)
+        if key not in option_rows:
+            option_rows[key] = len(option_gene_weights)
+            option_gene_weights.append([0.0] * len(gene_codes))
+        option_gene_weights[option_rows[key]][gene_index[row.gene_code]] = float(row.weight)
+
+    models = (
+        db.query(SahabaModel)
+        .filter(SahabaModel.version_id == version_id)
+        .order_by(SahabaModel.model_code)
+        .all()
+    )
+    model_vectors = []
+    for model in models:
+        vector_map = model.gene_vector_jsonb or {}
+        model_vectors.append([float(vector_map.get(gene_code, 0.0)) for gene_code in gene_codes])
+
+    derived_tables = []
+    for source in DERIVED_VALUE_SOURCES:
+        code_column = getattr(source.model, source.code_column)
+        rows = db.query(source.model).filter(source.model.version_id == version_id).order_by(code_column.asc()).all()
+        derived_tables.append(
+            (source.family, [(getattr(row, source.code_column), row.gene_weights_jsonb) for row in rows])
+        )
+
+    advice_rows = (
+        db.query(AdviceItem)
+        .filter(AdviceItem.version_id == version_id)
+        .order_by(AdviceItem.advice_id)
+        .all()
+    )
+    trigger_rows = (
+        db.query(AdviceTrigger)
+        .filter(AdviceTrigger.version_id == version_id)
+        .order_by(AdviceTrigger.trigger_id)
+        .all()
+    )
+    advice_items = tuple(
+        AdviceItemRecord(
+            advice_id=item.advice_id,
+            channel=item.channel,
+            advice_type=item.advice_type,
+            title_en=item.title_en,
+            title_ar=item.title_ar,
+            body_en=item.body_en,
+            body_ar=item.body_ar,
+            priority=int(item.priority),
+        )
+        for item in advice_rows
+    )
+    triggers = tuple(
+        AdviceTriggerRecord(
+            trigger_id=trigger.trigger_id,
+            trigger_type=trigger.trigger_type,
+            gene_code=trigger.gene_code,
+            model_code=trigger.model_code,
+            channel=trigger.channel,
+            advice_id=trigger.advice_id,
+            min_score=float(trigger.min_score),
+            max_score=float(trigger.max_score),
+        )
+        for trigger in trigger_rows
+    )
+
+    option_matrix = _frozen_matrix(option_gene_weights, len(gene_codes))
+    model_codes = tuple(model.model_code for model in models)
+    raw_model_matrix = _frozen_matrix(model_vectors, len(gene_codes))
+    derived_families, derived_matrix = compile_derived_values(gene_index, derived_tables)
+
+    return VersionScoringPlan(
+        version_id=version_id,
+        gene_codes=gene_codes,
+        gene_index=MappingProxyType(gene_index),
+        option_rows=MappingProxyType(option_rows),
+        option_gene_weights=option_matrix,
+        model_codes=model_codes,
+        model_matrix=_unit_rows(raw_model_matrix),
+        derived_families=derived_families,
+        derived_matrix=derived_matrix,
+        advice_items=advice_items,
+        triggers=triggers,
+        activation_index=compile_activation_index(advice_items, triggers),
+        content_fingerprint=_content_fingerprint(
+            gene_codes,
+            tuple(option_rows),
+            option_matrix,
+            model_codes,
+            raw_model_matrix,
+            tuple(derived_families.values()),
+            derived_matrix,
+            advice_items,
+            triggers,
+        ),
+    )
+
+
+_plans: Dict[str, Tuple[float, VersionScoringPlan]] = {}
+_plans_lock = Lock()
+_invalidation_listeners: List[Callable[[Optional[str]], None]] = []
+
+
+def register_plan_invalidation_listener(listener: Callable[[Optional[str]], None]) -> None:
+    """Call ``listener(version_id)`` whenever cached plans are invalidated."""
+    _invalidation_listeners.append(listener)
+
+
+_seen_revisions: Optional[Dict[str, int]] = None
+_revisions_checked_at = float("-inf")
+_revisions_lock = Lock()
+
+
+def check_content_revisions(db: Session) -> None:
+    """Invalidate cached content of versions whose ``content_revision`` changed.
+
+    The seed importer bumps the revision of every version in the transaction
+    that writes the content, so processes other than the importer drop their
+    plans, scenario sets, registry and outcomes within
+    ``CONTENT_REVISION_CHECK_SECONDS`` instead of at the end of the TTLs. The
+    check is one small query per process and interval.
+    """
+    global _seen_revisions, _revisions_checked_at
+    now = monotonic()
+    with _revisions_lock:
+        if now - _revisions_checked_at < settings.CONTENT_REVISION_CHECK_SECONDS:
+            return
+        _revisions_checked_at = now
+    revisions = dict(db.query(AppVersion.version_id, AppVersion.content_revision).all())
+    with _revisions_lock:
+        previous, _seen_revisions = _seen_revisions, revisions
+    if previous is None:
+        return
+    for version_id in sorted(previous.keys() | revisions.keys()):
+        if previous.get(version_id) != revisions.get(version_id):
+            invalidate_version_scoring_plans(version_id)
+
+
+def get_version_scoring_plan(db: Session, version_id: str) -> VersionScoringPlan:
+    """Return the cached plan for ``version_id``, building it on first use, after the TTL or an import."""
+    check_content_revisions(db)
+    now = monotonic()
+    with _plans_lock:
+        cached = _plans.get(version_id)
+    if cached and now - cached[0] < settings.SCORING_PLAN_TTL_SECONDS:
+        return cached[1]
+
+    plan = build_version_scoring_plan(db, version_id)
+    with _plans_lock:
+        _plans[version_id] = (now, plan)
+    return plan
+
+
+def invalidate_version_scoring_plans(version_id: Optional[str] = None) -> None:
+    """Drop cached plans (all versions when ``version_id`` is None) and notify listeners."""
+    with _plans_lock:
+        if version_id is None:
+            _plans.clear()
+        else:
+            _plans.pop(version_id, None)
+    for listener in list(_invalidation_listeners):
+        listener(version_id)
@@ -0,0 +1,55 @@
+"""In-process scenario-set allocation for new journey runs."""
+
+from __future__ import annotations
+
+import random
+from threading import Lock
+from typing import Dict, Sequence, Tuple
+
+from app.core.config import settings
+
+ALLOCATION_RANDOM = "random"
+ALLOCATION_BALANCED = "balanced"
+ALLOCATION_STRATEGIES = (ALLOCATION_RANDOM, ALLOCATION_BALANCED)
+
+
+class ScenarioSetAllocator:
+    """Pick the scenario set of a new run without touching the database.
+
+    ``random`` draws uniformly. ``balanced`` hands out the set this process has
+    allocated least for the version (ties drawn at random), so sets fill up
+    evenly even over short windows. Counters are per process and start at
+    zero; across several workers every one of them stays balanced on its own.
+    """
+
+    def __init__(self, strategy: str):
+        if strategy not in ALLOCATION_STRATEGIES:
+            raise ValueError(f"Unknown scenario set allocation strategy '{strategy}'")
+        self.strategy = strategy
+        self._counts: Dict[Tuple[str, str], int] = {}
+        self._lock = Lock()
+
+    def choose(self, version_id: str, set_codes: Sequence[str]) -> str:
+        if not set_codes:
+            raise ValueError("No scenario sets available")
+        with self._lock:
+            if self.strategy == ALLOCATION_BALANCED:
+                lowest = min(self._counts.get((version_id, code), 0) for code in set_codes)
+                chosen = random.choice(
+                    [code for code in set_codes if self._counts.get((version_id, code), 0) == lowest]
+                )
+            else:
+                chosen = random.choice(list(set_codes))
+            self._counts[(version_id, chosen)] = self._counts.get((version_id, chosen), 0) + 1
+            return chosen
+
+    def counts(self, version_id: str) -> Dict[str, int]:
+        with self._lock:
+            return {code: count for (version, code), count in self._counts.items() if version == version_id}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+set_allocator = ScenarioSetAllocator(settings.SCENARIO_SET_ALLOCATION)
@@ -0,0 +1,120 @@
+"""Bounded in-process cache of serialized shared reports keyed by token hash."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+
+
+class SharedReportCache:
+    """LRU of response bodies for ``GET /shares/report``; safe to share between threads.
+
+    Each entry keeps the share's ``expires_at``, checked on every hit, capped
+    at ``ttl_seconds`` after caching so shares deleted by another process
+    stop being served within that window. Local regeneration or deletion
+    calls ``discard``.
+
+    Correctly signed tokens that matched no live share are remembered for
+    ``negative_ttl_seconds`` so repeated lookups skip the database, and
+    ``rejections`` counts tokens turned away before any lookup by reason.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        negative_max_entries: int,
+        negative_ttl_seconds: float,
+    ):
+        self.max_entries = max_entries
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.negative_max_entries = negative_max_entries
+        self.negative_ttl = timedelta(seconds=negative_ttl_seconds)
+        self._entries: "OrderedDict[str, Tuple[datetime, bytes]]" = OrderedDict()
+        self._missing: "OrderedDict[str, datetime]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.negative_hits = 0
+        self.rejections: Dict[str, int] = {}
+
+    def get(self, token_hash: str, now: datetime) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(token_hash)
+            if entry is None or now >= entry[0]:
+                if entry is not None:
+                    del self._entries[token_hash]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token_hash)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, token_hash: str, body: bytes, expires_at: datetime, now: datetime) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[token_hash] = (min(expires_at, now + self.ttl), body)
+            self._entries.move_to_end(token_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def is_known_missing(self, token_hash: str, now: datetime) -> bool:
+        with self._lock:
+            forget_at = self._missing.get(token_hash)
+            if forget_at is None:
+                return False
+            if now >= forget_at:
+                del self._missing[token_hash]
+                return False
+            self.negative_hits += 1
+            return True
+
+    def remember_missing(self, token_hash: str, now: datetime) -> None:
+        if self.negative_max_entries <= 0:
+            return
+        with self._lock:
+            self._missing[token_hash] = now + self.negative_ttl
+            self._missing.move_to_end(token_hash)
+            while len(self._missing) > self.negative_max_entries:
+                self._missing.popitem(last=False)
+
+    def record_rejection(self, reason: str) -> None:
+        with self._lock:
+            self.rejections[reason] = self.rejections.get(reason, 0) + 1
+
+    def discard(self, token_hash: str) -> None:
+        with self._lock:
+            self._entries.pop(token_hash, None)
+            self._missing.pop(token_hash, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._missing.clear()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "negative_entries": len(self._missing),
+                "negative_hits": self.negative_hits,
+                "rejected_tokens": dict(self.rejections),
+            }
+
+
+shared_report_cache = SharedReportCache(
+    max_entries=settings.SHARED_REPORT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.SHARED_REPORT_CACHE_TTL_SECONDS,
+    negative_max_entries=settings.SHARED_REPORT_NEGATIVE_CACHE_MAX_ENTRIES,
+    negative_ttl_seconds=settings.SHARED_REPORT_NEGATIVE_CACHE_TTL_SECONDS,
+)
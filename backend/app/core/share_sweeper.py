@@ -0,0 +1,97 @@
+"""Background deletion of expired result shares in small batches."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import new_async_session
+from app.models import ResultShare
+
+logger = logging.getLogger(__name__)
+
+
+def delete_expired_shares_batch(db: Session, now: datetime, batch_size: int) -> int:
+    """Delete and commit up to ``batch_size`` expired shares, oldest first.
+
+    The ids come from the ``expires_at`` index; rows another sweeper already
+    holds are skipped rather than waited on.
+    """
+    expired_ids = (
+        select(ResultShare.id)
+        .where(ResultShare.expires_at <= now)
+        .order_by(ResultShare.expires_at.asc())
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    deleted = db.execute(
+        delete(ResultShare).where(ResultShare.id.in_(expired_ids)).execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return deleted
+
+
+class ShareExpirySweeper:
+    """Delete expired shares every ``interval_seconds``, pausing between batches.
+
+    Reads already filter on ``expires_at``, so a share stays unreadable from
+    the moment it expires however far behind the sweeper is.
+    """
+
+    def __init__(self, interval_seconds: float, batch_size: int, batch_pause_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.batch_pause_seconds = batch_pause_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def sweep(self) -> int:
+        """Delete every share expired at the start of the sweep; returns the number deleted."""
+        now = datetime.now(timezone.utc)
+        total = 0
+        async with new_async_session() as db:
+            while True:
+                deleted = await db.run_sync(lambda session: delete_expired_shares_batch(session, now, self.batch_size))
+                total += deleted
+                if deleted < self.batch_size:
+                    return total
+                await asyncio.sleep(self.batch_pause_seconds)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                deleted = await self.sweep()
+                if deleted:
+                    logger.info("Deleted %d expired result shares", deleted)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Expired share sweep failed")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+share_expiry_sweeper = ShareExpirySweeper(
+    interval_seconds=settings.SHARE_SWEEP_INTERVAL_SECONDS,
+    batch_size=settings.SHARE_SWEEP_BATCH_SIZE,
+    batch_pause_seconds=settings.SHARE_SWEEP_BATCH_PAUSE_SECONDS,
+)
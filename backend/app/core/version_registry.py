@@ -0,0 +1,103 @@
+"""Process-wide registry of app versions and their scenario sets."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.scoring_plan import check_content_revisions, register_plan_invalidation_listener
+from app.models import AppVersion, Scenario
+
+
+JOURNEY_TYPE_VERSIONS: Mapping[str, str] = MappingProxyType({"quick": "v1", "deep": "v2"})
+DRAFT_SCENARIO_PREFIX = "draft_"
+
+
+@dataclass(frozen=True)
+class VersionEntry:
+    version_id: str
+    is_active: bool
+    public_set_codes: Tuple[str, ...]
+    draft_set_codes: Tuple[str, ...]
+
+    def set_codes(self, include_drafts: bool = False) -> Tuple[str, ...]:
+        if not include_drafts:
+            return self.public_set_codes
+        return tuple(sorted(self.public_set_codes + self.draft_set_codes))
+
+
+@dataclass(frozen=True)
+class VersionRegistry:
+    """Snapshot of every version; ``active_version_id`` is the newest published active one."""
+
+    versions: Mapping[str, VersionEntry]
+    active_version_id: Optional[str]
+
+
+def build_version_registry(db: Session) -> VersionRegistry:
+    versions = db.query(AppVersion).order_by(AppVersion.published_at.desc(), AppVersion.version_id.desc()).all()
+    set_rows = (
+        db.query(Scenario.version_id, Scenario.scenario_set_code)
+        .distinct()
+        .order_by(Scenario.version_id.asc(), Scenario.scenario_set_code.asc())
+        .all()
+    )
+
+    public_sets: Dict[str, List[str]] = {}
+    draft_sets: Dict[str, List[str]] = {}
+    for version_id, set_code in set_rows:
+        if not set_code:
+            continue
+        target = draft_sets if set_code.startswith(DRAFT_SCENARIO_PREFIX) else public_sets
+        target.setdefault(version_id, []).append(set_code)
+
+    return VersionRegistry(
+        versions=MappingProxyType(
+            {
+                version.version_id: VersionEntry(
+                    version_id=version.version_id,
+                    is_active=bool(version.is_active),
+                    public_set_codes=tuple(public_sets.get(version.version_id, ())),
+                    draft_set_codes=tuple(draft_sets.get(version.version_id, ())),
+                )
+                for version in versions
+            }
+        ),
+        active_version_id=next((version.version_id for version in versions if version.is_active), None),
+    )
+
+
+_registry: Optional[Tuple[float, VersionRegistry]] = None
+_registry_lock = Lock()
+
+
+def get_version_registry(db: Session) -> VersionRegistry:
+    """Return the cached registry, rebuilding it on first use, after the TTL or an import."""
+    global _registry
+    check_content_revisions(db)
+    now = monotonic()
+    with _registry_lock:
+        cached = _registry
+    if cached and now - cached[0] < settings.VERSION_REGISTRY_TTL_SECONDS:
+        return cached[1]
+
+    registry = build_version_registry(db)
+    with _registry_lock:
+        _registry = (now, registry)
+    return registry
+
+
+def invalidate_version_registry(version_id: Optional[str] = None) -> None:
+    """Drop the cached registry; any content change can add versions or sets."""
+    global _registry
+    with _registry_lock:
+        _registry = None
+
+
+register_plan_invalidation_listener(invalidate_version_registry)
@@ -0,0 +1,75 @@
+"""Background flushing of the per-process write-behind buffers."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Dict, Optional, Protocol
+
+from sqlalchemy.orm import Session
+
+from app.core.activity_tracker import activity_tracker
+from app.core.config import settings
+from app.core.journey_progress import journey_progress
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer(Protocol):
+    def flush_due(self) -> bool: ...
+
+    def flush(self, db: Session) -> int: ...
+
+
+class WriteBehindFlusher:
+    """Flush each buffer once it is due, checked every ``poll_seconds``, and all of them on stop.
+
+    Requests still flush a buffer they find due; this task covers the quiet
+    periods in between, so buffered writes never wait for the next request,
+    and ``stop`` persists what is left when the process shuts down.
+    """
+
+    def __init__(self, buffers: Dict[str, WriteBehindBuffer], poll_seconds: float):
+        self.buffers = buffers
+        self.poll_seconds = poll_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def flush(self, force: bool = False) -> Dict[str, int]:
+        """Flush due buffers (or all with ``force``) in their own sessions; returns rows flushed per buffer."""
+        flushed: Dict[str, int] = {}
+        for name, buffer in self.buffers.items():
+            if not force and not buffer.flush_due():
+                continue
+            try:
+                with SessionLocal() as db:
+                    flushed[name] = buffer.flush(db)
+            except Exception:
+                # The buffer keeps the batch and the next flush retries it.
+                logger.exception("Flushing %s failed", name)
+        return flushed
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            await asyncio.to_thread(self.flush)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.flush, True)
+
+
+write_behind_flusher = WriteBehindFlusher(
+    buffers={"journey answers": journey_progress, "run activity": activity_tracker},
+    poll_seconds=settings.WRITE_BEHIND_POLL_SECONDS,
+)
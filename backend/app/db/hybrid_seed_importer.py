@@ -9,9 +9,11 @@ from datetime import date, datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Optional, Sequence, Set, Tuple
 
+from sqlalchemy import update
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
+from app.core.scoring_plan import invalidate_version_scoring_plans
 from app.db.session import SessionLocal
 from app.models import (
     AdviceItem,
@@ -237,6 +239,7 @@ def import_hybrid_seed_pack(seed_dir: Optional[Path] = None, dry_run: bool = Fal
     try:
         summary = _import_hybrid_seed_pack(db=db, seed_path=seed_path)
         db.commit()
+        invalidate_version_scoring_plans()
         return summary
     except Exception:
         db.rollback()
@@ -875,6 +878,14 @@ def _import_hybrid_seed_pack(db: Optional[Session], seed_path: Path) -> Dict[str
     )
     summary["prophet_trait_gene_weights"] = len(pt_payload)
 
+    if db is not None and version_ids:
+        # Committed with the content: every API process drops its cached content of these versions.
+        db.execute(
+            update(AppVersion)
+            .where(AppVersion.version_id.in_(sorted(version_ids)))
+            .values(content_revision=AppVersion.content_revision + 1)
+        )
+
     return summary
 
 
@@ -0,0 +1,197 @@
+"""Bulk writes of a journey submission."""
+
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, and_, bindparam, delete, exists, func, insert, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Executable
+
+from app.core.hybrid_engine import JourneyAnswer, OutcomeFrame
+from app.core.packed_results import ResultLayout, ensure_result_layout, pack_run_result
+from app.models import Answer, ComputedGeneScore, ComputedModelMatch, OfferedActivation, PackedRunResult
+
+
+ANSWER_TABLE: Table = Answer.__table__
+# Columns each submission writes per table, besides ``test_run_id``.
+SUBMISSION_COLUMNS: Dict[Table, Tuple[str, ...]] = {
+    ANSWER_TABLE: ("scenario_code", "option_code"),
+    ComputedGeneScore.__table__: ("gene_code", "raw_score", "normalized_score"),
+    ComputedModelMatch.__table__: ("model_code", "similarity", "rank"),
+    OfferedActivation.__table__: ("channel", "advice_id", "trigger_id"),
+}
+PACKED_TABLE: Table = PackedRunResult.__table__
+# Tables whose rows a packed submission folds into its single ``packed_run_results`` row.
+PACKED_TABLES = (ANSWER_TABLE, ComputedGeneScore.__table__, ComputedModelMatch.__table__)
+
+
+def _column_param(table: Table, column: str) -> str:
+    return f"{table.name}__{column}"
+
+
+@lru_cache(maxsize=2)
+def _postgres_submission_statement(packed: bool) -> Executable:
+    """One ``INSERT ... SELECT FROM unnest(...)`` per table, chained as CTEs.
+
+    Each column travels as a single array parameter, so the statement text is
+    the same for every submission and stays in SQLAlchemy's compiled cache.
+    Answers already flushed through ``/journey/answer`` are updated in place
+    and only the missing ones inserted; ``ON CONFLICT`` would make the
+    statement uncacheable. A packed submission instead drops the flushed
+    answers and writes one ``packed_run_results`` row.
+    """
+    # Not "test_run_id": insert() reserves bind names that equal column names.
+    test_run_id = bindparam("submitted_run_id", type_=Answer.test_run_id.type)
+    writes = []
+    if packed:
+        writes.append(delete(ANSWER_TABLE).where(ANSWER_TABLE.c.test_run_id == test_run_id))
+        writes.append(
+            insert(PACKED_TABLE).values(
+                {
+                    column.name: test_run_id
+                    if column.name == "test_run_id"
+                    else bindparam(_column_param(PACKED_TABLE, column.name), type_=column.type)
+                    for column in PACKED_TABLE.columns
+                }
+            )
+        )
+    for table, columns in SUBMISSION_COLUMNS.items():
+        if packed and table in PACKED_TABLES:
+            continue
+        rows = func.unnest(
+            *(bindparam(_column_param(table, name), type_=ARRAY(table.c[name].type)) for name in columns)
+        ).table_valued(*columns).render_derived(name=f"{table.name}_rows")
+        source = select(test_run_id, *(rows.c[name] for name in columns))
+        if table is ANSWER_TABLE:
+            existing = and_(table.c.test_run_id == test_run_id, table.c.scenario_code == rows.c.scenario_code)
+            writes.append(update(table).where(existing).values(option_code=rows.c.option_code))
+            source = source.where(~exists().where(existing))
+        writes.append(insert(table).from_select(["test_run_id", *columns], source))
+
+    *leading, last = writes
+    return last.add_cte(*(write.cte(f"submit_write_{index}") for index, write in enumerate(leading)))
+
+
+def _submission_rows(
+    test_run_id: int, answers: Sequence[JourneyAnswer], outcome: OutcomeFrame
+) -> Dict[Table, List[Dict[str, object]]]:
+    return {
+        ANSWER_TABLE: [
+            {"test_run_id": test_run_id, "scenario_code": answer.scenario_code, "option_code": answer.option_code}
+            for answer in answers
+        ],
+        ComputedGeneScore.__table__: [
+            {"test_run_id": test_run_id, "gene_code": gene_code, "raw_score": raw_score, "normalized_score": normalized}
+            for gene_code, raw_score, normalized in outcome.gene_scores.columns()
+        ],
+        ComputedModelMatch.__table__: [
+            {"test_run_id": test_run_id, "model_code": match.model_code, "similarity": match.similarity, "rank": match.rank}
+            for match in outcome.model_matches
+        ],
+        OfferedActivation.__table__: [
+            {"test_run_id": test_run_id, "channel": item.channel, "advice_id": item.advice_id, "trigger_id": item.trigger_id}
+            for item in outcome.activation_items
+        ],
+    }
+
+
+def persist_submission(
+    db: Session,
+    *,
+    test_run_id: int,
+    answers: Sequence[JourneyAnswer],
+    outcome: OutcomeFrame,
+    layout: Optional[ResultLayout] = None,
+) -> None:
+    """Write answers and computed results without committing.
+
+    With a ``layout`` the answers, gene scores and model matches are packed
+    into one ``packed_run_results`` row (see ``app.core.packed_results``).
+    On PostgreSQL the whole submission is one statement and one round trip.
+    Elsewhere each table is a single executemany. Computed rows are only
+    ever written once per run, because submit moves the run out of
+    ``started`` in the same transaction; a concurrent second write trips the
+    unique constraints.
+    """
+    rows_by_table = _submission_rows(test_run_id, answers, outcome)
+    packed_row = None
+    if layout is not None:
+        ensure_result_layout(db, layout)
+        packed_row = pack_run_result(
+            layout,
+            test_run_id=test_run_id,
+            answers={answer.scenario_code: answer.option_code for answer in answers},
+            gene_scores=outcome.gene_scores.columns(),
+            model_matches=outcome.model_matches,
+        )
+        for table in PACKED_TABLES:
+            del rows_by_table[table]
+
+    if db.get_bind().dialect.name == "postgresql":
+        params: Dict[str, object] = {"submitted_run_id": test_run_id}
+        for table, rows in rows_by_table.items():
+            for name in SUBMISSION_COLUMNS[table]:
+                params[_column_param(table, name)] = [row[name] for row in rows]
+        if packed_row is not None:
+            for name, value in packed_row.items():
+                if name != "test_run_id":
+                    params[_column_param(PACKED_TABLE, name)] = value
+        db.execute(_postgres_submission_statement(packed_row is not None), params)
+        return
+
+    if packed_row is not None:
+        db.execute(delete(ANSWER_TABLE).where(ANSWER_TABLE.c.test_run_id == test_run_id))
+        db.execute(insert(PACKED_TABLE), [packed_row])
+    for table, rows in rows_by_table.items():
+        if not rows:
+            continue
+        if table is ANSWER_TABLE:
+            answer_insert = sqlite_insert(table)
+            statement = answer_insert.on_conflict_do_update(
+                index_elements=["test_run_id", "scenario_code"],
+                set_={"option_code": answer_insert.excluded.option_code},
+            )
+        else:
+            statement = insert(table)
+        db.execute(statement, rows)
+
+
+def persist_new_submissions(
+    db: Session,
+    submissions: Sequence[Tuple[int, Sequence[JourneyAnswer], OutcomeFrame]],
+    layout: Optional[ResultLayout] = None,
+) -> None:
+    """Write many submissions of runs that have no stored rows yet, without committing.
+
+    For bulk cohort imports: every table is one executemany over all runs, so a
+    batch costs a handful of statements regardless of its size. Unlike
+    ``persist_submission`` nothing is upserted or deleted.
+    """
+    if not submissions:
+        return
+    rows_by_table: Dict[Table, List[Dict[str, object]]] = {table: [] for table in SUBMISSION_COLUMNS}
+    packed_rows: List[Dict[str, object]] = []
+    if layout is not None:
+        ensure_result_layout(db, layout)
+    for test_run_id, answers, outcome in submissions:
+        for table, rows in _submission_rows(test_run_id, answers, outcome).items():
+            if layout is None or table not in PACKED_TABLES:
+                rows_by_table[table].extend(rows)
+        if layout is not None:
+            packed_rows.append(
+                pack_run_result(
+                    layout,
+                    test_run_id=test_run_id,
+                    answers={answer.scenario_code: answer.option_code for answer in answers},
+                    gene_scores=outcome.gene_scores.columns(),
+                    model_matches=outcome.model_matches,
+                )
+            )
+
+    if packed_rows:
+        db.execute(insert(PACKED_TABLE), packed_rows)
+    for table, rows in rows_by_table.items():
+        if rows:
+            db.execute(insert(table), rows)
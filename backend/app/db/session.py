@@ -1,12 +1,26 @@
+import shlex
+import ssl
+from typing import AsyncIterator, Dict, Optional, Tuple
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
+# Each process opens at most DB_POOL_SIZE + DB_MAX_OVERFLOW connections here plus the
+# async pool below; Settings rejects pools that exceed DB_CONNECTION_BUDGET together.
+_pool_options = (
+    {"pool_size": settings.DB_POOL_SIZE, "max_overflow": settings.DB_MAX_OVERFLOW}
+    if make_url(settings.DATABASE_URL).get_backend_name() in ("postgresql", "postgres")
+    else {}
+)
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
-    echo=settings.ENVIRONMENT == "development"
+    echo=settings.ENVIRONMENT == "development",
+    **_pool_options,
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -21,3 +35,115 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+_LIBPQ_SSLMODES = ("disable", "allow", "prefer", "require", "verify-ca", "verify-full")
+
+
+def _libpq_ssl(sslmode: Optional[str], rootcert: Optional[str], cert: Optional[str], key: Optional[str]):
+    """asyncpg's ``ssl`` argument for libpq's sslmode and certificate files."""
+    if sslmode is not None and sslmode not in _LIBPQ_SSLMODES:
+        raise ValueError(f"Unsupported sslmode '{sslmode}' in DATABASE_URL")
+    if not (rootcert or cert) or sslmode in ("disable", "allow", "prefer"):
+        return sslmode
+    context = ssl.create_default_context(cafile=rootcert)
+    # Like libpq: a root certificate makes "require" verify the chain, only verify-full checks the host.
+    context.check_hostname = sslmode == "verify-full"
+    if not rootcert:
+        context.verify_mode = ssl.CERT_NONE
+    if cert:
+        context.load_cert_chain(cert, key)
+    return context
+
+
+def _libpq_server_settings(options: str) -> Dict[str, str]:
+    settings_by_name: Dict[str, str] = {}
+    tokens = iter(shlex.split(options))
+    for token in tokens:
+        if token == "-c":
+            token = next(tokens, "")
+        elif token.startswith("-c"):
+            token = token[2:]
+        elif token.startswith("--"):
+            token = token[2:]
+        else:
+            raise ValueError(f"Unsupported options entry '{token}' in DATABASE_URL")
+        name, separator, value = token.partition("=")
+        if not separator:
+            raise ValueError(f"Unsupported options entry '{token}' in DATABASE_URL")
+        settings_by_name[name.replace("-", "_")] = value
+    return settings_by_name
+
+
+def async_database_url(database_url: str) -> Tuple[URL, Dict[str, object]]:
+    """Point a sync Postgres URL at the asyncpg driver; returns the URL and ``connect_args``.
+
+    asyncpg takes none of libpq's query parameters as they are, so the
+    supported ones are translated: ``sslmode`` with ``sslrootcert``/``sslcert``/
+    ``sslkey`` into ``ssl``, ``application_name`` and ``options`` (``-c
+    name=value``) into ``server_settings`` and ``connect_timeout`` into
+    ``timeout``. Any other parameter raises ValueError when the engine is
+    built instead of failing on the first connect.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() not in ("postgresql", "postgres"):
+        return url, {}
+    query = dict(url.query)
+    connect_args: Dict[str, object] = {}
+    server_settings: Dict[str, str] = {}
+    ssl_argument = _libpq_ssl(
+        query.pop("sslmode", None),
+        query.pop("sslrootcert", None),
+        query.pop("sslcert", None),
+        query.pop("sslkey", None),
+    )
+    if ssl_argument is not None:
+        connect_args["ssl"] = ssl_argument
+    if "options" in query:
+        server_settings.update(_libpq_server_settings(query.pop("options")))
+    if "application_name" in query:
+        server_settings["application_name"] = query.pop("application_name")
+    if server_settings:
+        connect_args["server_settings"] = server_settings
+    if "connect_timeout" in query:
+        connect_args["timeout"] = float(query.pop("connect_timeout"))
+    if "target_session_attrs" in query:
+        connect_args["target_session_attrs"] = query.pop("target_session_attrs")
+    # host (e.g. a unix socket directory) is passed through to asyncpg by SQLAlchemy as it is.
+    passthrough = {name: query.pop(name) for name in ("host",) if name in query}
+    if query:
+        raise ValueError(f"DATABASE_URL parameters not supported by the async engine: {', '.join(sorted(query))}")
+    return url.set(drivername="postgresql+asyncpg", query=passthrough), connect_args
+
+
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    # Created on first use so processes that never touch the async path do not need asyncpg.
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        url, connect_args = async_database_url(settings.DATABASE_URL)
+        _async_engine = create_async_engine(
+            url,
+            connect_args=connect_args,
+            pool_pre_ping=True,
+            pool_size=settings.ASYNC_DB_POOL_SIZE,
+            max_overflow=settings.ASYNC_DB_MAX_OVERFLOW,
+            echo=settings.ENVIRONMENT == "development",
+        )
+        _async_session_factory = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=True)
+    return _async_engine
+
+
+def new_async_session() -> AsyncSession:
+    """Async session for work that outlives the request's dependencies, e.g. streamed responses."""
+    get_async_engine()
+    return _async_session_factory()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Dependency for async FastAPI routes to get database session."""
+    async with new_async_session() as db:
+        yield db
@@ -2,6 +2,7 @@
 FastAPI application entry point.
 """
 
+from contextlib import asynccontextmanager
 from typing import Optional
 
 from fastapi import Depends, FastAPI, Header, HTTPException, Query
@@ -9,6 +10,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
 
 from app.core.config import settings
+from app.core.share_sweeper import share_expiry_sweeper
+from app.core.write_behind import write_behind_flusher
 from app.api import admin, journey, results, shares, test
 
 # Docs configuration
@@ -28,8 +31,20 @@ def _require_admin_key(
     return candidate
 
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    if settings.SHARE_SWEEP_INTERVAL_SECONDS > 0:
+        share_expiry_sweeper.start()
+    if settings.WRITE_BEHIND_POLL_SECONDS > 0:
+        write_behind_flusher.start()
+    yield
+    await share_expiry_sweeper.stop()
+    await write_behind_flusher.stop()
+
+
 # Create FastAPI app
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.PROJECT_NAME,
     version="1.0.0",
     description="Personality matching app API - Find your idol twin!",
@@ -21,8 +21,12 @@ from app.models.hybrid import (
     Answer,
     ComputedGeneScore,
     ComputedModelMatch,
+    OfferedActivation,
+    PackedResultLayout,
+    PackedRunResult,
     Feedback,
     ResultShare,
+    RateLimitState,
 )
 
 __all__ = [
@@ -48,6 +52,10 @@ __all__ = [
     "Answer",
     "ComputedGeneScore",
     "ComputedModelMatch",
+    "OfferedActivation",
+    "PackedResultLayout",
+    "PackedRunResult",
     "Feedback",
     "ResultShare",
+    "RateLimitState",
 ]
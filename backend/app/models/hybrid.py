@@ -7,12 +7,13 @@ from sqlalchemy import (
     ForeignKey,
     ForeignKeyConstraint,
     Integer,
+    LargeBinary,
     String,
     Text,
     UniqueConstraint,
 )
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 
 from app.db.session import Base
@@ -26,6 +27,8 @@ class AppVersion(Base):
     is_active = Column(Boolean, nullable=False, default=False)
     published_at = Column(DateTime(timezone=True), nullable=True)
     notes = Column(Text, nullable=True)
+    # Bumped with every content import; API processes compare it to drop their cached content.
+    content_revision = Column(Integer, nullable=False, default=0, server_default="0")
 
     genes = relationship("Gene", back_populates="app_version")
     scenarios = relationship("Scenario", back_populates="app_version")
@@ -263,11 +266,17 @@ class TestRun(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     last_activity_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
     submitted_at = Column(DateTime(timezone=True), nullable=True)
+    # Full submit-answers response (both languages), served again on retries and GET /journey/{id}/result.
+    result_jsonb = deferred(Column(JSONB, nullable=True))
+    # Share reports per language, built from the same outcome at submit; see build_share_snapshots.
+    share_snapshots_jsonb = deferred(Column(JSONB, nullable=True))
 
     app_version = relationship("AppVersion", back_populates="test_runs")
     answers = relationship("Answer", back_populates="test_run")
     computed_gene_scores = relationship("ComputedGeneScore", back_populates="test_run")
     computed_model_matches = relationship("ComputedModelMatch", back_populates="test_run")
+    offered_activations = relationship("OfferedActivation", back_populates="test_run")
+    packed_result = relationship("PackedRunResult", back_populates="test_run", uselist=False)
     feedback_entries = relationship("Feedback", back_populates="test_run")
     result_shares = relationship("ResultShare", back_populates="test_run", cascade="all, delete-orphan")
 
@@ -295,6 +304,19 @@ class ResultShare(Base):
     test_run = relationship("TestRun", back_populates="result_shares")
 
 
+class RateLimitState(Base):
+    """Shared GCRA state of one rate-limit key: its theoretical arrival time (epoch seconds).
+
+    The migration creates it UNLOGGED on PostgreSQL: losing it in a crash only
+    resets the limits.
+    """
+
+    __tablename__ = "rate_limit_state"
+
+    bucket_key = Column(String(128), primary_key=True)
+    tat = Column(Float, nullable=False, index=True)
+
+
 class Answer(Base):
     __tablename__ = "answers"
     __table_args__ = (
@@ -341,6 +363,52 @@ class ComputedModelMatch(Base):
     test_run = relationship("TestRun", back_populates="computed_model_matches")
 
 
+class OfferedActivation(Base):
+    __tablename__ = "offered_activations"
+    __table_args__ = (
+        UniqueConstraint("test_run_id", "channel", name="uq_offered_activations_test_run_channel"),
+        UniqueConstraint("test_run_id", "advice_id", name="uq_offered_activations_test_run_advice"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    test_run_id = Column(Integer, ForeignKey("test_runs.id", ondelete="CASCADE"), nullable=False, index=True)
+    channel = Column(String(32), nullable=False)
+    advice_id = Column(String(64), nullable=False)
+    trigger_id = Column(String(64), nullable=True)
+
+    test_run = relationship("TestRun", back_populates="offered_activations")
+
+
+class PackedResultLayout(Base):
+    """Code order that packed run results are encoded against, shared by all runs with the same content."""
+
+    __tablename__ = "packed_result_layouts"
+
+    layout_hash = Column(String(64), primary_key=True)
+    version_id = Column(String(50), ForeignKey("app_versions.version_id"), nullable=False, index=True)
+    # JSON: [[scenario_code, [option_code, ...]], ...] in set order, options sorted.
+    scenario_layout = Column(Text, nullable=False)
+    gene_codes = Column(Text, nullable=False)
+    model_codes = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class PackedRunResult(Base):
+    """Answers and computed scores of one submitted run, packed into little-endian arrays."""
+
+    __tablename__ = "packed_run_results"
+
+    test_run_id = Column(Integer, ForeignKey("test_runs.id", ondelete="CASCADE"), primary_key=True)
+    layout_hash = Column(String(64), ForeignKey("packed_result_layouts.layout_hash"), nullable=False)
+    option_indices = Column(LargeBinary, nullable=False)
+    raw_scores = Column(LargeBinary, nullable=False)
+    normalized_scores = Column(LargeBinary, nullable=False)
+    model_indices = Column(LargeBinary, nullable=False)
+    model_similarities = Column(LargeBinary, nullable=False)
+
+    test_run = relationship("TestRun", back_populates="packed_result")
+
+
 class Feedback(Base):
     __tablename__ = "feedback"
     __table_args__ = (
@@ -30,22 +30,50 @@ class JourneyScenario(BaseModel):
     options: List[JourneyScenarioOption]
 
 
+class JourneyAnswerSubmission(BaseModel):
+    scenario_code: str
+    option_code: str
+
+
 class JourneyStartResponse(BaseModel):
     test_run_id: int
     version_id: str
     owner_token: Optional[str] = None
     scenarios: List[JourneyScenario]
+    answers: List[JourneyAnswerSubmission] = Field(default_factory=list)
+    # Identifies the scenario/option order that compact ``option_indices`` submissions refer to.
+    content_hash: Optional[str] = None
 
 
-class JourneyAnswerSubmission(BaseModel):
-    scenario_code: str
-    option_code: str
+class JourneyAnswerRequest(BaseModel):
+    test_run_id: int = Field(..., ge=1)
+    scenario_code: str = Field(..., min_length=1, max_length=32)
+    option_code: str = Field(..., min_length=1, max_length=32)
+
+
+class JourneyAnswerResponse(BaseModel):
+    test_run_id: int
+    answered_count: int
 
 
 class JourneySubmitAnswersRequest(BaseModel):
     version_id: str
     test_run_id: int = Field(..., ge=1)
-    answers: List[JourneyAnswerSubmission] = Field(..., min_length=1)
+    # Empty means "submit the answers already recorded through /journey/answer".
+    answers: List[JourneyAnswerSubmission] = Field(default_factory=list)
+    # Compact alternative to ``answers``: one index per scenario, in scenario order, into
+    # the scenario's options sorted by option_code; requires the start response's content_hash.
+    option_indices: Optional[List[int]] = Field(default=None, min_length=1)
+    content_hash: Optional[str] = Field(default=None, min_length=1, max_length=64)
+
+    @model_validator(mode="after")
+    def ensure_single_answer_encoding(self) -> "JourneySubmitAnswersRequest":
+        if self.option_indices is not None:
+            if self.answers:
+                raise ValueError("Send either answers or option_indices, not both")
+            if self.content_hash is None:
+                raise ValueError("option_indices requires content_hash")
+        return self
 
 
 class JourneyPreviewSubmitAnswersRequest(BaseModel):
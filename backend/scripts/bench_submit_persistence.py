@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+from pathlib import Path
+from time import perf_counter
+from typing import Optional, Sequence
+
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session, sessionmaker
+
+# Run as `python scripts/bench_submit_persistence.py` from backend/: make `app` importable.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.hybrid_engine import ActivationItemResult, JourneyAnswer, ModelMatchResult, OutcomeFrame, rank_gene_scores
+from app.db.journey_persistence import persist_submission
+from app.db.session import Base
+from app.models import Answer, AppVersion, ComputedGeneScore, ComputedModelMatch, OfferedActivation, TestRun
+
+BENCH_VERSION_ID = "bench_submit"
+TABLES = [
+    AppVersion.__table__,
+    TestRun.__table__,
+    Answer.__table__,
+    ComputedGeneScore.__table__,
+    ComputedModelMatch.__table__,
+    OfferedActivation.__table__,
+]
+
+
+@compiles(JSONB, "sqlite")
+def compile_jsonb_sqlite(_type, _compiler, **_kwargs):
+    # test_runs has JSONB columns; sqlite stores them as JSON text.
+    return "JSON"
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare per-row ORM writes with bulk persist_submission for journey submits."
+    )
+    parser.add_argument(
+        "--database-url",
+        default="sqlite:///:memory:",
+        help="Database to benchmark against (default: in-memory sqlite).",
+    )
+    parser.add_argument("--runs", type=int, default=500, help="Submissions per strategy (default: 500).")
+    parser.add_argument("--scenarios", type=int, default=30, help="Answers per submission (default: 30).")
+    parser.add_argument("--genes", type=int, default=24, help="Gene scores per submission (default: 24).")
+    parser.add_argument("--models", type=int, default=5, help="Model matches per submission (default: 5).")
+    return parser.parse_args(argv)
+
+
+def build_submission(args: argparse.Namespace):
+    answers = [JourneyAnswer(scenario_code=f"S{index:03d}", option_code="A") for index in range(args.scenarios)]
+    outcome = OutcomeFrame(
+        gene_scores=rank_gene_scores({f"G{index:03d}": float(index % 7) for index in range(args.genes)}),
+        model_matches=[
+            ModelMatchResult(model_code=f"M{index:03d}", similarity=1.0 / (index + 1), rank=index + 1)
+            for index in range(args.models)
+        ],
+        activation_items=[
+            ActivationItemResult(
+                channel=channel,
+                advice_id=f"ADV_{channel}",
+                advice_type=channel,
+                title_en="Title",
+                title_ar=None,
+                body_en="Body",
+                body_ar=None,
+                priority=1,
+                trigger_id=None,
+                is_fallback=True,
+            )
+            for channel in ("behavior", "reflection", "action")
+        ],
+        quran_values=[],
+        prophet_traits=[],
+    )
+    return answers, outcome
+
+
+def persist_with_orm(db: Session, test_run_id: int, answers, outcome: OutcomeFrame) -> None:
+    for answer in answers:
+        db.add(Answer(test_run_id=test_run_id, scenario_code=answer.scenario_code, option_code=answer.option_code))
+    for gene_code, raw_score, normalized_score in outcome.gene_scores.columns():
+        db.add(
+            ComputedGeneScore(
+                test_run_id=test_run_id,
+                gene_code=gene_code,
+                raw_score=raw_score,
+                normalized_score=normalized_score,
+            )
+        )
+    for match in outcome.model_matches:
+        db.add(
+            ComputedModelMatch(
+                test_run_id=test_run_id,
+                model_code=match.model_code,
+                similarity=match.similarity,
+                rank=match.rank,
+            )
+        )
+    for item in outcome.activation_items:
+        db.add(
+            OfferedActivation(
+                test_run_id=test_run_id,
+                channel=item.channel,
+                advice_id=item.advice_id,
+                trigger_id=item.trigger_id,
+            )
+        )
+
+
+def persist_in_bulk(db: Session, test_run_id: int, answers, outcome: OutcomeFrame) -> None:
+    persist_submission(db, test_run_id=test_run_id, answers=answers, outcome=outcome)
+
+
+def run_strategy(SessionLocal, writer, args: argparse.Namespace, answers, outcome: OutcomeFrame) -> float:
+    db = SessionLocal()
+    try:
+        runs = [TestRun(version_id=BENCH_VERSION_ID) for _ in range(args.runs)]
+        db.add_all(runs)
+        db.commit()
+        run_ids = [run.id for run in runs]
+
+        started = perf_counter()
+        for test_run_id in run_ids:
+            writer(db, test_run_id, answers, outcome)
+            db.commit()
+        elapsed = perf_counter() - started
+
+        for model in (Answer, ComputedGeneScore, ComputedModelMatch, OfferedActivation):
+            db.query(model).filter(model.test_run_id.in_(run_ids)).delete(synchronize_session=False)
+        db.query(TestRun).filter(TestRun.id.in_(run_ids)).delete(synchronize_session=False)
+        db.commit()
+        return elapsed
+    finally:
+        db.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = SessionLocal()
+    try:
+        if db.get(AppVersion, BENCH_VERSION_ID) is None:
+            db.add(AppVersion(version_id=BENCH_VERSION_ID, name="Submit persistence benchmark", is_active=False))
+            db.commit()
+    finally:
+        db.close()
+
+    answers, outcome = build_submission(args)
+    rows_per_run = len(answers) + len(outcome.gene_scores) + len(outcome.model_matches) + len(outcome.activation_items)
+    for label, writer in (("orm add", persist_with_orm), ("bulk insert", persist_in_bulk)):
+        elapsed = run_strategy(SessionLocal, writer, args, answers, outcome)
+        print(
+            f"{label:>12}: {args.runs} submits in {elapsed:.3f}s "
+            f"({args.runs / elapsed:.0f} submits/s, {args.runs * rows_per_run / elapsed:.0f} rows/s)"
+        )
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
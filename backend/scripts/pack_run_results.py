@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+import argparse
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from app.core.hybrid_engine import ModelMatchResult
+from app.core.packed_results import ResultLayout, build_result_layout, ensure_result_layout, pack_run_result
+from app.core.scenario_content import get_scenario_set_content
+from app.core.scoring_plan import get_version_scoring_plan
+from app.db.session import SessionLocal
+from app.models import Answer, ComputedGeneScore, ComputedModelMatch, PackedRunResult, TestRun
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Copy answer, gene-score and model-match rows of submitted runs into packed_run_results."
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Runs packed per transaction (default: 500).",
+    )
+    parser.add_argument(
+        "--keep-rows",
+        action="store_true",
+        help="Keep the original rows after packing (default: delete them).",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Show how many runs would be packed without writing anything.",
+    )
+    return parser.parse_args()
+
+
+def _rows_by_run(db, model, run_ids: List[int]) -> Dict[int, list]:
+    grouped = defaultdict(list)
+    for row in db.query(model).filter(model.test_run_id.in_(run_ids)):
+        grouped[row.test_run_id].append(row)
+    return grouped
+
+
+def main() -> None:
+    args = parse_args()
+    db = SessionLocal()
+    layouts: Dict[Tuple[str, Optional[str]], ResultLayout] = {}
+    packed_count = 0
+    skipped_count = 0
+    last_run_id = 0
+
+    try:
+        while True:
+            runs = (
+                db.query(TestRun)
+                .filter(
+                    TestRun.status == "completed",
+                    TestRun.id > last_run_id,
+                    ~TestRun.packed_result.has(),
+                    TestRun.computed_gene_scores.any(),
+                )
+                .order_by(TestRun.id.asc())
+                .limit(args.batch_size)
+                .all()
+            )
+            if not runs:
+                break
+            last_run_id = runs[-1].id
+            run_ids = [run.id for run in runs]
+            answers_by_run = _rows_by_run(db, Answer, run_ids)
+            genes_by_run = _rows_by_run(db, ComputedGeneScore, run_ids)
+            models_by_run = _rows_by_run(db, ComputedModelMatch, run_ids)
+
+            packed_rows = []
+            for run in runs:
+                key = (run.version_id, run.scenario_set_code or None)
+                if key not in layouts:
+                    layouts[key] = build_result_layout(
+                        get_version_scoring_plan(db, run.version_id),
+                        get_scenario_set_content(db, *key),
+                    )
+                layout = layouts[key]
+                gene_rows = genes_by_run[run.id]
+                # Runs scored against different genes than the current content stay as rows.
+                if {row.gene_code for row in gene_rows} != set(layout.gene_codes):
+                    skipped_count += 1
+                    continue
+                try:
+                    packed_rows.append(
+                        pack_run_result(
+                            layout,
+                            test_run_id=run.id,
+                            answers={row.scenario_code: row.option_code for row in answers_by_run[run.id]},
+                            gene_scores=[(row.gene_code, row.raw_score, row.normalized_score) for row in gene_rows],
+                            model_matches=[
+                                ModelMatchResult(model_code=row.model_code, similarity=row.similarity, rank=row.rank)
+                                for row in sorted(models_by_run[run.id], key=lambda row: row.rank)
+                            ],
+                        )
+                    )
+                except ValueError:
+                    skipped_count += 1
+            packed_count += len(packed_rows)
+
+            if args.dry_run or not packed_rows:
+                db.rollback()
+                continue
+            for layout in {layouts[(run.version_id, run.scenario_set_code or None)] for run in runs}:
+                ensure_result_layout(db, layout)
+            db.bulk_insert_mappings(PackedRunResult, packed_rows)
+            if not args.keep_rows:
+                packed_ids = [row["test_run_id"] for row in packed_rows]
+                for model in (Answer, ComputedGeneScore, ComputedModelMatch):
+                    db.query(model).filter(model.test_run_id.in_(packed_ids)).delete(synchronize_session=False)
+            db.commit()
+
+        prefix = "[DRY RUN] " if args.dry_run else ""
+        print(f"{prefix}packed runs: {packed_count}")
+        print(f"{prefix}runs left as rows (content no longer matches): {skipped_count}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
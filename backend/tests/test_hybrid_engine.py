@@ -1,13 +1,145 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+import math
+import random
 import unittest
+from unittest.mock import patch
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
 
 from app.core.hybrid_engine import (
     GeneScoreResult,
+    JourneyAnswer,
     ModelMatchResult,
-    _cosine_similarity,
+    QuranValueScoreResult,
+    ScoreFrame,
+    _model_similarity_matrix,
     _select_activation_items,
+    compute_hybrid_outcome,
+    compute_hybrid_outcome_batch,
+    compute_derived_values,
+    compute_model_matches,
+    compute_prophet_traits,
+    compute_quran_values,
     rank_gene_scores,
+    rank_gene_vector,
+)
+from app.core.activation_index import compile_activation_index
+from app.core.outcome_cache import OutcomeCache
+from app.core.scoring_plan import (
+    AdviceItemRecord,
+    AdviceTriggerRecord,
+    VersionScoringPlan,
+    _frozen_matrix,
+    build_version_scoring_plan,
+    compile_derived_values,
+    _unit_rows,
 )
+from app.db.hybrid_seed_importer import _default_seed_dir, _import_hybrid_seed_pack
+from app.db.session import Base
+from app.models import (
+    AdviceItem,
+    AdviceTrigger,
+    AppVersion,
+    Gene,
+    OptionWeight,
+    ProphetTrait,
+    ProphetTraitGeneWeight,
+    QuranValue,
+    QuranValueGeneWeight,
+    SahabaModel,
+    Scenario,
+    ScenarioOption,
+)
+
+
+@compiles(JSONB, "sqlite")
+def compile_jsonb_sqlite(_type, _compiler, **_kwargs):
+    return "TEXT"
+
+
+def _model_plan(gene_codes, model_vectors):
+    model_codes = tuple(sorted(model_vectors))
+    matrix = np.array([model_vectors[code] for code in model_codes], dtype=np.float64)
+    return VersionScoringPlan(
+        version_id="v_test",
+        gene_codes=tuple(gene_codes),
+        gene_index={code: index for index, code in enumerate(gene_codes)},
+        option_rows={},
+        option_gene_weights=np.zeros((0, len(gene_codes))),
+        model_codes=model_codes,
+        model_matrix=_unit_rows(matrix),
+        derived_families={},
+        derived_matrix=np.zeros((0, len(gene_codes))),
+        advice_items=(),
+        triggers=(),
+        activation_index=compile_activation_index((), ()),
+    )
+
+
+def _reference_cosine(vector_a, vector_b):
+    """Pairwise cosine with correctly rounded sums, the reference the engine is held to."""
+    norm_a = math.sqrt(math.fsum(a * a for a in vector_a))
+    norm_b = math.sqrt(math.fsum(b * b for b in vector_b))
+    if norm_a == 0.0 or norm_b == 0.0:
+        return 0.0
+    return math.fsum(a * b for a, b in zip(vector_a, vector_b)) / (norm_a * norm_b)
+
+
+def _random_plan(rng, scenario_count=12, option_codes="ABCD"):
+    gene_codes = tuple(f"G{index:02d}" for index in range(8))
+    option_rows = {}
+    option_weights = []
+    for scenario_index in range(scenario_count):
+        for option_code in option_codes:
+            option_rows[(f"S{scenario_index:02d}", option_code)] = len(option_weights)
+            option_weights.append([rng.choice([0.0, 0.0, 0.5, 1.0, 1.5, rng.random() * 2]) for _ in gene_codes])
+    model_codes = tuple(f"M{index:02d}" for index in range(10))
+    model_vectors = [[rng.random() for _ in gene_codes] for _ in model_codes]
+    advice_items = tuple(
+        AdviceItemRecord(f"A_{channel}_{index}", channel, "activation", "t", None, "b", None, rng.randint(1, 3))
+        for channel in ("behavior", "reflection", "social")
+        for index in range(3)
+    )
+    triggers = tuple(
+        AdviceTriggerRecord(
+            trigger_id=f"T{index:02d}",
+            trigger_type=rng.choice(["TOP_GENE", "secondary_gene", "TOP_2_GENE", "ANY"]),
+            gene_code=rng.choice(gene_codes),
+            model_code=None,
+            channel=item.channel,
+            advice_id=item.advice_id,
+            min_score=rng.choice([0.0, 40.0]),
+            max_score=100.0,
+        )
+        for index, item in enumerate(advice_items)
+    )
+    gene_index = {code: index for index, code in enumerate(gene_codes)}
+    derived_families, derived_matrix = compile_derived_values(
+        gene_index,
+        [
+            ("quran_values", [(f"Q{index}", {code: rng.random() for code in gene_codes[:4]}) for index in range(4)]),
+            ("prophet_traits", [(f"P{index}", {code: rng.random() for code in gene_codes[4:]}) for index in range(2)]),
+        ],
+    )
+    return VersionScoringPlan(
+        version_id="v_test",
+        gene_codes=gene_codes,
+        gene_index=gene_index,
+        option_rows=option_rows,
+        option_gene_weights=_frozen_matrix(option_weights, len(gene_codes)),
+        model_codes=model_codes,
+        model_matrix=_unit_rows(_frozen_matrix(model_vectors, len(gene_codes))),
+        derived_families=derived_families,
+        derived_matrix=derived_matrix,
+        advice_items=advice_items,
+        triggers=triggers,
+        activation_index=compile_activation_index(advice_items, triggers),
+    )
 
 
 @dataclass
@@ -34,6 +166,52 @@ class DummyAdviceTrigger:
     max_score: float
 
 
+def _linear_scan_selection(advice_items, triggers, gene_scores, model_matches):
+    """Reference selection: scan every trigger per channel (pre-index behaviour)."""
+    advice_by_id = {item.advice_id: item for item in advice_items}
+    normalized = {entry.gene_code: entry.normalized_score for entry in gene_scores}
+    roles = {entry.role: entry.gene_code for entry in gene_scores if entry.role}
+    model_scores = {entry.model_code: entry.similarity * 100.0 for entry in model_matches}
+    top_model = model_matches[0].model_code if model_matches else None
+    type_targets = {
+        "TOP_GENE": lambda t: t.gene_code == roles.get("dominant"),
+        "SECONDARY_GENE": lambda t: t.gene_code == roles.get("secondary"),
+        "SUPPORT_GENE": lambda t: t.gene_code == roles.get("support"),
+        "TOP_2_GENE": lambda t: t.gene_code in {roles.get("dominant"), roles.get("secondary")},
+        "TOP2_GENE": lambda t: t.gene_code in {roles.get("dominant"), roles.get("secondary")},
+        "TOP_MODEL": lambda t: t.model_code == top_model,
+        "BEST_MODEL": lambda t: t.model_code == top_model,
+        "ANY": lambda t: True,
+    }
+    selected = []
+    for channel in ("behavior", "reflection", "social"):
+        candidates = []
+        for trigger in triggers:
+            advice = advice_by_id.get(trigger.advice_id)
+            matcher = type_targets.get(trigger.trigger_type.upper())
+            if trigger.channel != channel or advice is None or matcher is None or not matcher(trigger):
+                continue
+            match_score = 0.0
+            scores = []
+            if trigger.gene_code:
+                scores.append(normalized.get(trigger.gene_code))
+            if trigger.model_code:
+                scores.append(model_scores.get(trigger.model_code))
+            if any(score is None or not trigger.min_score <= score <= trigger.max_score for score in scores):
+                continue
+            match_score = max([match_score] + scores)
+            candidates.append((-advice.priority, -round(match_score, 4), advice.advice_id, trigger.trigger_id))
+        if candidates:
+            selected.append((channel, min(candidates)[2], min(candidates)[3]))
+        else:
+            fallback = min(
+                (item for item in advice_items if item.channel == channel),
+                key=lambda item: (-item.priority, item.advice_id),
+            )
+            selected.append((channel, fallback.advice_id, None))
+    return selected
+
+
 class HybridEngineTests(unittest.TestCase):
     def test_rank_gene_scores_assigns_roles_and_normalizes(self):
         ranked = rank_gene_scores({"WIS": 6.0, "CRG": 4.0, "EMP": 2.0})
@@ -42,8 +220,253 @@ class HybridEngineTests(unittest.TestCase):
         self.assertEqual([entry.role for entry in ranked[:3]], ["dominant", "secondary", "support"])
         self.assertEqual([entry.normalized_score for entry in ranked[:3]], [100.0, 66.67, 33.33])
 
-    def test_cosine_similarity_handles_zero_vector(self):
-        self.assertEqual(_cosine_similarity([0.0, 0.0], [0.2, 0.4]), 0.0)
+    def test_rank_gene_vector_matches_scalar_accumulation_bit_for_bit(self):
+        rng = random.Random(7)
+        gene_codes = [f"G{index:02d}" for index in range(20)]
+        for _ in range(200):
+            rows = [
+                [rng.choice([0.0, 0.0, 0.1, 0.3, 0.7, 1.0, 2.5, rng.random() * 3]) for _ in gene_codes]
+                for _ in range(rng.randint(1, 48))
+            ]
+            raw_by_gene = {gene_code: 0.0 for gene_code in gene_codes}
+            for row in rows:
+                for gene_code, weight in zip(gene_codes, row):
+                    raw_by_gene[gene_code] += weight
+
+            vectorized = rank_gene_vector(gene_codes, np.array(rows, dtype=np.float64).sum(axis=0))
+            expected_order = sorted(raw_by_gene.items(), key=lambda pair: (-pair[1], pair[0]))
+            max_raw = max(raw_by_gene.values())
+
+            self.assertEqual([entry.gene_code for entry in vectorized], [code for code, _ in expected_order])
+            for entry, (gene_code, raw_score) in zip(vectorized, expected_order):
+                expected_normalized = 0.0 if max_raw <= 0 else max(0.0, min(100.0, (raw_score / max_raw) * 100.0))
+                self.assertEqual(entry.raw_score, round(raw_score, 4))
+                self.assertEqual(entry.normalized_score, round(expected_normalized, 2))
+
+    def test_gene_score_frame_items_and_columns_agree(self):
+        frame = rank_gene_scores({"WIS": 6.00004, "CRG": 4.0, "EMP": 2.0, "PAT": 0.0})
+
+        items = list(frame)
+        self.assertEqual(len(frame), 4)
+        self.assertEqual(frame.top(2), items[:2])
+        self.assertEqual(frame[-1], items[3])
+        self.assertEqual(frame, items)
+        self.assertEqual(
+            list(frame.columns()),
+            [(item.gene_code, item.raw_score, item.normalized_score) for item in items],
+        )
+        self.assertEqual([item.role for item in items], ["dominant", "secondary", "support", None])
+        with self.assertRaises(IndexError):
+            frame[4]
+
+    def test_rank_gene_scores_breaks_ties_by_gene_code(self):
+        ranked = rank_gene_scores({"WIS": 3.0, "CRG": 3.0, "EMP": 0.0})
+
+        self.assertEqual([entry.gene_code for entry in ranked], ["CRG", "WIS", "EMP"])
+
+    def test_compute_model_matches_agrees_with_scalar_cosine(self):
+        rng = random.Random(11)
+        gene_codes = [f"G{index:02d}" for index in range(20)]
+        model_vectors = {
+            f"M{index:03d}": [rng.choice([0.0, 0.2, 0.5, 1.0, rng.random()]) for _ in gene_codes]
+            for index in range(300)
+        }
+        model_vectors["M_DUP"] = list(model_vectors["M000"])
+        model_vectors["M_ZERO"] = [0.0] * len(gene_codes)
+        plan = _model_plan(gene_codes, model_vectors)
+
+        for _ in range(25):
+            raw_scores = [round(rng.random() * 10, 4) for _ in gene_codes]
+            gene_scores = rank_gene_vector(gene_codes, np.array(raw_scores))
+            reference = {code: _reference_cosine(raw_scores, vector) for code, vector in model_vectors.items()}
+            similarities = _model_similarity_matrix(plan, np.array([raw_scores]))[0]
+            np.testing.assert_allclose(
+                similarities, [reference[code] for code in plan.model_codes], rtol=0.0, atol=1e-12
+            )
+            expected = sorted(
+                ((code, round(similarity, 6)) for code, similarity in reference.items()),
+                key=lambda pair: (-pair[1], pair[0]),
+            )[:5]
+
+            matches = compute_model_matches(plan, gene_scores, top_n=5)
+
+            self.assertEqual([(match.model_code, match.similarity) for match in matches], expected)
+            self.assertEqual([match.rank for match in matches], [1, 2, 3, 4, 5])
+
+    def test_compute_model_matches_keeps_code_tie_break(self):
+        plan = _model_plan(["A", "B"], {"Z": [1.0, 1.0], "Y": [2.0, 2.0], "X": [1.0, 0.0]})
+        gene_scores = rank_gene_vector(["A", "B"], np.array([3.0, 3.0]))
+
+        matches = compute_model_matches(plan, gene_scores, top_n=1)
+
+        self.assertEqual([(match.model_code, match.similarity) for match in matches], [("Y", 1.0)])
+
+    def test_batch_outcomes_match_single_runs(self):
+        rng = random.Random(3)
+        plan = _random_plan(rng)
+        answer_sets = []
+        for _ in range(300):
+            scenario_count = rng.choice([12, 12, 12, 7])
+            answer_sets.append(
+                [
+                    JourneyAnswer(scenario_code=f"S{index:02d}", option_code=rng.choice("ABCD"))
+                    for index in rng.sample(range(12), scenario_count)
+                ]
+            )
+
+        batched = compute_hybrid_outcome_batch(plan, answer_sets, top_model_n=3)
+
+        self.assertEqual(len(batched), len(answer_sets))
+        for answers, outcome in zip(answer_sets, batched):
+            self.assertEqual(outcome, compute_hybrid_outcome(plan, answers, top_model_n=3))
+
+    def test_batch_reports_the_invalid_answer_set(self):
+        plan = _random_plan(random.Random(5))
+        answer_sets = [
+            [JourneyAnswer(scenario_code="S00", option_code="A")],
+            [JourneyAnswer(scenario_code="S00", option_code="Z")],
+        ]
+
+        with self.assertRaises(ValueError) as ctx:
+            compute_hybrid_outcome_batch(plan, answer_sets)
+
+        self.assertIn("answer set 1", str(ctx.exception))
+
+    def test_indexed_activation_selection_matches_linear_scan(self):
+        rng = random.Random(17)
+        gene_codes = ["CRG", "EMP", "WIS", "JUS"]
+        model_codes = ["M1", "M2", "M3"]
+        trigger_types = ["TOP_GENE", "top_gene", "SECONDARY_GENE", "SUPPORT_GENE", "TOP2_GENE",
+                         "TOP_2_GENE", "TOP_MODEL", "BEST_MODEL", "ANY", "UNKNOWN"]
+        for _ in range(200):
+            advice_items = [
+                DummyAdviceItem(f"A_{channel}_{index}", channel, "activation", "t", "", "b", "", rng.randint(1, 3))
+                for channel in ("behavior", "reflection", "social")
+                for index in range(3)
+            ]
+            triggers = []
+            for index in range(rng.randint(0, 20)):
+                trigger_type = rng.choice(trigger_types)
+                min_score = rng.choice([0.0, 30.0, 60.0, 90.0])
+                triggers.append(
+                    DummyAdviceTrigger(
+                        trigger_id=f"T{index:02d}",
+                        trigger_type=trigger_type,
+                        gene_code=rng.choice(gene_codes + [None]) if "MODEL" not in trigger_type else None,
+                        model_code=rng.choice(model_codes + [None]) if trigger_type != "TOP_GENE" else None,
+                        channel=rng.choice(["behavior", "reflection", "social"]),
+                        advice_id=rng.choice([item.advice_id for item in advice_items] + ["MISSING"]),
+                        min_score=min_score,
+                        max_score=rng.choice([min_score, 70.0, 100.0]) if min_score <= 70.0 else 100.0,
+                    )
+                )
+            gene_scores = rank_gene_scores({code: float(rng.randint(0, 6)) for code in gene_codes})
+            model_matches = [
+                ModelMatchResult(model_code=code, similarity=round(rng.random(), 6), rank=rank)
+                for rank, code in enumerate(rng.sample(model_codes, rng.randint(0, 3)), start=1)
+            ]
+
+            selected = _select_activation_items(advice_items, triggers, gene_scores, model_matches)
+
+            self.assertEqual(
+                [(item.channel, item.advice_id, item.trigger_id) for item in selected],
+                _linear_scan_selection(advice_items, triggers, gene_scores, model_matches),
+            )
+
+    def test_derived_values_match_per_row_weighted_sums(self):
+        gene_index = {"G1": 0, "G2": 1, "G3": 2}
+        tables = [
+            ("quran_values", [("Q1", {"G1": 0.5, "G2": 0.25}), ("Q2", {"G3": 1.0, "G9": 4.0}), ("Q3", None)]),
+            ("prophet_traits", [("P1", {"G2": 1.0}), ("P2", {"G1": 0.1, "G3": 0.2})]),
+            ("future_family", [("F1", {"G1": 1.0, "G2": 1.0, "G3": 1.0})]),
+        ]
+        derived_families, derived_matrix = compile_derived_values(gene_index, tables)
+        plan = replace(
+            _model_plan(("G1", "G2", "G3"), {"M1": [1.0, 0.0, 0.0]}),
+            derived_families=derived_families,
+            derived_matrix=derived_matrix,
+        )
+        gene_scores = rank_gene_scores({"G1": 3.0, "G2": 1.0, "G3": 2.0})
+        normalized = {score.gene_code: score.normalized_score for score in gene_scores}
+
+        derived = compute_derived_values(plan, gene_scores, top_n=2)
+
+        self.assertEqual(list(derived), ["quran_values", "prophet_traits", "future_family"])
+        for family, rows in tables:
+            expected = sorted(
+                (
+                    (code, round(sum(normalized.get(gene, 0.0) * weight for gene, weight in (weights or {}).items()), 4))
+                    for code, weights in rows
+                ),
+                key=lambda pair: (-pair[1], pair[0]),
+            )[:2]
+            self.assertEqual(derived[family], expected)
+        self.assertEqual(compute_derived_values(plan, gene_scores, top_n=0)["future_family"], [])
+
+    def test_model_matches_and_derived_values_are_score_frames(self):
+        derived_families, derived_matrix = compile_derived_values(
+            {"G1": 0, "G2": 1, "G3": 2},
+            [("quran_values", [("Q1", {"G1": 0.5}), ("Q2", {"G3": 1.0}), ("Q3", {"G2": 0.1})])],
+        )
+        plan = replace(
+            _model_plan(("G1", "G2", "G3"), {"M1": [1.0, 0.0, 0.0], "M2": [0.0, 0.0, 1.0], "M3": [0.0, 1.0, 0.0]}),
+            derived_families=derived_families,
+            derived_matrix=derived_matrix,
+        )
+        gene_scores = rank_gene_scores({"G1": 3.0, "G2": 1.0, "G3": 2.0})
+
+        matches = compute_model_matches(plan, gene_scores, top_n=2)
+        self.assertIsInstance(matches, ScoreFrame)
+        self.assertEqual(
+            matches,
+            [
+                ModelMatchResult(model_code="M1", similarity=0.801784, rank=1),
+                ModelMatchResult(model_code="M2", similarity=0.534522, rank=2),
+            ],
+        )
+        self.assertEqual(matches[-1], matches.top(2)[1])
+        with self.assertRaises(IndexError):
+            matches[2]
+
+        quran_values = compute_quran_values(plan, gene_scores, top_n=2)
+        self.assertIsInstance(quran_values, ScoreFrame)
+        self.assertEqual(
+            list(quran_values),
+            [
+                QuranValueScoreResult(quran_value_code=code, score=score, rank=rank)
+                for rank, (code, score) in enumerate(
+                    compute_derived_values(plan, gene_scores, top_n=2)["quran_values"], start=1
+                )
+            ],
+        )
+        self.assertEqual(compute_prophet_traits(plan, gene_scores), [])
+
+    def test_outcome_cache_evicts_least_recently_used_and_expired(self):
+        cache = OutcomeCache(max_entries=2, ttl_seconds=60)
+        cache.put(("v1", "fp", 3, ()), "first")
+        cache.put(("v1", "fp", 3, (("S01", "A"),)), "second")
+        self.assertEqual(cache.get(("v1", "fp", 3, ())), "first")
+        cache.put(("v2", "fp", 3, ()), "third")
+
+        self.assertIsNone(cache.get(("v1", "fp", 3, (("S01", "A"),))))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+        cache.invalidate("v1")
+        self.assertIsNone(cache.get(("v1", "fp", 3, ())))
+        self.assertEqual(cache.get(("v2", "fp", 3, ())), "third")
+
+        expired = OutcomeCache(max_entries=2, ttl_seconds=0)
+        expired.put(("v1", "fp", 3, ()), "stale")
+        self.assertIsNone(expired.get(("v1", "fp", 3, ())))
+
+    def test_model_similarity_is_zero_for_zero_vectors(self):
+        plan = _model_plan(["A", "B"], {"X": [0.2, 0.4], "Z": [0.0, 0.0]})
+
+        similarities = _model_similarity_matrix(plan, np.array([[0.0, 0.0], [1.0, 2.0]]))
+
+        self.assertEqual(similarities[0].tolist(), [0.0, 0.0])
+        self.assertAlmostEqual(similarities[1][0], 1.0, places=12)
+        self.assertEqual(similarities[1][1], 0.0)
 
     def test_select_activation_items_falls_back_when_channel_has_no_hits(self):
         gene_scores = [
@@ -74,5 +497,71 @@ class HybridEngineTests(unittest.TestCase):
         self.assertTrue(selected[2].is_fallback)
 
 
+
+class SeededContentModelMatchTests(unittest.TestCase):
+    """The matrix similarities against a pairwise reference on the shipped seed pack."""
+
+    @classmethod
+    def setUpClass(cls):
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(
+            bind=engine,
+            tables=[
+                AppVersion.__table__,
+                Gene.__table__,
+                Scenario.__table__,
+                ScenarioOption.__table__,
+                OptionWeight.__table__,
+                SahabaModel.__table__,
+                AdviceItem.__table__,
+                AdviceTrigger.__table__,
+                QuranValue.__table__,
+                ProphetTrait.__table__,
+                QuranValueGeneWeight.__table__,
+                ProphetTraitGeneWeight.__table__,
+            ],
+        )
+        with sessionmaker(bind=engine)() as db, patch("app.db.hybrid_seed_importer.pg_insert", sqlite_insert):
+            _import_hybrid_seed_pack(db=db, seed_path=_default_seed_dir())
+            db.commit()
+            cls.plans = [build_version_scoring_plan(db, version_id) for version_id in ("v1", "v2")]
+        engine.dispose()
+
+    def test_similarities_match_pairwise_cosine_within_rounding(self):
+        rng = random.Random(7)
+        for plan in self.plans:
+            options_by_scenario = {}
+            for scenario_code, option_code in plan.option_rows:
+                options_by_scenario.setdefault(scenario_code, []).append(option_code)
+            scenario_codes = sorted(options_by_scenario)
+
+            for _ in range(200):
+                answered = rng.sample(scenario_codes, min(12, len(scenario_codes)))
+                raw_scores = np.zeros(len(plan.gene_codes))
+                for scenario_code in sorted(answered):
+                    option_code = rng.choice(options_by_scenario[scenario_code])
+                    raw_scores += plan.option_gene_weights[plan.option_rows[(scenario_code, option_code)]]
+                reference = {
+                    code: _reference_cosine(raw_scores.tolist(), plan.model_matrix[index].tolist())
+                    for index, code in enumerate(plan.model_codes)
+                }
+
+                similarities = _model_similarity_matrix(plan, raw_scores[None, :])[0]
+                np.testing.assert_allclose(
+                    similarities, [reference[code] for code in plan.model_codes], rtol=0.0, atol=1e-12
+                )
+
+                expected = sorted(
+                    ((code, round(similarity, 6)) for code, similarity in reference.items()),
+                    key=lambda pair: (-pair[1], pair[0]),
+                )[:3]
+                matches = compute_model_matches(plan, rank_gene_vector(plan.gene_codes, raw_scores), top_n=3)
+                for match, (code, similarity) in zip(matches, expected):
+                    self.assertAlmostEqual(match.similarity, similarity, delta=1e-6)
+                    if match.model_code != code:
+                        # Only models whose similarities sit within the rounding band may swap places.
+                        self.assertAlmostEqual(reference[match.model_code], reference[code], delta=1e-6)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -108,6 +108,8 @@ class HybridSeedImporterIdempotencyTests(unittest.TestCase):
         self.assertEqual(first_counts, second_counts)
         for table_name, count in first_counts.items():
             self.assertGreater(count, 0, msg=f"{table_name} should not be empty")
+        # Each import bumps the revision API processes poll to drop their cached content.
+        self.assertEqual({version.content_revision for version in self.db.query(AppVersion)}, {2})
 
 
 if __name__ == "__main__":